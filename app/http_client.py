@@ -0,0 +1,87 @@
+"""
+Общий HTTP-клиент (aiohttp.ClientSession) для обращений к внешним сервисам.
+
+Сессия одна на процесс: соединения переиспользуются (keep-alive),
+DNS-ответы кэшируются, а количество соединений ограничено — в том числе
+на один хост. Бот открывает сессию при старте (post_init) и закрывает
+при остановке (post_shutdown); в остальных процессах она создаётся
+при первом обращении.
+"""
+
+import asyncio
+import aiohttp
+
+from app.logger import logger
+from constants.http_constants import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_TIMEOUT,
+    HTTP_USER_AGENT,
+)
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    """
+    Создаёт сессию с пулом соединений и DNS-кэшем.
+    """
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        headers={"User-Agent": HTTP_USER_AGENT},
+    )
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Возвращает общую HTTP-сессию процесса, создавая её при необходимости.
+
+    Сессия привязана к event loop, поэтому при вызове из другого loop
+    (например, в новом asyncio.run) создаётся новая.
+
+    Returns:
+        aiohttp.ClientSession: Сессия для запросов к внешним сервисам.
+    """
+
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = _create_session()
+        _session_loop = loop
+        logger.debug("Создана HTTP-сессия для внешних сервисов")
+    return _session
+
+
+async def start_http_client() -> None:
+    """
+    Открывает общую HTTP-сессию при старте приложения.
+    """
+
+    get_http_session()
+    logger.info("HTTP-клиент запущен")
+
+
+async def close_http_client() -> None:
+    """
+    Закрывает общую HTTP-сессию и её соединения.
+    """
+
+    global _session, _session_loop
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP-клиент остановлен")
+    _session = None
+    _session_loop = None
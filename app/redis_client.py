@@ -7,12 +7,15 @@ REDIS_URL = os.getenv("REDIS_URL")
 if not REDIS_URL:
     logger.warning("REDIS_URL не задан — cache отключён")
     redis_client = None
+    binary_redis_client = None
 else:
     redis_client = redis.from_url(
         REDIS_URL,
         encoding="utf-8",
         decode_responses=True,
     )
+    # Клиент без декодирования ответов — для значений в бинарном формате
+    binary_redis_client = redis.from_url(REDIS_URL, decode_responses=False)
 
 
 def get_redis_client():
@@ -21,3 +24,11 @@ def get_redis_client():
     """
 
     return redis_client
+
+
+def get_binary_redis_client():
+    """
+    Возвращает клиент Redis, который отдаёт значения как bytes
+    """
+
+    return binary_redis_client
@@ -0,0 +1,129 @@
+"""
+Проверка планов запросов выборки задач (EXPLAIN).
+
+Создаёт во временной схеме таблицы и индексы миграциями из migrations.py,
+заполняет её ROWS строками (по умолчанию миллион), выполняет ANALYZE
+и проверяет через EXPLAIN (FORMAT JSON), что горячие запросы идут по
+индексам, а не последовательным сканированием таблицы.
+
+Запуск (нужна отдельная, не боевая БД в DATABASE_URL):
+    python -m benchmarks.query_plan_check [ROWS]
+
+Код возврата 1, если хотя бы один запрос не использует индекс.
+"""
+
+import sys
+import json
+import asyncio
+import asyncpg
+from uuid import UUID
+from datetime import datetime, timezone
+
+from database import (
+    DATABASE_URL,
+    NEAREST_TASK_SQL,
+    USER_TASKS_SQL,
+    USER_TASKS_FIRST_PAGE_SQL,
+    USER_TASKS_PAGE_AFTER_SQL,
+    USER_TASKS_PAGE_BEFORE_SQL,
+    FUTURE_PENDING_TASKS_SQL,
+)
+from migrations import apply_migrations
+
+SCHEMA = "query_plan_check"
+USERS = 10_000  # Количество пользователей в сгенерированных данных
+PENDING_SHARE = 0.05  # Доля pending-задач (остальные выполнены)
+# Курсор страницы списка задач для проверки keyset-запросов
+CURSOR_TIME = datetime.now(timezone.utc)
+CURSOR_ID = UUID(int=0)
+
+CHECKS = [
+    ("get_nearest_task", NEAREST_TASK_SQL, (42,)),
+    ("get_all_tasks", USER_TASKS_SQL, (42,)),
+    ("get_tasks_page (первая)", USER_TASKS_FIRST_PAGE_SQL, (42, 9)),
+    (
+        "get_tasks_page (вперёд)",
+        USER_TASKS_PAGE_AFTER_SQL,
+        (42, CURSOR_TIME, CURSOR_ID, 9),
+    ),
+    (
+        "get_tasks_page (назад)",
+        USER_TASKS_PAGE_BEFORE_SQL,
+        (42, CURSOR_TIME, CURSOR_ID, 9),
+    ),
+    ("iter_future_pending_tasks", FUTURE_PENDING_TASKS_SQL, ()),
+]
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def plan_nodes(plan: dict):
+    """
+    Обходит дерево плана и возвращает все его узлы.
+    """
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def seed(conn: asyncpg.Connection, rows: int) -> None:
+    """
+    Создаёт схему, применяет миграции и заполняет таблицу данными.
+    """
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path TO {SCHEMA}")
+    await apply_migrations(conn)
+    await conn.execute(
+        """
+        INSERT INTO tasks (id, user_id, title, scheduled_time, status)
+        SELECT
+            md5(i::text)::uuid,
+            (random() * $2)::bigint,
+            'task ' || i,
+            now() + (random() * 60 - 30) * interval '1 day',
+            (CASE WHEN random() < $3 THEN 'pending' ELSE 'done' END)::task_status
+        FROM generate_series(1, $1) AS i
+        """,
+        rows,
+        USERS,
+        PENDING_SHARE,
+    )
+    await conn.execute("ANALYZE tasks")
+
+
+async def main(rows: int) -> int:
+    """
+    Заполняет таблицу и проверяет планы запросов.
+
+    Returns:
+        int: Код возврата процесса.
+    """
+    conn = await asyncpg.connect(DATABASE_URL)
+    failed = 0
+    try:
+        print(f"Заполнение {SCHEMA}.tasks: {rows:,} строк...")
+        await seed(conn, rows)
+
+        for name, sql, args in CHECKS:
+            raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+            plan = json.loads(raw)[0]["Plan"]
+            nodes = list(plan_nodes(plan))
+            node_types = [node["Node Type"] for node in nodes]
+            indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+
+            ok = "Seq Scan" not in node_types and bool(INDEX_NODES & set(node_types))
+            failed += not ok
+            print(
+                f"[{'OK' if ok else 'FAIL'}] {name}: "
+                f"{' -> '.join(node_types)} (индексы: {', '.join(indexes) or '-'})"
+            )
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)))
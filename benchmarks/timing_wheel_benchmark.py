@@ -0,0 +1,86 @@
+"""
+Бенчмарк иерархического колеса таймеров (utils.timing_wheel).
+
+Вставляет N записей со временем срабатывания в ближайшие SPREAD секунд
+(и часть — на дальний горизонт), отменяет часть из них и продвигает колесо
+по реальному времени так же, как bot.reminder_wheel. Выводит скорость
+вставки/отмены и опоздание срабатывания (jitter).
+
+Запуск:
+    python -m benchmarks.timing_wheel_benchmark [N]
+"""
+
+import sys
+import time
+import random
+import asyncio
+
+from constants.reminder_constants import WHEEL_TICK, WHEEL_SIZE, WHEEL_LEVELS
+from utils.timing_wheel import HierarchicalTimingWheel
+
+SPREAD = 10.0  # Окно срабатывания ближних записей, секунд
+FAR_SHARE = 0.5  # Доля записей на дальнем горизонте (до года)
+CANCEL_SHARE = 0.1  # Доля отменяемых записей
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Возвращает перцентиль p (0..100) отсортированного списка.
+    """
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def main(n: int) -> None:
+    """
+    Запускает бенчмарк на n записях.
+    """
+    rng = random.Random(0)
+    start = time.time()
+    wheel = HierarchicalTimingWheel(
+        tick=WHEEL_TICK, wheel_size=WHEEL_SIZE, levels=WHEEL_LEVELS, start_time=start
+    )
+    warmup = 1.0  # Записи срабатывают не раньше чем через секунду после вставки
+
+    t0 = time.perf_counter()
+    near = set()
+    for i in range(n):
+        if rng.random() < FAR_SHARE:
+            due = start + rng.uniform(SPREAD + warmup, 365 * 24 * 3600)
+        else:
+            due = start + warmup + rng.uniform(0, SPREAD)
+            near.add(i)
+        wheel.insert(i, due, due)
+    insert_elapsed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cancelled = 0
+    for i in range(0, n, int(1 / CANCEL_SHARE)):
+        cancelled += wheel.cancel(i)
+        near.discard(i)
+    cancel_elapsed = time.perf_counter() - t0
+
+    print(f"Записей: {n:,}, в колесе после отмены: {len(wheel):,}")
+    print(f"Вставка: {n / insert_elapsed:,.0f} записей/с")
+    print(f"Отмена:  {cancelled / cancel_elapsed:,.0f} записей/с")
+
+    lateness = []
+    deadline = start + warmup + SPREAD + 1.0
+    while time.time() < deadline:
+        now = time.time()
+        for _, due in wheel.advance(now):
+            lateness.append(time.time() - due)
+        next_tick = (now // WHEEL_TICK + 1) * WHEEL_TICK
+        await asyncio.sleep(max(0.0, next_tick - time.time()))
+
+    lateness.sort()
+    print(f"Сработало: {len(lateness):,} (ожидалось {len(near):,})")
+    print(
+        "Опоздание срабатывания, мс: "
+        f"p50={percentile(lateness, 50) * 1000:.1f} "
+        f"p99={percentile(lateness, 99) * 1000:.1f} "
+        f"max={lateness[-1] * 1000:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
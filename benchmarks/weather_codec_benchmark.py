@@ -0,0 +1,79 @@
+"""
+Микробенчмарк формата записей кэша погоды: JSON против utils.weather_codec.
+
+Сравнивает размер записи и время кодирования/декодирования одной записи
+(запись в Redis и чтение при попадании в кэш). Внешние сервисы не нужны.
+
+Запуск:
+    python -m benchmarks.weather_codec_benchmark [N]
+"""
+
+import sys
+import json
+import time
+import timeit
+
+from utils.weather_codec import encode_entry, decode_entry
+
+# Запись с прогнозом на 3 дня по 3 часа, как в ответе wttr.in (format=j1)
+ENTRY = {
+    "data": {
+        "weather": [{"description": "Patchy light rain with thunder"}],
+        "main": {"temp": -3.0},
+        "forecast": [
+            {
+                "date": f"2026-10-{17 + day}",
+                "min": -5.0,
+                "max": 4.0,
+                "hourly": [
+                    {
+                        "hour": hour,
+                        "temp": float(hour // 3 - 4),
+                        "rain": 20 if hour >= 12 else 0,
+                        "description": "Light rain" if hour >= 12 else "Partly cloudy",
+                    }
+                    for hour in range(0, 24, 3)
+                ],
+            }
+            for day in range(3)
+        ],
+    },
+    "fetched_at": time.time(),
+}
+
+
+def measure(name: str, n: int, operation) -> float:
+    """
+    Выполняет operation n раз и печатает среднее время одного вызова.
+
+    Returns:
+        float: Среднее время вызова, мкс.
+    """
+    mean = timeit.timeit(operation, number=n) / n * 1_000_000
+    print(f"{name:<28} {mean:7.3f} мкс")
+    return mean
+
+
+def main(n: int) -> None:
+    """
+    Запускает бенчмарк на n вызовах каждой операции.
+    """
+    raw_json = json.dumps(ENTRY).encode()
+    raw_binary = encode_entry(ENTRY)
+
+    print(f"Размер записи: JSON {len(raw_json)} байт, бинарная {len(raw_binary)} байт")
+    print(f"Экономия памяти Redis на запись: x{len(raw_json) / len(raw_binary):.2f}\n")
+
+    json_encode = measure("json.dumps", n, lambda: json.dumps(ENTRY).encode())
+    binary_encode = measure("encode_entry", n, lambda: encode_entry(ENTRY))
+    json_decode = measure("json.loads", n, lambda: json.loads(raw_json))
+    binary_decode = measure("decode_entry", n, lambda: decode_entry(raw_binary))
+
+    print(
+        f"\nУскорение: кодирование x{json_encode / binary_encode:.2f}, "
+        f"декодирование x{json_decode / binary_decode:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
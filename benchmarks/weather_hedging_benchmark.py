@@ -0,0 +1,89 @@
+"""
+Бенчмарк хеджирования запросов к провайдерам погоды.
+
+Поднимает две локальные заглушки (benchmarks.weather_stub_server):
+основную с «хвостом» медленных ответов (деградация апстрима) и резервную
+без хвоста. Выполняет N запросов через services.weather_providers.fetch_weather
+только к основной заглушке и к обеим с хеджированием, затем выводит
+перцентили задержки. Внешние сервисы не нужны.
+
+Запуск:
+    python -m benchmarks.weather_hedging_benchmark [N]
+"""
+
+import sys
+import time
+import asyncio
+
+from app.http_client import close_http_client
+from services import weather_providers
+from services.weather_providers import WttrProvider, fetch_weather
+from benchmarks.weather_stub_server import create_stub_app, start_stub_server
+
+DELAY = 0.02  # Обычная задержка заглушек, секунд
+TAIL_RATE = 0.1  # Доля медленных ответов основной заглушки
+TAIL_DELAY = 1.0  # Задержка медленного ответа, секунд
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Возвращает перцентиль p (0..100) отсортированного списка.
+    """
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run(name: str, providers: list[WttrProvider], n: int) -> None:
+    """
+    Выполняет n последовательных запросов и печатает перцентили задержки.
+    """
+    weather_providers._providers = providers
+    weather_providers._stats.update(hedged=0, failovers=0)
+
+    latencies = []
+    for i in range(n):
+        started = time.perf_counter()
+        result = await fetch_weather(f"city{i % 50}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert "error" not in result, result
+
+    latencies.sort()
+    print(
+        f"{name:<24} p50 {percentile(latencies, 50):7.1f} мс  "
+        f"p95 {percentile(latencies, 95):7.1f} мс  "
+        f"p99 {percentile(latencies, 99):7.1f} мс  "
+        f"max {latencies[-1]:7.1f} мс  "
+        f"хеджировано {weather_providers._stats['hedged']}"
+    )
+
+
+async def main(n: int) -> None:
+    """
+    Запускает бенчмарк на n запросах для каждого варианта.
+    """
+    degraded, degraded_url = await start_stub_server(
+        create_stub_app(DELAY, TAIL_RATE, TAIL_DELAY, seed=0)
+    )
+    healthy, healthy_url = await start_stub_server(create_stub_app(DELAY, seed=1))
+
+    print(
+        f"Основная заглушка: {DELAY * 1000:.0f} мс, {TAIL_RATE:.0%} ответов "
+        f"за {TAIL_DELAY * 1000:.0f} мс; резервная: {DELAY * 1000:.0f} мс\n"
+    )
+    try:
+        await run("Без хеджирования", [WttrProvider("degraded", degraded_url)], n)
+        await run(
+            "С хеджированием",
+            [
+                WttrProvider("degraded", degraded_url),
+                WttrProvider("healthy", healthy_url),
+            ],
+            n,
+        )
+    finally:
+        await close_http_client()
+        await degraded.cleanup()
+        await healthy.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,134 @@
+"""
+Локальная заглушка погодного сервиса в формате wttr.in (format=j1).
+
+Отвечает на GET /<город>?format=j1 без обращения к внешним сервисам,
+с настраиваемой задержкой, «хвостом» медленных ответов и долей ошибок.
+Используется провайдером stub (WEATHER_PROVIDERS=stub), в тестах
+и в бенчмарке хеджирования.
+
+Запуск:
+    python -m benchmarks.weather_stub_server [--port 8081] [--delay 0.05]
+        [--tail-rate 0.05] [--tail-delay 3] [--error-rate 0]
+"""
+
+import random
+import asyncio
+import argparse
+from datetime import date, timedelta
+
+from aiohttp import web
+
+
+def make_j1(city: str) -> dict:
+    """
+    Формирует ответ в формате wttr.in (format=j1) для города.
+
+    Args:
+        city (str): Название города из URL.
+
+    Returns:
+        dict: Текущая погода, прогноз на 3 дня по 3 часа и nearest_area.
+    """
+    today = date.today()
+    return {
+        "current_condition": [
+            {"temp_C": "5", "weatherDesc": [{"value": "Partly cloudy"}]}
+        ],
+        "nearest_area": [{"areaName": [{"value": city}]}],
+        "weather": [
+            {
+                "date": (today + timedelta(days=day)).isoformat(),
+                "mintempC": "1",
+                "maxtempC": "8",
+                "hourly": [
+                    {
+                        "time": str(hour * 100),
+                        "tempC": str(1 + hour // 3),
+                        "chanceofrain": "20" if hour >= 12 else "0",
+                        "weatherDesc": [
+                            {"value": "Light rain" if hour >= 12 else "Sunny"}
+                        ],
+                    }
+                    for hour in range(0, 24, 3)
+                ],
+            }
+            for day in range(3)
+        ],
+    }
+
+
+def create_stub_app(
+    delay: float = 0.0,
+    tail_rate: float = 0.0,
+    tail_delay: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+) -> web.Application:
+    """
+    Создаёт приложение заглушки.
+
+    Args:
+        delay (float): Задержка каждого ответа, секунд.
+        tail_rate (float): Доля медленных ответов (0..1).
+        tail_delay (float): Задержка медленного ответа, секунд.
+        error_rate (float): Доля ответов со статусом 503 (0..1).
+        seed (int | None): Начальное значение генератора случайных чисел.
+
+    Returns:
+        web.Application: Приложение aiohttp.
+    """
+    rng = random.Random(seed)
+
+    async def handle(request: web.Request) -> web.Response:
+        slow = rng.random() < tail_rate
+        await asyncio.sleep(tail_delay if slow else delay)
+        if rng.random() < error_rate:
+            return web.Response(status=503)
+        return web.json_response(make_j1(request.match_info["city"]))
+
+    app = web.Application()
+    app.router.add_get("/{city}", handle)
+    return app
+
+
+async def start_stub_server(
+    app: web.Application, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """
+    Запускает заглушку в текущем event loop.
+
+    Args:
+        app (web.Application): Приложение из create_stub_app().
+        host (str): Адрес.
+        port (int): Порт (0 — любой свободный).
+
+    Returns:
+        tuple[web.AppRunner, str]: Runner (для runner.cleanup()) и базовый URL.
+    """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}"
+
+
+def main() -> None:
+    """
+    Запускает заглушку с параметрами из командной строки.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-delay", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_stub_app(args.delay, args.tail_rate, args.tail_delay, args.error_rate)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
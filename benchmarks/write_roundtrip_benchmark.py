@@ -0,0 +1,149 @@
+"""
+Бенчмарк записи задач: запись + повторный SELECT против RETURNING.
+
+Сравнивает прежнюю схему (INSERT/UPDATE, затем SELECT по id — два захвата
+соединения из пула и два round-trip) с INSERT ... RETURNING /
+UPDATE ... RETURNING из database.py. Таблица создаётся миграциями
+во временной схеме. Выводит среднюю и p95 задержку одной операции.
+
+Запуск (нужна отдельная, не боевая БД в DATABASE_URL):
+    python -m benchmarks.write_roundtrip_benchmark [N]
+"""
+
+import sys
+import time
+import asyncio
+import asyncpg
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+
+from database import DATABASE_URL, ADD_TASK_SQL, UPDATE_TASK_TIME_SQL
+from migrations import apply_migrations
+
+SCHEMA = "write_roundtrip_benchmark"
+USER_ID = 42
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Возвращает перцентиль p (0..100) отсортированного списка.
+    """
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def insert_then_select(pool: asyncpg.Pool, when: datetime) -> dict:
+    """
+    Прежняя схема создания задачи: INSERT, затем SELECT по id.
+    """
+    task_id = uuid4()
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "INSERT INTO tasks (id, user_id, title, scheduled_time, status) "
+            "VALUES ($1, $2, $3, $4, 'pending')",
+            task_id,
+            USER_ID,
+            "benchmark",
+            when,
+        )
+    async with pool.acquire() as conn:
+        return dict(await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", task_id))
+
+
+async def insert_returning(pool: asyncpg.Pool, when: datetime) -> dict:
+    """
+    Создание задачи одним запросом INSERT ... RETURNING.
+    """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(ADD_TASK_SQL, uuid4(), USER_ID, "benchmark", when)
+        return dict(row)
+
+
+async def update_then_select(pool: asyncpg.Pool, task_id, when: datetime) -> dict:
+    """
+    Прежняя схема переноса задачи: UPDATE, затем SELECT по id.
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE tasks SET scheduled_time = $1, status = 'pending' "
+            "WHERE id = $2 AND user_id = $3",
+            when,
+            task_id,
+            USER_ID,
+        )
+    async with pool.acquire() as conn:
+        return dict(await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", task_id))
+
+
+async def update_returning(pool: asyncpg.Pool, task_id, when: datetime) -> dict:
+    """
+    Перенос задачи одним запросом UPDATE ... RETURNING.
+    """
+    async with pool.acquire() as conn:
+        return dict(await conn.fetchrow(UPDATE_TASK_TIME_SQL, when, task_id, USER_ID))
+
+
+async def measure(name: str, n: int, operation) -> float:
+    """
+    Выполняет operation(i) n раз последовательно и печатает задержки.
+
+    Returns:
+        float: Средняя задержка операции, мс.
+    """
+    latencies = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        await operation(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    latencies.sort()
+    mean = sum(latencies) / n
+    print(f"{name:<28} mean {mean:7.3f} мс   p95 {percentile(latencies, 95):7.3f} мс")
+    return mean
+
+
+async def main(n: int) -> None:
+    """
+    Запускает бенчмарк на n операциях каждого вида.
+    """
+
+    async def setup(conn: asyncpg.Connection) -> None:
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+
+    admin = await asyncpg.connect(DATABASE_URL)
+    await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await admin.execute(f"CREATE SCHEMA {SCHEMA}")
+    await admin.execute(f"SET search_path TO {SCHEMA}")
+    await apply_migrations(admin)
+
+    pool = await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=5, setup=setup)
+    try:
+        when = datetime.now(timezone.utc) + timedelta(days=1)
+        ids = []
+
+        async def create_returning(_):
+            ids.append((await insert_returning(pool, when))["id"])
+
+        old_insert = await measure(
+            "INSERT + SELECT", n, lambda _: insert_then_select(pool, when)
+        )
+        new_insert = await measure("INSERT ... RETURNING", n, create_returning)
+
+        old_update = await measure(
+            "UPDATE + SELECT", n, lambda i: update_then_select(pool, ids[i], when)
+        )
+        new_update = await measure(
+            "UPDATE ... RETURNING", n, lambda i: update_returning(pool, ids[i], when)
+        )
+
+        print(
+            f"\nУскорение: создание x{old_insert / new_insert:.2f}, "
+            f"перенос x{old_update / new_update:.2f}"
+        )
+    finally:
+        await pool.close()
+        await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await admin.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
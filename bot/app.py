@@ -4,8 +4,10 @@
 Здесь создаётся экземпляр бота с помощью ApplicationBuilder.
 Выполняются:
 - Настройка токена из переменных окружения
-- Инициализация базы данных при старте
+- Инициализация базы данных и общего HTTP-клиента при старте
 - Восстановление отложенных задач
+- Запуск диспетчера напоминаний (Redis sorted set)
+- Запуск фонового прогрева кэша погоды
 - Добавление хендлеров команд, callback, разговоров
 - Логирование всех этапов работы бота
 """
@@ -20,6 +22,7 @@ from telegram.ext import (
     filters,
 )
 from app.logger import logger
+from app.http_client import start_http_client, close_http_client
 from database import init_db, close_db
 from handlers.common.common import start, cancel
 from handlers.tasks_handler import add_task_date, add_task_text, postpone_date
@@ -27,6 +30,10 @@ from handlers.search_handler import search_handler
 from handlers.weather_handler import weather_handler
 from handlers.callbacks.callbacks import callbacks
 from bot.jobs import restore_jobs
+from bot.rate_limiter import TelegramRateLimiter
+from bot.scheduler import start_dispatcher, stop_dispatcher
+from bot.reminder_wheel import WHEEL_ENABLED, start_wheel, stop_wheel
+from bot.weather_prefetcher import start_weather_prefetcher, stop_weather_prefetcher
 from states import (
     ADD_DATE,
     ADD_TEXT,
@@ -42,9 +49,15 @@ def create_app():
     Основные шаги:
         1. Получение токена из переменных окружения.
         2. Настройка асинхронных функций при запуске и остановке бота:
-            - on_startup: инициализация БД, восстановление напоминаний
-            - on_shutdown: закрытие соединений с БД, лог остановки
-        3. Создание ApplicationBuilder и установка функций startup/shutdown.
+            - on_startup: инициализация БД, открытие общей HTTP-сессии,
+              восстановление напоминаний,
+              запуск диспетчера напоминаний (или колеса таймеров
+              при REMINDER_ENGINE=wheel) и прогрева кэша погоды
+            - on_shutdown: остановка диспетчера/колеса и прогрева погоды,
+              закрытие HTTP-сессии
+              и соединений с БД, лог остановки
+        3. Создание ApplicationBuilder, установка функций startup/shutdown
+           и общего с Celery worker'ами ограничителя частоты запросов.
         4. Регистрация хендлеров:
             - Команды (/start)
             - Добавление задач (add_task)
@@ -67,10 +80,24 @@ def create_app():
     async def on_startup(app):
         logger.info("Инициализация БД...")
         await init_db()
+        await start_http_client()
         logger.info("Восстановление напоминаний по задачам...")
         await restore_jobs(app)
+        if WHEEL_ENABLED:
+            logger.info("Запуск in-process колеса напоминаний...")
+            start_wheel(app)
+        else:
+            logger.info("Запуск диспетчера напоминаний...")
+            start_dispatcher()
+        start_weather_prefetcher()
 
     async def on_shutdown(_):
+        if WHEEL_ENABLED:
+            await stop_wheel()
+        else:
+            await stop_dispatcher()
+        await stop_weather_prefetcher()
+        await close_http_client()
         logger.info("Закрытие соединений с БД...")
         await close_db()
         logger.info("Бот остановлен")
@@ -81,6 +108,7 @@ def create_app():
         .post_init(on_startup)
         .post_shutdown(on_shutdown)
         .concurrent_updates(True)
+        .rate_limiter(TelegramRateLimiter())
         .build()
     )
 
@@ -136,6 +164,9 @@ def create_app():
             entry_points=[
                 CallbackQueryHandler(callbacks, pattern="^weather$"),
                 CallbackQueryHandler(callbacks, pattern="^weather_change$"),
+                CallbackQueryHandler(
+                    callbacks, pattern="^weather_(today|tomorrow|hourly)$"
+                ),
             ],
             states={
                 WEATHER_CITY: [
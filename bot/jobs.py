@@ -1,15 +1,20 @@
 """
 Модуль работы с задачами и напоминаниями.
-Содержит функции для отправки напоминаний пользователям и восстановления всех
-невыполненных задач при старте бота.
+Содержит функции для планирования напоминаний и восстановления
+всех невыполненных задач при старте бота.
 """
 
-from datetime import datetime, timezone
+import time
+import asyncio
+from datetime import datetime
 # from telegram.ext import CallbackContext
 
 from app.logger import logger
-from bot.tasks import send_task_reminder_task
-from database import get_all_pending_tasks  # , get_task_by_id
+from bot import reminder_wheel
+from bot.scheduler import add_reminders, remove_reminder
+from constants.reminder_constants import RESTORE_BATCH_SIZE
+from database import iter_future_pending_tasks  # , get_task_by_id
+from services.reminder_service import filter_not_enqueued, mark_enqueued
 # from keyboard import task_actions
 # from utils.tasks_utils import format_task
 
@@ -56,23 +61,120 @@ from database import get_all_pending_tasks  # , get_task_by_id
 #         logger.error("Ошибка при отправке напоминания для задачи %s\n%s", task["id"], e)
 
 
+async def schedule_reminders(tasks: list[dict]) -> int:
+    """
+    Планирует напоминания для пачки задач в sorted set (см. bot.scheduler),
+    пропуская те, что уже поставлены на текущее время задачи
+    (см. services.reminder_service). В режиме REMINDER_ENGINE=wheel
+    напоминания добавляются в in-process колесо таймеров.
+
+    Args:
+        tasks (list[dict]): Задачи с полями id, user_id, scheduled_time.
+
+    Returns:
+        int: Количество реально поставленных напоминаний.
+    """
+
+    if reminder_wheel.WHEEL_ENABLED:
+        return reminder_wheel.add_reminders(tasks)
+
+    fresh = await filter_not_enqueued(tasks)
+    if not fresh:
+        return 0
+
+    scheduled = await add_reminders(fresh)
+    await mark_enqueued(fresh)
+
+    return scheduled
+
+
+async def schedule_reminder(task: dict) -> bool:
+    """
+    Планирует напоминание для одной задачи.
+
+    Args:
+        task (dict): Задача с полями id, user_id, scheduled_time.
+
+    Returns:
+        bool: True, если напоминание поставлено, False — если оно
+        уже было поставлено на это же время.
+    """
+
+    logger.info("Планирование напоминания для task_id=%s", task["id"])
+    return await schedule_reminders([task]) == 1
+
+
+async def reschedule_reminder(task: dict, old_time: datetime | None) -> bool:
+    """
+    Переносит напоминание задачи на её новое время.
+
+    Элемент sorted set содержит время напоминания, поэтому при смене
+    времени прежний элемент удаляется, иначе в очереди остаются оба.
+    В колесе таймеров запись заменяется по id задачи.
+
+    Args:
+        task (dict): Обновлённая задача с полями id, user_id, scheduled_time.
+        old_time (datetime | None): Время задачи до переноса.
+
+    Returns:
+        bool: True, если напоминание поставлено на новое время.
+    """
+
+    if (
+        not reminder_wheel.WHEEL_ENABLED
+        and old_time is not None
+        and old_time != task["scheduled_time"]
+    ):
+        await remove_reminder({**task, "scheduled_time": old_time})
+
+    return await schedule_reminder(task)
+
+
+async def cancel_reminder(task: dict) -> None:
+    """
+    Отменяет запланированное напоминание задачи (например, после выполнения).
+
+    Args:
+        task (dict): Задача с полями id, user_id, scheduled_time.
+    """
+
+    if reminder_wheel.WHEEL_ENABLED:
+        reminder_wheel.cancel_reminder(str(task["id"]))
+    else:
+        await remove_reminder(task)
+
+
 async def restore_jobs(_):
     """
-    Восстанавливает все pending задачи.
+    Восстанавливает напоминания для всех будущих pending задач.
+
+    Задачи читаются из БД потоково (серверным курсором) пачками по
+    RESTORE_BATCH_SIZE. Пока одна пачка записывается в Redis,
+    из БД уже читается следующая. Напоминания, уже поставленные
+    предыдущим процессом бота, повторно не ставятся.
+    В конце логируется пропускная способность.
     """
 
     logger.debug("Формирование напоминаний для всех невыполненных задач...")
-    now = datetime.now(timezone.utc)
-    tasks = await get_all_pending_tasks()
+    started = time.perf_counter()
+    scanned = 0
+    restored = 0
+    publishing = None  # Задача публикации предыдущей пачки
 
-    for task in tasks:
-        if task["scheduled_time"] <= now:
-            continue
+    async for batch in iter_future_pending_tasks(RESTORE_BATCH_SIZE):
+        scanned += len(batch)
+        if publishing is not None:
+            restored += await publishing
+        publishing = asyncio.create_task(schedule_reminders(batch))
 
-        delay = (task["scheduled_time"] - now).total_seconds()
+    if publishing is not None:
+        restored += await publishing
 
-        # Создаём Celery-задачу. Celery её сериализует и отправляет в очередь Redis
-        send_task_reminder_task.apply_async(
-            args=[task["id"], task["user_id"], str(task["scheduled_time"])],
-            countdown=max(0, delay),
-        )
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Проверено задач: %s, поставлено напоминаний: %s за %.2f с (%.0f задач/с)",
+        scanned,
+        restored,
+        elapsed,
+        scanned / elapsed if elapsed > 0 else 0,
+    )
@@ -0,0 +1,323 @@
+"""
+Ограничитель частоты запросов к Telegram Bot API.
+
+Реализует интерфейс telegram.ext.BaseRateLimiter и подключается как к
+Application бота (ответы хендлеров), так и к боту Celery worker'ов
+(напоминания), поэтому все исходящие сообщения проходят через одну
+очередь с общими лимитами:
+- глобальный token bucket (~30 сообщений/с);
+- token bucket на каждый чат (1 сообщение/с, для групп 20 в минуту);
+- общая пауза после ответа 429 RetryAfter.
+
+Состояние ведер хранится в Redis и обновляется атомарным Lua-скриптом,
+поэтому бот и все worker-процессы делят один бюджет. Без Redis
+используются локальные ведра процесса.
+"""
+
+import time
+import weakref
+import warnings
+import asyncio
+import contextlib
+from datetime import timedelta
+from typing import Any, Callable, Coroutine
+from redis.exceptions import RedisError
+from telegram.error import RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+from telegram.ext import BaseRateLimiter
+
+from app.logger import logger
+from app.redis_client import get_redis_client
+from constants.telegram_constants import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_GROUP_RATE,
+    TELEGRAM_MAX_RETRIES,
+    TELEGRAM_RATE_PREFIX,
+)
+from utils.rate_limit_utils import AsyncTokenBucket
+
+# Lua-скрипт: общая пауза RetryAfter + атомарное списание токена из всех ведер.
+# KEYS[1] — ключ паузы, KEYS[2..] — ведра; ARGV — пары (токенов в мс, ёмкость).
+# Возвращает 0, если токены списаны, иначе — сколько миллисекунд подождать.
+ACQUIRE_SCRIPT = """
+local pause = redis.call('PTTL', KEYS[1])
+if pause > 0 then
+    return pause
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local wait = 0
+local tokens = {}
+for i = 2, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 3])
+    local capacity = tonumber(ARGV[2 * i - 2])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    available = math.min(capacity, available + (now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i = 2, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 3])
+    local capacity = tonumber(ARGV[2 * i - 2])
+    redis.call('HSET', KEYS[i], 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate) + 1000)
+end
+return 0
+"""
+
+# Максимальное количество локальных ведер чатов (защита от роста памяти)
+MAX_LOCAL_CHAT_BUCKETS = 10_000
+
+# Ограничители процесса (для get_rate_limiter_stats)
+_limiters: "weakref.WeakSet[TelegramRateLimiter]" = weakref.WeakSet()
+
+
+def get_rate_limiter_stats() -> dict:
+    """
+    Возвращает метрики очереди исходящих сообщений Telegram этого процесса.
+
+    Returns:
+        dict: Сумма метрик всех ограничителей процесса
+        (см. TelegramRateLimiter.stats).
+    """
+
+    stats = [limiter._stats for limiter in _limiters]
+    requests = sum(s["requests"] for s in stats)
+    return {
+        "queue_depth": sum(limiter._queue_depth for limiter in _limiters),
+        "max_queue_depth": max((s["max_queue_depth"] for s in stats), default=0),
+        "requests": requests,
+        "retry_after": sum(s["retry_after"] for s in stats),
+        "avg_delay": (
+            sum(s["total_delay"] for s in stats) / requests if requests else 0.0
+        ),
+        "max_delay": max((s["max_delay"] for s in stats), default=0.0),
+    }
+
+
+def _retry_after_seconds(exc: RetryAfter) -> float:
+    """
+    Возвращает паузу из RetryAfter в секундах.
+
+    Атрибут retry_after — int или timedelta (в зависимости от версии
+    python-telegram-bot и PTB_TIMEDELTA); предупреждение о переходе
+    на timedelta не нужно — поддерживаются оба типа.
+    """
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = exc.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class TelegramRateLimiter(BaseRateLimiter[int]):
+    """
+    Ограничитель частоты запросов с общим через Redis бюджетом.
+
+    Ограничиваются только запросы, адресованные чату (есть chat_id),
+    поэтому getUpdates, answerCallbackQuery и т.п. проходят без ожидания.
+    Аргумент rate_limit_args задаёт количество повторов после RetryAfter.
+    """
+
+    def __init__(self, max_retries: int = TELEGRAM_MAX_RETRIES):
+        """
+        Args:
+            max_retries (int): Сколько раз повторять запрос после RetryAfter.
+        """
+        self.max_retries = max_retries
+        self._global_bucket = AsyncTokenBucket(TELEGRAM_GLOBAL_RATE)
+        self._chat_buckets: dict[int | str, AsyncTokenBucket] = {}
+        self._paused_until = 0.0  # Локальная пауза RetryAfter (time.monotonic)
+        self._queue_depth = 0
+        self._stats = {
+            "requests": 0,
+            "retry_after": 0,
+            "max_queue_depth": 0,
+            "total_delay": 0.0,
+            "max_delay": 0.0,
+        }
+        _limiters.add(self)
+
+    async def initialize(self) -> None:
+        """
+        Инициализация не требуется: соединение с Redis создаётся лениво.
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Логирует накопленную статистику очереди.
+        """
+        logger.info("Статистика очереди Telegram: %s", self.stats())
+
+    def stats(self) -> dict:
+        """
+        Возвращает метрики очереди исходящих сообщений.
+
+        Returns:
+            dict: queue_depth — сколько запросов ждут сейчас, max_queue_depth,
+            requests, retry_after — число ответов 429, avg_delay/max_delay —
+            задержка в очереди в секундах.
+        """
+        requests = self._stats["requests"]
+        return {
+            "queue_depth": self._queue_depth,
+            "max_queue_depth": self._stats["max_queue_depth"],
+            "requests": requests,
+            "retry_after": self._stats["retry_after"],
+            "avg_delay": self._stats["total_delay"] / requests if requests else 0.0,
+            "max_delay": self._stats["max_delay"],
+        }
+
+    @staticmethod
+    def _chat_limits(chat_id: int | str) -> tuple[float, float]:
+        """
+        Возвращает (скорость, ёмкость) ведра для чата.
+
+        Отрицательные и строковые chat_id — группы и каналы.
+        """
+        if isinstance(chat_id, str) or chat_id < 0:
+            return TELEGRAM_GROUP_RATE, 1
+        return TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST
+
+    async def _acquire_redis(self, redis_client, chat_id: int | str) -> float:
+        """
+        Пытается списать токены из общих ведер в Redis.
+
+        Returns:
+            float: 0, если токены списаны, иначе время ожидания в секундах.
+        """
+        chat_rate, chat_capacity = self._chat_limits(chat_id)
+        wait_ms = await redis_client.eval(
+            ACQUIRE_SCRIPT,
+            3,
+            f"{TELEGRAM_RATE_PREFIX}retry_after",
+            f"{TELEGRAM_RATE_PREFIX}global",
+            f"{TELEGRAM_RATE_PREFIX}chat:{chat_id}",
+            TELEGRAM_GLOBAL_RATE / 1000,
+            TELEGRAM_GLOBAL_RATE,
+            chat_rate / 1000,
+            chat_capacity,
+        )
+        return int(wait_ms) / 1000
+
+    async def _acquire_local(self, chat_id: int | str) -> None:
+        """
+        Ждёт токены в локальных ведрах процесса (режим без Redis).
+        """
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_LOCAL_CHAT_BUCKETS:
+                self._chat_buckets.clear()
+            bucket = AsyncTokenBucket(*self._chat_limits(chat_id))
+            self._chat_buckets[chat_id] = bucket
+
+        await bucket.acquire()
+        await self._global_bucket.acquire()
+
+    async def _wait_turn(self, chat_id: int | str) -> None:
+        """
+        Ставит запрос в очередь и ждёт, пока лимиты позволят его отправить.
+        """
+        started = time.monotonic()
+        self._queue_depth += 1
+        self._stats["max_queue_depth"] = max(
+            self._stats["max_queue_depth"], self._queue_depth
+        )
+
+        try:
+            redis_client = get_redis_client()
+            while True:
+                if redis_client:
+                    try:
+                        wait = await self._acquire_redis(redis_client, chat_id)
+                    except RedisError as e:
+                        logger.warning(
+                            "Redis недоступен для лимитов Telegram, "
+                            "используются локальные лимиты\n%s",
+                            e,
+                        )
+                        redis_client = None
+                        continue
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                else:
+                    await self._acquire_local(chat_id)
+                    break
+        finally:
+            self._queue_depth -= 1
+
+        delay = time.monotonic() - started
+        self._stats["requests"] += 1
+        self._stats["total_delay"] += delay
+        self._stats["max_delay"] = max(self._stats["max_delay"], delay)
+
+    async def _pause(self, seconds: float) -> None:
+        """
+        Устанавливает общую для всех процессов паузу после RetryAfter.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+        redis_client = get_redis_client()
+        if redis_client:
+            with contextlib.suppress(RedisError):
+                await redis_client.set(
+                    f"{TELEGRAM_RATE_PREFIX}retry_after",
+                    1,
+                    px=int(seconds * 1000),
+                )
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: int | None,
+    ) -> Any:
+        """
+        Выполняет запрос к Bot API с учётом лимитов и повторами после RetryAfter.
+        """
+        chat_id = data.get("chat_id")
+        if chat_id is None:
+            return await callback(*args, **kwargs)
+
+        with contextlib.suppress(ValueError, TypeError):
+            chat_id = int(chat_id)
+
+        max_retries = self.max_retries if rate_limit_args is None else rate_limit_args
+        for attempt in range(max_retries + 1):
+            await self._wait_turn(chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as exc:
+                self._stats["retry_after"] += 1
+                if attempt == max_retries:
+                    logger.exception(
+                        "Лимит Telegram превышен после %s повторов (%s)",
+                        max_retries,
+                        endpoint,
+                    )
+                    raise
+
+                seconds = _retry_after_seconds(exc) + 0.1
+                logger.warning(
+                    "Telegram вернул RetryAfter, пауза %.1f с (%s)", seconds, endpoint
+                )
+                await self._pause(seconds)
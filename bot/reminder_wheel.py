@@ -0,0 +1,150 @@
+"""
+In-process движок напоминаний на иерархическом колесе таймеров.
+
+Опциональная альтернатива связке Redis sorted set + Celery для
+однонодовых развёртываний (включается переменной REMINDER_ENGINE=wheel).
+Колесо живёт в event loop приложения, заполняется из таблицы tasks
+при старте (restore_jobs), вставка и отмена напоминаний выполняются за O(1),
+а отправка идёт напрямую через уже запущенный Application.bot.
+"""
+
+import os
+import time
+import asyncio
+from telegram.ext import Application
+
+from app.logger import logger
+from bot.tasks import deliver_reminder
+from constants.reminder_constants import WHEEL_TICK, WHEEL_SIZE, WHEEL_LEVELS
+from utils.timing_wheel import HierarchicalTimingWheel
+
+# Включён ли in-process движок напоминаний
+WHEEL_ENABLED = os.getenv("REMINDER_ENGINE", "redis").lower() == "wheel"
+
+_wheel: HierarchicalTimingWheel | None = None  # Колесо таймеров процесса
+_driver_task: asyncio.Task | None = None  # Фоновая задача, продвигающая колесо
+_deliveries: set[asyncio.Task] = set()  # Незавершённые отправки напоминаний
+
+
+def get_wheel() -> HierarchicalTimingWheel:
+    """
+    Возвращает колесо таймеров процесса, создавая его при первом обращении.
+
+    Returns:
+        HierarchicalTimingWheel: Колесо таймеров.
+    """
+
+    global _wheel
+    if _wheel is None:
+        _wheel = HierarchicalTimingWheel(
+            tick=WHEEL_TICK,
+            wheel_size=WHEEL_SIZE,
+            levels=WHEEL_LEVELS,
+            start_time=time.time(),
+        )
+    return _wheel
+
+
+def add_reminders(tasks: list[dict]) -> int:
+    """
+    Добавляет (или переносит) напоминания в колесо таймеров.
+
+    Args:
+        tasks (list[dict]): Задачи с полями id, user_id, scheduled_time.
+
+    Returns:
+        int: Количество запланированных напоминаний.
+    """
+
+    wheel = get_wheel()
+    for task in tasks:
+        wheel.insert(
+            str(task["id"]),
+            task["scheduled_time"].timestamp(),
+            (task["user_id"], str(task["scheduled_time"])),
+        )
+    return len(tasks)
+
+
+def cancel_reminder(task_id: str) -> bool:
+    """
+    Отменяет напоминание задачи.
+
+    Args:
+        task_id (str): Уникальный идентификатор задачи.
+
+    Returns:
+        bool: True, если напоминание было в колесе.
+    """
+
+    return get_wheel().cancel(task_id)
+
+
+async def _deliver(app: Application, task_id: str, chat_id: int, scheduled_time: str):
+    """
+    Отправляет сработавшее напоминание, логируя ошибки.
+    """
+
+    try:
+        await deliver_reminder(app.bot, task_id, chat_id, scheduled_time)
+    except Exception as e:
+        logger.exception(
+            "Ошибка при отправке напоминания для задачи %s\n%s", task_id, e
+        )
+
+
+async def _run_wheel(app: Application) -> None:
+    """
+    Бесконечный цикл, продвигающий колесо по реальному времени.
+
+    Цикл просыпается на границе каждого тика, поэтому напоминание
+    срабатывает с опозданием не больше одного тика (плюс время обработки).
+    """
+
+    wheel = get_wheel()
+    logger.info("Колесо напоминаний запущено, записей: %s", len(wheel))
+
+    while True:
+        now = time.time()
+        for task_id, (chat_id, scheduled_time) in wheel.advance(now):
+            delivery = asyncio.create_task(
+                _deliver(app, task_id, chat_id, scheduled_time)
+            )
+            _deliveries.add(delivery)
+            delivery.add_done_callback(_deliveries.discard)
+
+        next_tick = (now // WHEEL_TICK + 1) * WHEEL_TICK
+        await asyncio.sleep(max(0.0, next_tick - time.time()))
+
+
+def start_wheel(app: Application) -> None:
+    """
+    Запускает продвижение колеса таймеров фоновой задачей.
+
+    Args:
+        app (Application): Приложение Telegram, через бота которого
+            отправляются напоминания.
+    """
+
+    global _driver_task
+    if _driver_task is None:
+        _driver_task = asyncio.create_task(_run_wheel(app))
+
+
+async def stop_wheel() -> None:
+    """
+    Останавливает колесо таймеров и дожидается незавершённых отправок.
+    """
+
+    global _driver_task
+    if _driver_task is not None:
+        _driver_task.cancel()
+        try:
+            await _driver_task
+        except asyncio.CancelledError:
+            pass
+        _driver_task = None
+
+    if _deliveries:
+        await asyncio.gather(*_deliveries, return_exceptions=True)
+    logger.info("Колесо напоминаний остановлено")
@@ -0,0 +1,363 @@
+"""
+Планировщик напоминаний на Redis sorted set.
+
+Вместо Celery-задач с длинным countdown (которые worker держит в памяти
+как неподтверждённые сообщения) будущие напоминания хранятся в Redis ZSET,
+где score — unix-время отправки. Диспетчер в процессе бота раз в
+DISPATCH_POLL_INTERVAL секунд атомарно извлекает созревшие записи пачками
+и ставит их в очередь Celery без задержки.
+
+Каждое будущее напоминание стоит одну запись sorted set, а задержка
+отправки ограничена интервалом опроса независимо от горизонта.
+
+Извлечённые напоминания не удаляются, а переносятся в REMINDERS_PROCESSING_KEY
+и удаляются оттуда только после успешной публикации. Если публикация
+не удалась (брокер недоступен), они сразу возвращаются в очередь; если
+реплика упала, их возвращает диспетчер через DISPATCH_PROCESSING_TIMEOUT.
+Повторная публикация безопасна: повторы отбрасывает маркер отправки.
+"""
+
+import json
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from app.logger import logger
+from app.redis_client import get_redis_client
+from bot.celery_app import app as celery_app
+from bot.tasks import send_task_reminder_task, send_task_reminders_batch_task
+from constants.reminder_constants import (
+    REMINDER_BATCH_MAX,
+    REMINDERS_ZSET_KEY,
+    REMINDERS_PROCESSING_KEY,
+    DISPATCH_PROCESSING_TIMEOUT,
+    DISPATCH_BATCH_SIZE,
+    DISPATCH_POLL_INTERVAL,
+)
+
+# Lua-скрипт атомарного извлечения созревших напоминаний:
+# ZRANGEBYSCORE + перенос в sorted set обрабатываемых в одном вызове,
+# поэтому несколько реплик бота могут запускать диспетчер одновременно
+# без дублирования.
+POP_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, item in ipairs(items) do
+    redis.call('ZADD', KEYS[2], ARGV[1], item)
+end
+if #items > 0 then
+    redis.call('ZREM', KEYS[1], unpack(items))
+end
+return items
+"""
+
+_dispatcher_task: asyncio.Task | None = None  # Фоновая задача диспетчера
+
+
+def _encode_reminder(task: dict) -> str:
+    """
+    Кодирует напоминание в элемент sorted set.
+
+    Одинаковые напоминания дают одинаковый элемент, поэтому
+    повторный ZADD не создаёт дубликатов.
+
+    Args:
+        task (dict): Задача с полями id, user_id, scheduled_time.
+
+    Returns:
+        str: JSON-строка [task_id, chat_id, scheduled_time].
+    """
+
+    return json.dumps(
+        [str(task["id"]), task["user_id"], str(task["scheduled_time"])],
+        separators=(",", ":"),
+    )
+
+
+def _decode_reminder(member: str) -> dict:
+    """
+    Декодирует элемент sorted set обратно в аргументы Celery-задачи.
+
+    Args:
+        member (str): JSON-строка [task_id, chat_id, scheduled_time].
+
+    Returns:
+        dict: Словарь с ключами id, user_id, scheduled_time (строка).
+    """
+
+    task_id, chat_id, scheduled_time = json.loads(member)
+    return {"id": task_id, "user_id": chat_id, "scheduled_time": scheduled_time}
+
+
+def _coalesce_by_due_second(tasks: list[dict]) -> list[tuple[float, list]]:
+    """
+    Группирует напоминания с совпадающей секундой отправки в пачки
+    не больше REMINDER_BATCH_MAX элементов.
+
+    Args:
+        tasks (list[dict]): Задачи с полями id, user_id, scheduled_time
+            (datetime или строка).
+
+    Returns:
+        list[tuple[float, list]]: Пары (unix-время отправки, элементы
+        [task_id, chat_id, scheduled_time]).
+    """
+
+    groups: dict[int, list] = defaultdict(list)
+    for task in tasks:
+        scheduled_time = task["scheduled_time"]
+        if isinstance(scheduled_time, str):
+            scheduled_time = datetime.fromisoformat(scheduled_time)
+        groups[int(scheduled_time.timestamp())].append(
+            [str(task["id"]), task["user_id"], str(task["scheduled_time"])]
+        )
+
+    return [
+        (due_second, items[i : i + REMINDER_BATCH_MAX])
+        for due_second, items in groups.items()
+        for i in range(0, len(items), REMINDER_BATCH_MAX)
+    ]
+
+
+def publish_reminders(tasks: list[dict], now: datetime) -> int:
+    """
+    Публикует пачку напоминаний в брокер Celery через одно соединение.
+
+    Напоминания с одинаковой секундой отправки объединяются в одну
+    пакетную задачу send_task_reminders_batch_task, одиночные
+    отправляются обычной send_task_reminder_task.
+
+    Функция синхронная (kombu блокирует поток на время записи в Redis),
+    поэтому вызывается в executor'е, не блокируя event loop.
+
+    Args:
+        tasks (list[dict]): Пачка задач с полями id, user_id, scheduled_time.
+        now (datetime): Текущее время (UTC).
+
+    Returns:
+        int: Количество опубликованных напоминаний.
+    """
+
+    with celery_app.producer_or_acquire() as producer:
+        for due_second, items in _coalesce_by_due_second(tasks):
+            countdown = max(0, due_second - now.timestamp())
+
+            # Создаём Celery-задачу. Celery её сериализует и отправляет в очередь Redis
+            if len(items) == 1:
+                send_task_reminder_task.apply_async(
+                    args=items[0], countdown=countdown, producer=producer
+                )
+            else:
+                send_task_reminders_batch_task.apply_async(
+                    args=[items], countdown=countdown, producer=producer
+                )
+
+    return len(tasks)
+
+
+async def add_reminders(tasks: list[dict]) -> int:
+    """
+    Добавляет напоминания в sorted set одним pipeline-запросом.
+
+    Если Redis недоступен, напоминания публикуются в Celery
+    с countdown (прежнее поведение).
+
+    Args:
+        tasks (list[dict]): Задачи с полями id, user_id, scheduled_time.
+
+    Returns:
+        int: Количество запланированных напоминаний.
+    """
+
+    if not tasks:
+        return 0
+
+    redis_client = get_redis_client()
+    if not redis_client:
+        loop = asyncio.get_running_loop()
+        now = datetime.now(timezone.utc)
+        return await loop.run_in_executor(None, publish_reminders, tasks, now)
+
+    mapping = {
+        _encode_reminder(task): task["scheduled_time"].timestamp() for task in tasks
+    }
+    await redis_client.zadd(REMINDERS_ZSET_KEY, mapping)
+
+    return len(tasks)
+
+
+async def remove_reminder(task: dict) -> None:
+    """
+    Удаляет напоминание задачи из sorted set (например, после выполнения).
+
+    Args:
+        task (dict): Задача с полями id, user_id, scheduled_time.
+    """
+
+    redis_client = get_redis_client()
+    if redis_client:
+        await redis_client.zrem(REMINDERS_ZSET_KEY, _encode_reminder(task))
+
+
+async def pop_due_reminders(now: datetime, limit: int = DISPATCH_BATCH_SIZE) -> list:
+    """
+    Атомарно переносит напоминания, время которых наступило, из sorted set
+    в REMINDERS_PROCESSING_KEY.
+
+    После публикации их нужно подтвердить (ack_reminders) или вернуть
+    в очередь (requeue_reminders).
+
+    Args:
+        now (datetime): Текущее время (UTC).
+        limit (int): Максимальный размер пачки.
+
+    Returns:
+        list[str]: Элементы sorted set созревших напоминаний.
+    """
+
+    redis_client = get_redis_client()
+    return await redis_client.eval(
+        POP_DUE_SCRIPT,
+        2,
+        REMINDERS_ZSET_KEY,
+        REMINDERS_PROCESSING_KEY,
+        now.timestamp(),
+        limit,
+    )
+
+
+async def ack_reminders(members: list[str]) -> None:
+    """
+    Удаляет опубликованные напоминания из REMINDERS_PROCESSING_KEY.
+
+    Args:
+        members (list[str]): Элементы sorted set.
+    """
+
+    await get_redis_client().zrem(REMINDERS_PROCESSING_KEY, *members)
+
+
+async def requeue_reminders(members: list[str]) -> None:
+    """
+    Возвращает напоминания из REMINDERS_PROCESSING_KEY в очередь
+    с исходным временем отправки.
+
+    Args:
+        members (list[str]): Элементы sorted set.
+    """
+
+    mapping = {
+        member: datetime.fromisoformat(
+            _decode_reminder(member)["scheduled_time"]
+        ).timestamp()
+        for member in members
+    }
+    async with get_redis_client().pipeline(transaction=True) as pipe:
+        pipe.zadd(REMINDERS_ZSET_KEY, mapping)
+        pipe.zrem(REMINDERS_PROCESSING_KEY, *members)
+        await pipe.execute()
+
+
+async def recover_stale_reminders(now: datetime) -> int:
+    """
+    Возвращает в очередь напоминания, извлечённые дольше
+    DISPATCH_PROCESSING_TIMEOUT секунд назад и не подтверждённые
+    (реплика упала до публикации).
+
+    Args:
+        now (datetime): Текущее время (UTC).
+
+    Returns:
+        int: Количество возвращённых напоминаний.
+    """
+
+    stale = await get_redis_client().zrangebyscore(
+        REMINDERS_PROCESSING_KEY,
+        "-inf",
+        now.timestamp() - DISPATCH_PROCESSING_TIMEOUT,
+    )
+    if stale:
+        logger.warning("Возврат в очередь неподтверждённых напоминаний: %s", len(stale))
+        await requeue_reminders(stale)
+    return len(stale)
+
+
+async def dispatch_due_reminders() -> int:
+    """
+    Выполняет один проход диспетчера: извлекает пачку созревших
+    напоминаний и ставит их в очередь Celery без задержки.
+
+    Returns:
+        int: Количество отправленных в Celery напоминаний.
+    """
+
+    now = datetime.now(timezone.utc)
+    await recover_stale_reminders(now)
+    members = await pop_due_reminders(now)
+    if not members:
+        return 0
+
+    due = [_decode_reminder(member) for member in members]
+    loop = asyncio.get_running_loop()
+    try:
+        published = await loop.run_in_executor(None, publish_reminders, due, now)
+    except Exception:
+        # Напоминания не теряются: следующий проход опубликует их снова
+        await requeue_reminders(members)
+        raise
+
+    await ack_reminders(members)
+    logger.debug("Диспетчер передал в Celery напоминаний: %s", published)
+
+    return published
+
+
+async def _run_dispatcher() -> None:
+    """
+    Бесконечный цикл диспетчера.
+
+    Если пачка заполнена целиком, следующий проход выполняется сразу,
+    иначе — после паузы DISPATCH_POLL_INTERVAL.
+    """
+
+    logger.info("Диспетчер напоминаний запущен")
+    while True:
+        try:
+            published = await dispatch_due_reminders()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Ошибка диспетчера напоминаний\n%s", e)
+            published = 0
+
+        if published < DISPATCH_BATCH_SIZE:
+            await asyncio.sleep(DISPATCH_POLL_INTERVAL)
+
+
+def start_dispatcher() -> None:
+    """
+    Запускает диспетчер напоминаний фоновой задачей в текущем event loop.
+    """
+
+    global _dispatcher_task
+    if not get_redis_client():
+        logger.warning("REDIS_URL не задан — диспетчер напоминаний не запущен")
+        return
+
+    if _dispatcher_task is None:
+        _dispatcher_task = asyncio.create_task(_run_dispatcher())
+
+
+async def stop_dispatcher() -> None:
+    """
+    Останавливает диспетчер напоминаний.
+    """
+
+    global _dispatcher_task
+    if _dispatcher_task is not None:
+        _dispatcher_task.cancel()
+        try:
+            await _dispatcher_task
+        except asyncio.CancelledError:
+            pass
+        _dispatcher_task = None
+        logger.info("Диспетчер напоминаний остановлен")
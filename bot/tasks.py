@@ -4,8 +4,14 @@ import asyncio
 from telegram import Bot
 
 from bot.celery_app import app
+from bot.worker import get_bot, run_async
 from app.logger import logger
-from database import get_task_by_id
+from database import get_task_by_id, get_tasks_by_ids
+from services.reminder_service import (
+    claim_reminder,
+    claim_reminders,
+    release_reminders,
+)
 from utils.tasks_utils import format_task
 from keyboard import task_actions
 
@@ -15,11 +21,74 @@ from keyboard import task_actions
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
 
+def _is_reminder_actual(task_db: dict | None, scheduled_time: str) -> bool:
+    """
+    Проверяет, что задача всё ещё ожидает напоминания на scheduled_time.
+
+    Args:
+        task_db (dict | None): Задача из БД.
+        scheduled_time (str): Время, на которое было запланировано напоминание.
+
+    Returns:
+        bool: True, если напоминание нужно отправить.
+    """
+
+    return bool(
+        task_db
+        and task_db.get("status") == "pending"
+        and str(task_db["scheduled_time"]) == scheduled_time
+    )
+
+
+async def _send_reminder_message(bot: Bot, task_db: dict, chat_id: int):
+    """
+    Формирует текст напоминания и отправляет его пользователю.
+
+    Args:
+        bot (Bot): Инициализированный Telegram-бот.
+        task_db (dict): Актуальная задача из БД.
+        chat_id (int): Telegram chat_id пользователя.
+    """
+
+    text = f"⏰ Напоминание!\n\n{format_task(task_db)}"
+    logger.info("Отправляется напоминание задачи %s", task_db["id"])
+
+    await bot.send_message(
+        chat_id=chat_id,
+        text=text,
+        reply_markup=task_actions(task_db["id"]),
+    )
+
+
+async def deliver_reminder(bot: Bot, task_id: str, chat_id: int, scheduled_time: str):
+    """
+    Проверяет актуальность задачи в БД и отправляет напоминание через bot.
+
+    Используется и Celery-задачей, и in-process колесом таймеров
+    (см. bot.reminder_wheel), которое отправляет через Application.bot.
+
+    Args:
+        bot (Bot): Инициализированный Telegram-бот.
+        task_id (str): Уникальный идентификатор задачи.
+        chat_id (int): Telegram chat_id пользователя.
+        scheduled_time (str): Время, на которое было запланировано напоминание.
+    """
+
+    task_db = await get_task_by_id(task_id)
+
+    if not _is_reminder_actual(task_db, scheduled_time):
+        logger.info("Задача %s уже выполнена или удалена", task_id)
+        return
+
+    await _send_reminder_message(bot, task_db, chat_id)
+
+
 async def _send_task_reminder(task_id: str, chat_id: int, scheduled_time: str):
     """
     Полностью асинхронная логика отправки напоминания.
 
     Эта функция выполняет всю "реальную" работу задачи:
+    - отбрасывает устаревшие копии по Redis-реестру напоминаний (без запроса к БД)
     - получает задачу из базы данных
     - проверяет её актуальность
     - формирует текст уведомления
@@ -43,25 +112,74 @@ async def _send_task_reminder(task_id: str, chat_id: int, scheduled_time: str):
             Celery-задачи в очередь, уведомление не будет отправлено.
     """
 
-    bot = Bot(token=os.getenv("TELEGRAM_TOKEN"))
-    task_db = await get_task_by_id(task_id)
+    # Копия устарела (время задачи изменено) или напоминание уже отправлено
+    claim = await claim_reminder(task_id, scheduled_time)
+    if claim == 0:
+        logger.info("Устаревшая копия напоминания задачи %s отброшена", task_id)
+        return
 
-    if (
-        not task_db
-        or task_db.get("status") != "pending"
-        or str(task_db["scheduled_time"]) != scheduled_time
-    ):
-        logger.info("Задача %s уже выполнена или удалена", task_id)
+    try:
+        bot = await get_bot()
+        await deliver_reminder(bot, task_id, chat_id, scheduled_time)
+    except Exception:
+        # Напоминание не отправлено — следующая копия сможет его отправить
+        if claim == 1:
+            await release_reminders([[task_id, chat_id, scheduled_time]])
+        raise
+
+
+async def _send_task_reminders_batch(reminders: list):
+    """
+    Асинхронная логика пакетной отправки напоминаний.
+
+    - одной pipeline-заявкой отбрасывает устаревшие копии (Redis-реестр);
+    - одним запросом WHERE id = ANY($1) получает все задачи пачки;
+    - конкурентно отправляет актуальные напоминания; частоту отправки
+      ограничивает TelegramRateLimiter бота (см. bot.rate_limiter).
+
+    Args:
+        reminders (list): Элементы [task_id, chat_id, scheduled_time].
+    """
+
+    claims = await claim_reminders(reminders)
+    candidates = [r for r, claim in zip(reminders, claims) if claim != 0]
+    if not candidates:
+        logger.info("Все напоминания пачки устарели")
         return
 
-    text = f"⏰ Напоминание!\n\n{format_task(task_db)}"
-    logger.info("Отправляется напоминание задачи %s", task_id)
+    # Заявки, которые нужно отменить, если напоминание не будет отправлено
+    claimed = [r for r, claim in zip(reminders, claims) if claim == 1]
 
-    await bot.send_message(
-        chat_id=chat_id,
-        text=text,
-        reply_markup=task_actions(task_id),
-    )
+    try:
+        tasks_db = {
+            str(task["id"]): task
+            for task in await get_tasks_by_ids(
+                [task_id for task_id, _, _ in candidates]
+            )
+        }
+        bot = await get_bot()
+    except Exception:
+        await release_reminders(claimed)
+        raise
+
+    failed = []
+
+    async def send_one(task_id: str, chat_id: int, scheduled_time: str):
+        task_db = tasks_db.get(task_id)
+        if not _is_reminder_actual(task_db, scheduled_time):
+            logger.info("Задача %s уже выполнена или удалена", task_id)
+            return
+
+        try:
+            await _send_reminder_message(bot, task_db, chat_id)
+        except Exception as e:
+            logger.exception(
+                "Ошибка при отправке напоминания для задачи %s\n%s", task_id, e
+            )
+            failed.append(task_id)
+
+    await asyncio.gather(*(send_one(*reminder) for reminder in candidates))
+    await release_reminders([r for r in claimed if r[0] in failed])
 
 
 @app.task
@@ -75,14 +193,13 @@ def send_task_reminder_task(task_id: str, chat_id: int, scheduled_time: str):
     Почему это нужно:
         - Celery по умолчанию выполняет задачи синхронно.
         - Основная логика проекта асинхронная (asyncpg, Telegram API).
-        - Поэтому здесь создаётся или используется event loop,
-          в котором запускается async-код.
+        - Поэтому async-код запускается в постоянном event loop
+          worker-процесса (см. bot.worker), где уже созданы бот
+          и пул соединений с БД.
 
     Алгоритм работы:
-        1. Получаем текущий event loop worker'а.
-        2. Если loop отсутствует — создаём новый.
-        3. Запускаем async-функцию через run_until_complete().
-        4. Логируем ошибки при сбоях.
+        1. Запускаем async-функцию в loop worker-процесса через run_async().
+        2. Логируем ошибки при сбоях.
 
     Args:
         task_id (str):
@@ -97,26 +214,42 @@ def send_task_reminder_task(task_id: str, chat_id: int, scheduled_time: str):
 
     Важно:
         - Каждая Celery-задача выполняется в отдельном worker-процессе.
-        - Event loop создаётся на уровне процесса.
+        - Event loop, бот и пул БД создаются один раз на процесс.
         - Ошибки не "роняют" worker, а логируются.
     """
 
     logger.info("Task запущена")
 
     try:
-        # используем текущий loop Celery или создаём новый, если нет
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
         # Запускаем асинхронную логику отправки уведомления и блокируем выполнение до её завершения.
         # Если не блокировать выполнение, Celery завершит задачу мгновенно,
         # async-код может не выполниться вообще или упасть без логов
-        loop.run_until_complete(_send_task_reminder(task_id, chat_id, scheduled_time))
+        run_async(_send_task_reminder(task_id, chat_id, scheduled_time))
 
     except Exception as e:
         logger.exception(
             "Ошибка при отправке напоминания для задачи %s\n%s", task_id, e
         )
+
+
+@app.task
+def send_task_reminders_batch_task(reminders: list):
+    """
+    Пакетная Celery-задача: отправляет несколько напоминаний за один вызов.
+
+    Используется для напоминаний, у которых совпадает секунда отправки
+    (например, много задач на "завтра 9:00"): вместо отдельного сообщения
+    брокера, запроса к БД и задачи worker'а на каждое напоминание вся
+    пачка обрабатывается одним вызовом (см. _send_task_reminders_batch).
+
+    Args:
+        reminders (list):
+            Элементы [task_id, chat_id, scheduled_time].
+    """
+
+    logger.info("Пакетная task запущена, напоминаний: %s", len(reminders))
+
+    try:
+        run_async(_send_task_reminders_batch(reminders))
+    except Exception as e:
+        logger.exception("Ошибка при пакетной отправке напоминаний\n%s", e)
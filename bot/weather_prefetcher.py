@@ -0,0 +1,216 @@
+"""
+Фоновый прогрев кэша погоды для сохранённых пользователями городов.
+
+Без прогрева погода загружается только по запросу, и первый запрос
+после истечения записи ждёт wttr.in. Прогреватель в процессе бота раз в
+WEATHER_PREFETCH_INTERVAL секунд:
+- переносит накопленные счётчики запросов погоды в общий рейтинг (Redis ZSET);
+- берёт сохранённые города из БД и упорядочивает их по популярности;
+- обновляет записи, которые вот-вот перестанут быть свежими, —
+  не более WEATHER_PREFETCH_BUDGET запросов к wttr.in за проход.
+
+Проход выполняет одна реплика: право на него даёт ключ
+WEATHER_PREFETCH_LOCK_KEY (SET NX) со сроком жизни в один интервал.
+"""
+
+import time
+import asyncio
+
+from app.logger import logger
+from app.redis_client import get_redis_client
+from database import get_saved_cities
+from utils.weather_utils import city_key
+from services.weather_service import (
+    pop_city_requests,
+    refresh_weather,
+    track_city_requests,
+    weather_needs_refresh,
+)
+from constants.cache_constants import (
+    WEATHER_PREFETCH_INTERVAL,
+    WEATHER_PREFETCH_LEAD,
+    WEATHER_PREFETCH_BUDGET,
+    WEATHER_PREFETCH_CONCURRENCY,
+    WEATHER_PREFETCH_LOCK_KEY,
+    WEATHER_PREFETCH_MAX_CITIES,
+    WEATHER_PREFETCH_RANK_TTL,
+    WEATHER_POPULARITY_KEY,
+    WEATHER_POPULARITY_DECAY_KEY,
+)
+
+_prefetcher_task: asyncio.Task | None = None  # Фоновая задача прогревателя
+
+# Рейтинг городов в памяти и время его построения (time.monotonic)
+_ranked_cities: list[str] = []
+_ranked_at: float | None = None
+
+
+async def flush_city_requests(redis_client) -> int:
+    """
+    Переносит счётчики запросов погоды этого процесса в общий рейтинг.
+
+    Args:
+        redis_client: Клиент Redis.
+
+    Returns:
+        int: Количество городов, по которым были запросы.
+    """
+
+    counts = pop_city_requests()
+    if not counts:
+        return 0
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for city, requests in counts.items():
+            pipe.zincrby(WEATHER_POPULARITY_KEY, requests, city)
+        await pipe.execute()
+    return len(counts)
+
+
+async def rank_cities(redis_client) -> list[str]:
+    """
+    Упорядочивает сохранённые города по популярности.
+
+    Города сортируются по числу недавних запросов погоды, при равенстве —
+    по числу пользователей, сохранивших город. Раз в
+    WEATHER_PREFETCH_RANK_TTL секунд счётчики запросов уменьшаются вдвое.
+
+    Args:
+        redis_client: Клиент Redis.
+
+    Returns:
+        list[str]: Названия городов (по одному на ключ кэша).
+    """
+
+    rows = await get_saved_cities(WEATHER_PREFETCH_MAX_CITIES)
+    if not rows:
+        return []
+
+    # Разные написания одного города объединяются по ключу кэша
+    users: dict[str, int] = {}
+    names: dict[str, str] = {}
+    for row in rows:
+        key = city_key(row["city"])
+        users[key] = users.get(key, 0) + row["users"]
+        names.setdefault(key, row["city"])
+
+    keys = list(users)
+    scores = await redis_client.zmscore(WEATHER_POPULARITY_KEY, keys)
+
+    if await redis_client.set(
+        WEATHER_POPULARITY_DECAY_KEY, 1, nx=True, ex=WEATHER_PREFETCH_RANK_TTL
+    ):
+        await redis_client.zunionstore(
+            WEATHER_POPULARITY_KEY, {WEATHER_POPULARITY_KEY: 0.5}
+        )
+
+    ranked = sorted(
+        zip(keys, scores),
+        key=lambda item: (item[1] or 0, users[item[0]]),
+        reverse=True,
+    )
+    return [names[key] for key, _ in ranked]
+
+
+async def _get_ranked_cities(redis_client) -> list[str]:
+    """
+    Возвращает рейтинг городов, перестраивая его не чаще раза в
+    WEATHER_PREFETCH_RANK_TTL секунд.
+    """
+
+    global _ranked_cities, _ranked_at
+
+    now = time.monotonic()
+    if _ranked_at is None or now - _ranked_at >= WEATHER_PREFETCH_RANK_TTL:
+        _ranked_cities = await rank_cities(redis_client)
+        _ranked_at = now
+    return _ranked_cities
+
+
+async def prefetch_weather() -> int:
+    """
+    Выполняет один проход прогрева кэша погоды.
+
+    Returns:
+        int: Количество городов, для которых получены свежие данные.
+    """
+
+    redis_client = get_redis_client()
+    await flush_city_requests(redis_client)
+
+    # Проход выполняет одна реплика за интервал
+    if not await redis_client.set(
+        WEATHER_PREFETCH_LOCK_KEY, 1, nx=True, ex=WEATHER_PREFETCH_INTERVAL
+    ):
+        return 0
+
+    due = []
+    for city in await _get_ranked_cities(redis_client):
+        if len(due) >= WEATHER_PREFETCH_BUDGET:
+            break
+        if await weather_needs_refresh(city, WEATHER_PREFETCH_LEAD):
+            due.append(city)
+
+    if not due:
+        return 0
+
+    semaphore = asyncio.Semaphore(WEATHER_PREFETCH_CONCURRENCY)
+
+    async def refresh(city: str) -> bool:
+        async with semaphore:
+            return await refresh_weather(city)
+
+    results = await asyncio.gather(*map(refresh, due), return_exceptions=True)
+    refreshed = sum(result is True for result in results)
+    logger.info("Прогрев погоды: обновлено %s из %s городов", refreshed, len(due))
+
+    return refreshed
+
+
+async def _run_prefetcher() -> None:
+    """
+    Бесконечный цикл прогревателя с паузой WEATHER_PREFETCH_INTERVAL.
+    """
+
+    logger.info("Прогрев кэша погоды запущен")
+    while True:
+        try:
+            await prefetch_weather()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Ошибка прогрева кэша погоды\n%s", e)
+
+        await asyncio.sleep(WEATHER_PREFETCH_INTERVAL)
+
+
+def start_weather_prefetcher() -> None:
+    """
+    Запускает прогрев кэша погоды фоновой задачей в текущем event loop.
+    """
+
+    global _prefetcher_task
+    if not get_redis_client():
+        logger.warning("REDIS_URL не задан — прогрев кэша погоды не запущен")
+        return
+
+    if _prefetcher_task is None:
+        track_city_requests(True)
+        _prefetcher_task = asyncio.create_task(_run_prefetcher())
+
+
+async def stop_weather_prefetcher() -> None:
+    """
+    Останавливает прогрев кэша погоды.
+    """
+
+    global _prefetcher_task
+    if _prefetcher_task is not None:
+        _prefetcher_task.cancel()
+        try:
+            await _prefetcher_task
+        except asyncio.CancelledError:
+            pass
+        _prefetcher_task = None
+        track_city_requests(False)
+        logger.info("Прогрев кэша погоды остановлен")
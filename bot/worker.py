@@ -0,0 +1,140 @@
+"""
+Ресурсы Celery worker-процесса.
+
+Каждый worker-процесс создаёт один раз (по сигналу worker_process_init):
+- собственный event loop;
+- инициализированный бот с пулом HTTP-соединений и общим
+  ограничителем частоты запросов (см. bot.rate_limiter);
+- пул соединений asyncpg, созданный внутри этого loop.
+
+Все задачи процесса переиспользуют эти ресурсы, поэтому отправка
+напоминания — это один HTTP-запрос по уже открытому соединению,
+без создания бота, TLS-рукопожатия и подключения к БД на каждую задачу.
+Ресурсы освобождаются по сигналу worker_process_shutdown.
+"""
+
+import os
+import asyncio
+from typing import Any, Coroutine
+from celery.signals import worker_process_init, worker_process_shutdown
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from app.logger import logger
+from bot.rate_limiter import TelegramRateLimiter
+from constants.reminder_constants import WORKER_HTTP_POOL_SIZE
+from database import get_pool, close_db
+
+_loop: asyncio.AbstractEventLoop | None = None  # Event loop worker-процесса
+_bot: ExtBot | None = None  # Инициализированный бот worker-процесса
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Возвращает event loop worker-процесса, создавая его при первом обращении.
+
+    Returns:
+        asyncio.AbstractEventLoop: Event loop процесса.
+    """
+
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Выполняет корутину в event loop worker-процесса и возвращает результат.
+
+    Args:
+        coro (Coroutine): Корутина для выполнения.
+
+    Returns:
+        Any: Результат корутины.
+    """
+
+    return get_loop().run_until_complete(coro)
+
+
+async def get_bot() -> ExtBot:
+    """
+    Возвращает инициализированный бот worker-процесса.
+
+    При запуске worker'а без prefork-пула (например, --pool=solo)
+    сигнал worker_process_init не приходит, поэтому бот и пул БД
+    создаются лениво при первой задаче.
+
+    Запросы бота проходят через TelegramRateLimiter, поэтому worker'ы
+    делят с процессом бота общие лимиты Telegram.
+
+    Returns:
+        ExtBot: Инициализированный Telegram-бот.
+    """
+
+    global _bot
+    if _bot is None:
+        bot = ExtBot(
+            token=os.getenv("TELEGRAM_TOKEN"),
+            request=HTTPXRequest(connection_pool_size=WORKER_HTTP_POOL_SIZE),
+            rate_limiter=TelegramRateLimiter(),
+        )
+        await bot.initialize()
+        _bot = bot
+    return _bot
+
+
+async def _init_resources() -> None:
+    """
+    Создаёт бота и пул соединений с БД внутри loop worker-процесса.
+    """
+
+    await get_bot()
+    await get_pool()
+
+
+async def _close_resources() -> None:
+    """
+    Закрывает HTTP-клиент бота и пул соединений с БД.
+    """
+
+    global _bot
+    if _bot is not None:
+        await _bot.shutdown()
+        _bot = None
+    await close_db()
+
+
+@worker_process_init.connect
+def on_worker_process_init(**_):
+    """
+    Инициализирует ресурсы при старте worker-процесса.
+    """
+
+    logger.info("Инициализация ресурсов worker-процесса %s", os.getpid())
+    try:
+        run_async(_init_resources())
+    except Exception as e:
+        # Не роняем процесс: ресурсы будут созданы лениво при первой задаче
+        logger.exception("Ошибка инициализации ресурсов worker-процесса\n%s", e)
+
+
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**_):
+    """
+    Освобождает ресурсы при остановке worker-процесса.
+    """
+
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    logger.info("Освобождение ресурсов worker-процесса %s", os.getpid())
+    try:
+        run_async(_close_resources())
+    except Exception as e:
+        logger.exception("Ошибка освобождения ресурсов worker-процесса\n%s", e)
+    finally:
+        _loop.close()
+        _loop = None
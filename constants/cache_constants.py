@@ -0,0 +1,71 @@
+"""
+Модуль с константами кэширования.
+
+Содержит размеры и время жизни локальных (in-process) кэшей
+и ключи/TTL их уровня в Redis.
+"""
+
+# Кэш задач пользователя (ближайшая задача, страницы списка задач).
+# Локальный уровень: на сколько пользователей хранить данные и сколько секунд.
+# Короткий TTL ограничивает расхождение между репликами бота,
+# свои записи инвалидируются сразу.
+TASKS_LOCAL_CACHE_SIZE = 10_000
+TASKS_LOCAL_CACHE_TTL = 30
+
+# Уровень Redis: hash на пользователя (поле — представление списка задач).
+# Инвалидируется удалением ключа при любой записи задач пользователя.
+TASKS_CACHE_PREFIX = "tasks:cache:"
+TASKS_REDIS_CACHE_TTL = 300
+
+# Кэш профилей пользователей (сохранённый город для погоды).
+# Город меняется только через services.users_service (write-through),
+# поэтому TTL ограничивает лишь расхождение между репликами бота.
+USERS_CACHE_SIZE = 50_000
+USERS_CACHE_TTL = 600
+
+# Кэш погоды (stale-while-revalidate). Запись свежая WEATHER_SOFT_TTL
+# секунд; после этого она ещё отдаётся пользователю сразу, а обновление
+# запускается в фоне. Только после WEATHER_HARD_TTL (срок жизни ключа
+# в Redis) пользователь ждёт запроса к wttr.in. Локальный LRU перед Redis
+# хранит запись не дольше оставшегося TTL ключа в Redis.
+WEATHER_CACHE_PREFIX = "weather:"
+WEATHER_SOFT_TTL = 600
+WEATHER_HARD_TTL = 6 * 3600
+WEATHER_LOCAL_CACHE_SIZE = 1000
+
+# Таблица псевдонимов городов: ключ написания (нормализованное и
+# транслитерированное название) -> канонический ключ по nearest_area wttr.in.
+# Хранится в Redis (по ключу на написание) и в памяти процесса.
+WEATHER_ALIAS_PREFIX = "weather:alias:"
+WEATHER_ALIAS_TTL = 30 * 24 * 3600
+WEATHER_ALIAS_CACHE_SIZE = 10_000
+
+# Блокировка загрузки погоды между репликами (single-flight): при промахе
+# к wttr.in обращается только владелец блокировки, остальные опрашивают
+# кэш раз в WEATHER_LOCK_POLL_INTERVAL секунд. TTL блокировки совпадает
+# с общим таймаутом запроса к wttr.in.
+WEATHER_LOCK_PREFIX = "weather:lock:"
+WEATHER_LOCK_TTL = 60
+WEATHER_LOCK_POLL_INTERVAL = 0.2
+
+# Фоновый прогрев кэша погоды для сохранённых городов (bot/weather_prefetcher.py).
+# Раз в WEATHER_PREFETCH_INTERVAL секунд одна из реплик обновляет записи,
+# которым осталось быть свежими меньше WEATHER_PREFETCH_LEAD секунд,
+# не более WEATHER_PREFETCH_BUDGET запросов к wttr.in за проход.
+# Ключи служебных данных содержат ":" после префикса, поэтому не пересекаются
+# с ключами городов (в названии города двоеточие недопустимо).
+WEATHER_PREFETCH_INTERVAL = 60
+WEATHER_PREFETCH_LEAD = 120
+WEATHER_PREFETCH_BUDGET = 20
+WEATHER_PREFETCH_CONCURRENCY = 4
+WEATHER_PREFETCH_LOCK_KEY = "weather:meta:prefetch_lock"
+
+# Рейтинг городов: сохранённые пользователями города (не больше
+# WEATHER_PREFETCH_MAX_CITIES) упорядочиваются по числу запросов погоды.
+# Счётчики запросов хранятся в Redis sorted set и раз в
+# WEATHER_PREFETCH_RANK_TTL секунд уменьшаются вдвое, поэтому рейтинг
+# отражает недавнюю популярность. Столько же живёт список городов в памяти.
+WEATHER_PREFETCH_MAX_CITIES = 200
+WEATHER_PREFETCH_RANK_TTL = 600
+WEATHER_POPULARITY_KEY = "weather:meta:popularity"
+WEATHER_POPULARITY_DECAY_KEY = "weather:meta:popularity_decay"
@@ -0,0 +1,24 @@
+"""
+Модуль с параметрами пула соединений asyncpg (см. database.get_pool).
+
+Пул создаётся в каждом процессе отдельно, поэтому к PostgreSQL открыто
+до DB_POOL_MAX_SIZE соединений на процесс: при масштабировании worker'ов
+сумма должна укладываться в max_connections сервера.
+"""
+
+import os
+
+# Минимальное и максимальное количество соединений в пуле asyncpg
+# (в каждом процессе: боте и каждом worker'е Celery).
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+
+# Через сколько секунд простоя соединение пула закрывается (0 — никогда).
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", "300"))
+
+# Размер кэша подготовленных выражений на соединение.
+# Должен вмещать все выражения из database.STATEMENTS.
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+# Таймаут выполнения одного запроса, секунд.
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))
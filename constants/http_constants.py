@@ -0,0 +1,25 @@
+"""
+Модуль с параметрами общего HTTP-клиента (см. app.http_client).
+
+Лимиты задают размер пула keep-alive соединений одной сессии aiohttp
+на процесс: запросы сверх лимита ждут свободного соединения,
+а не открывают новые.
+"""
+
+import os
+
+# Максимальное количество одновременных соединений (всего и на один хост).
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+
+# Сколько секунд держать простаивающее keep-alive соединение открытым.
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+# Время жизни записей DNS-кэша, секунд.
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+
+# Общий таймаут запроса по умолчанию, секунд
+# (отдельные сервисы могут передавать свой timeout в запрос).
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+HTTP_USER_AGENT = "Mozilla/5.0"
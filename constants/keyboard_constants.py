@@ -9,3 +9,12 @@
 # Если название задачи длиннее, оно будет обрезаться до MAX_TASK_LENGTH символов
 # и добавляться многоточие. Используется в tasks_inline_menu().
 MAX_TASK_LENGTH = 15
+
+# Количество задач на одной странице списка "Все задачи".
+# Список листается кнопками ◀️/▶️ (keyset-пагинация по (scheduled_time, id)).
+TASKS_PAGE_SIZE = 8
+
+# Префиксы callback_data кнопок листания списка задач. Короткие, чтобы
+# вместе с курсором (время в микросекундах и uuid) уложиться в 64 байта.
+TASKS_NEXT_PREFIX = "tn:"
+TASKS_PREV_PREFIX = "tp:"
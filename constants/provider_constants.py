@@ -0,0 +1,40 @@
+"""
+Модуль с параметрами провайдеров погоды (см. services.weather_providers).
+
+Содержит порядок опроса провайдеров и их адреса, задержку хеджирования
+(дублирования медленного запроса следующему провайдеру) и пороги оценки
+здоровья, по которым недоступный провайдер уходит в конец очереди.
+"""
+
+import os
+
+# Провайдеры погоды в порядке предпочтения (через запятую):
+# wttr — wttr.in, open-meteo — Open-Meteo, stub — локальная заглушка
+# (python -m benchmarks.weather_stub_server) для тестов и бенчмарков.
+WEATHER_PROVIDERS = [
+    name.strip()
+    for name in os.getenv("WEATHER_PROVIDERS", "wttr,open-meteo").split(",")
+    if name.strip()
+]
+
+WTTR_BASE_URL = os.getenv("WTTR_BASE_URL", "https://wttr.in")
+OPEN_METEO_GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+WEATHER_STUB_URL = os.getenv("WEATHER_STUB_URL", "http://127.0.0.1:8081")
+
+# Количество попыток запроса к одному провайдеру (с exponential backoff).
+WEATHER_PROVIDER_RETRIES = int(os.getenv("WEATHER_PROVIDER_RETRIES", "5"))
+
+# Хеджирование: если провайдер не ответил за p95 своих последних задержек,
+# тот же запрос отправляется следующему провайдеру. Пока замеров меньше
+# WEATHER_HEDGE_MIN_SAMPLES, ждём WEATHER_HEDGE_DELAY секунд.
+WEATHER_HEDGE_DELAY = float(os.getenv("WEATHER_HEDGE_DELAY", "2"))
+WEATHER_HEDGE_MIN_DELAY = 0.1
+WEATHER_HEDGE_MIN_SAMPLES = 20
+
+# Оценка здоровья: окно последних запросов к провайдеру; после
+# WEATHER_PROVIDER_MAX_FAILURES ошибок подряд провайдер переносится в конец
+# очереди на WEATHER_PROVIDER_COOLDOWN секунд.
+WEATHER_PROVIDER_WINDOW = 100
+WEATHER_PROVIDER_MAX_FAILURES = 3
+WEATHER_PROVIDER_COOLDOWN = 30
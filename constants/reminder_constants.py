@@ -0,0 +1,54 @@
+"""
+Модуль с константами для планирования напоминаний.
+
+Содержит параметры восстановления напоминаний при старте бота.
+"""
+
+# Размер пачки задач при восстановлении напоминаний.
+# Столько строк за раз читается серверным курсором из БД
+# и записывается в Redis sorted set REMINDERS_ZSET_KEY одним pipeline
+# (в режиме REMINDER_ENGINE=wheel — в in-process колесо таймеров).
+RESTORE_BATCH_SIZE = 1000
+
+# Префикс ключей Redis-реестра поставленных в очередь напоминаний.
+# Значение ключа — scheduled_time, на которое напоминание уже поставлено
+# (или "sent:<scheduled_time>", если напоминание уже отправлено).
+REMINDER_MARKER_PREFIX = "reminder:enqueued:"
+
+# Сколько секунд маркер живёт после scheduled_time.
+# Нужен запас, чтобы опоздавшие копии сообщения в брокере
+# всё ещё видели маркер и отбрасывались без запроса к БД.
+REMINDER_MARKER_GRACE = 24 * 60 * 60
+
+# Ключ Redis sorted set с будущими напоминаниями (score — unix-время отправки).
+REMINDERS_ZSET_KEY = "reminders:due"
+
+# Ключ Redis sorted set с напоминаниями, извлечёнными диспетчером, но ещё
+# не опубликованными в Celery (score — unix-время извлечения).
+REMINDERS_PROCESSING_KEY = "reminders:processing"
+
+# Через сколько секунд неподтверждённое извлечение (реплика упала между
+# извлечением и публикацией) возвращается в REMINDERS_ZSET_KEY.
+DISPATCH_PROCESSING_TIMEOUT = 60
+
+# Максимальное количество напоминаний, извлекаемых диспетчером за один проход.
+DISPATCH_BATCH_SIZE = 500
+
+# Пауза диспетчера (в секундах), если созревших напоминаний нет.
+# Ограничивает задержку отправки сверху независимо от горизонта планирования.
+DISPATCH_POLL_INTERVAL = 1.0
+
+# Длительность тика in-process колеса таймеров (в секундах).
+# Определяет точность срабатывания напоминаний в режиме REMINDER_ENGINE=wheel.
+WHEEL_TICK = 0.1
+
+# Количество слотов на уровне колеса и количество уровней.
+# 64 слота x 6 уровней при тике 0.1 с покрывают горизонт ~2000 лет.
+WHEEL_SIZE = 64
+WHEEL_LEVELS = 6
+
+# Размер пула HTTP-соединений Telegram-бота в одном Celery worker-процессе.
+WORKER_HTTP_POOL_SIZE = 8
+
+# Максимальное количество напоминаний в одной пакетной Celery-задаче.
+REMINDER_BATCH_MAX = 100
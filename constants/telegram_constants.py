@@ -0,0 +1,22 @@
+"""
+Модуль с константами ограничений Telegram Bot API.
+
+Лимиты соответствуют рекомендациям Telegram: около 30 сообщений в секунду
+на бота, около 1 сообщения в секунду в один чат и 20 сообщений в минуту в группу.
+"""
+
+# Глобальный лимит исходящих сообщений бота (сообщений в секунду).
+TELEGRAM_GLOBAL_RATE = 30
+
+# Лимит сообщений в один личный чат (сообщений в секунду) и допустимый всплеск.
+TELEGRAM_CHAT_RATE = 1
+TELEGRAM_CHAT_BURST = 3
+
+# Лимит сообщений в одну группу (сообщений в секунду).
+TELEGRAM_GROUP_RATE = 20 / 60
+
+# Сколько раз повторять запрос после ответа 429 RetryAfter.
+TELEGRAM_MAX_RETRIES = 3
+
+# Префикс ключей Redis, через которые процессы делят лимиты.
+TELEGRAM_RATE_PREFIX = "telegram:rate:"
@@ -2,7 +2,9 @@
 Модуль с константами для перевода погодных условий.
 
 Содержит словарь WEATHER_TRANSLATIONS, который служит
-для перевода англоязычных описаний погоды на русский язык.
+для перевода англоязычных описаний погоды на русский язык,
+таблицу транслитерации названий городов CYRILLIC_TO_LATIN
+и описания кодов погоды WMO_WEATHER_CODES (провайдер Open-Meteo).
 """
 
 WEATHER_TRANSLATIONS = {
@@ -57,3 +59,73 @@ WEATHER_TRANSLATIONS = {
     "Freezing fog": "Ледяной туман",
     "Partly Sunny": "Переменная облачность с солнцем",
 }
+
+# Транслитерация кириллицы для ключей кэша погоды: "Москва" и "Moskva"
+# дают один ключ "moskva". Буква "ё" заранее заменяется на "е".
+CYRILLIC_TO_LATIN = {
+    "а": "a",
+    "б": "b",
+    "в": "v",
+    "г": "g",
+    "д": "d",
+    "е": "e",
+    "ж": "zh",
+    "з": "z",
+    "и": "i",
+    "й": "y",
+    "к": "k",
+    "л": "l",
+    "м": "m",
+    "н": "n",
+    "о": "o",
+    "п": "p",
+    "р": "r",
+    "с": "s",
+    "т": "t",
+    "у": "u",
+    "ф": "f",
+    "х": "kh",
+    "ц": "ts",
+    "ч": "ch",
+    "ш": "sh",
+    "щ": "shch",
+    "ъ": "",
+    "ы": "y",
+    "ь": "",
+    "э": "e",
+    "ю": "yu",
+    "я": "ya",
+}
+
+# Коды погоды WMO (Open-Meteo) -> англоязычные описания в стиле wttr.in,
+# для которых есть перевод в WEATHER_TRANSLATIONS.
+WMO_WEATHER_CODES = {
+    0: "Clear",
+    1: "Clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Freezing fog",
+    51: "Light drizzle",
+    53: "Light drizzle",
+    55: "Light drizzle",
+    56: "Light freezing rain",
+    57: "Light freezing rain",
+    61: "Light rain",
+    63: "Moderate rain",
+    65: "Heavy rain",
+    66: "Light freezing rain",
+    67: "Light freezing rain",
+    71: "Light snow",
+    73: "Moderate snow",
+    75: "Heavy snow",
+    77: "Snow",
+    80: "Rain showers",
+    81: "Rain showers",
+    82: "Heavy rain",
+    85: "Snow shower",
+    86: "Heavy snow shower",
+    95: "Thunderstorm",
+    96: "Thunderstorms",
+    99: "Thunderstorms",
+}
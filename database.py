@@ -1,10 +1,21 @@
 import os
+import time
 import asyncpg
 from urllib.parse import urlparse
+from contextlib import asynccontextmanager
+from uuid import UUID
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, AsyncIterator
 
 from app.logger import logger
+from migrations import apply_migrations
+from constants.database_constants import (
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_INACTIVE_LIFETIME,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_COMMAND_TIMEOUT,
+)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -18,36 +29,83 @@ if not DATABASE_URL:
 
 _pool: Optional[asyncpg.pool.Pool] = None  # Пул соединений с базой данных
 
+# Статистика ожидания соединения из пула и задержек запросов реестра
+_pool_stats = {"acquires": 0, "total_wait": 0.0, "max_wait": 0.0}
+_query_stats: Dict[str, Dict] = {}
+
+# Запросы выборки pending-задач (используются в функциях ниже
+# и в проверке планов запросов benchmarks/query_plan_check.py)
+NEAREST_TASK_SQL = """
+    SELECT * FROM tasks
+    WHERE user_id = $1 AND status = 'pending'
+    ORDER BY scheduled_time
+    LIMIT 1
+"""
+
+USER_TASKS_SQL = """
+    SELECT * FROM tasks
+    WHERE user_id = $1 AND status = 'pending'
+    ORDER BY scheduled_time
+"""
+
+# Постраничный список задач пользователя: keyset-пагинация по
+# (scheduled_time, id). Каждая страница — ограниченный диапазон индекса
+# tasks_user_pending_page_idx независимо от общего числа задач.
+USER_TASKS_FIRST_PAGE_SQL = """
+    SELECT * FROM tasks
+    WHERE user_id = $1 AND status = 'pending'
+    ORDER BY scheduled_time, id
+    LIMIT $2
+"""
+
+USER_TASKS_PAGE_AFTER_SQL = """
+    SELECT * FROM tasks
+    WHERE user_id = $1 AND status = 'pending'
+      AND (scheduled_time, id) > ($2, $3)
+    ORDER BY scheduled_time, id
+    LIMIT $4
+"""
+
+USER_TASKS_PAGE_BEFORE_SQL = """
+    SELECT * FROM tasks
+    WHERE user_id = $1 AND status = 'pending'
+      AND (scheduled_time, id) < ($2, $3)
+    ORDER BY scheduled_time DESC, id DESC
+    LIMIT $4
+"""
+
+FUTURE_PENDING_TASKS_SQL = """
+    SELECT id, user_id, scheduled_time
+    FROM tasks
+    WHERE status = 'pending' AND scheduled_time > now()
+"""
+
 
 async def init_db() -> None:
     """
-    Инициализация базы данных и создание необходимых таблиц.
+    Инициализация базы данных: создание пула и применение миграций схемы.
+
+    Если схема актуальна, выполняется только чтение её версии
+    (см. migrations.apply_migrations).
+
+    Миграции выполняются на отдельном соединении без command_timeout
+    и statement_timeout: построение индексов CONCURRENTLY, заполнение
+    столбцов и ожидание advisory lock другой реплики на большой таблице
+    длятся дольше DB_COMMAND_TIMEOUT, а прерванная сборка индекса оставляет
+    невалидный индекс.
     """
-    global _pool
-    if _pool is None:
-        # Создаём пул внутри текущего loop
-        _pool = await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=5)  # type: ignore
+    conn = await asyncpg.connect(
+        DATABASE_URL,
+        command_timeout=None,
+        server_settings={"statement_timeout": "0"},
+    )
+    try:
+        await apply_migrations(conn)
+    finally:
+        await conn.close()
 
-    pool = _pool
-    # Получаем соединение из пула для создания таблиц
-    async with pool.acquire() as conn:
-        # Создание таблицы задач
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                title TEXT NOT NULL,
-                scheduled_time TIMESTAMPTZ NOT NULL,
-                status TEXT NOT NULL
-            )
-        """)
-        # Создание таблицы пользователей
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id BIGINT PRIMARY KEY,
-                city TEXT
-            )
-        """)
+    # Пул создаётся внутри текущего loop
+    await get_pool()
 
 
 async def get_pool() -> asyncpg.pool.Pool:
@@ -62,64 +120,235 @@ async def get_pool() -> asyncpg.pool.Pool:
     global _pool
     if _pool is None:
         logger.debug("Пул не создан, создаём автоматически...")
-        _pool = await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=5)  # type: ignore
+        if DB_STATEMENT_CACHE_SIZE < len(STATEMENTS):
+            logger.warning(
+                "DB_STATEMENT_CACHE_SIZE=%s меньше числа выражений реестра (%s)",
+                DB_STATEMENT_CACHE_SIZE,
+                len(STATEMENTS),
+            )
+        _pool = await asyncpg.create_pool(
+            DATABASE_URL,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+            command_timeout=DB_COMMAND_TIMEOUT,
+        )  # type: ignore
     return _pool
 
 
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    """
+    Берёт соединение из пула, учитывая время ожидания в статистике.
+
+    Yields:
+        asyncpg.Connection: Соединение из пула
+    """
+    pool = await get_pool()
+    start = time.perf_counter()
+    async with pool.acquire() as conn:
+        wait = time.perf_counter() - start
+        _pool_stats["acquires"] += 1
+        _pool_stats["total_wait"] += wait
+        _pool_stats["max_wait"] = max(_pool_stats["max_wait"], wait)
+        yield conn
+
+
 async def close_db() -> None:
     """
     Закрывает все соединения в пуле базы данных и очищает глобальную переменную _pool.
     """
     global _pool
     if _pool:
+        logger.info("Статистика БД: %s", get_db_stats())
         await _pool.close()
         _pool = None
         logger.debug("Завершение всех соединений пула соединений с %s", DATABASE_URL)
 
 
+def get_db_stats() -> Dict:
+    """
+    Возвращает статистику пула соединений и задержек запросов.
+
+    Returns:
+        Dict: Словарь с ключами pool (размер пула, количество захватов
+        соединения, среднее и максимальное ожидание, секунды) и queries
+        (по имени выражения реестра: количество вызовов, средняя
+        и максимальная задержка, секунды)
+    """
+    acquires = _pool_stats["acquires"]
+    pool = {
+        "size": _pool.get_size() if _pool else 0,
+        "idle": _pool.get_idle_size() if _pool else 0,
+        "max_size": DB_POOL_MAX_SIZE,
+        "acquires": acquires,
+        "avg_wait": _pool_stats["total_wait"] / acquires if acquires else 0.0,
+        "max_wait": _pool_stats["max_wait"],
+    }
+    queries = {
+        name: {
+            "calls": stats["calls"],
+            "avg": stats["total"] / stats["calls"],
+            "max": stats["max"],
+        }
+        for name, stats in _query_stats.items()
+    }
+    return {"pool": pool, "queries": queries}
+
+
 # ---------------------------
 # Функции работы с задачами
 # ---------------------------
 
 
-async def add_task(task_id: str, user_id: int, title: str, scheduled_time: datetime):
+# Запись задач возвращает изменённую строку через RETURNING, поэтому
+# сервисному слою не нужен повторный SELECT (используются и в
+# benchmarks/write_roundtrip_benchmark.py).
+# Операции из кнопок пользователя проверяют владельца в том же запросе
+# (user_id в WHERE): одна операция — один round-trip без гонки между
+# проверкой и записью.
+ADD_TASK_SQL = """
+    INSERT INTO tasks (id, user_id, title, scheduled_time, status)
+    VALUES ($1, $2, $3, $4, 'pending')
+    RETURNING *
+"""
+
+UPDATE_TASK_TIME_SQL = """
+    UPDATE tasks
+    SET scheduled_time = $1, status = 'pending'
+    WHERE id = $2 AND user_id = $3
+    RETURNING *
+"""
+
+MARK_TASK_DONE_SQL = """
+    UPDATE tasks
+    SET status = 'done'
+    WHERE id = $1 AND user_id = $2 AND status = 'pending'
+    RETURNING *
+"""
+
+# Реестр подготовленных выражений горячих запросов.
+# Запросы выполняются только по имени из реестра, поэтому текст каждого
+# выражения постоянен: asyncpg подготавливает его один раз на соединение
+# и дальше берёт из кэша (statement_cache_size), без повторного разбора
+# и планирования на сервере.
+STATEMENTS: Dict[str, str] = {
+    "add_task": ADD_TASK_SQL,
+    "get_task_by_id": "SELECT * FROM tasks WHERE id = $1",
+    "get_user_task": "SELECT * FROM tasks WHERE id = $1 AND user_id = $2",
+    "get_tasks_by_ids": "SELECT * FROM tasks WHERE id = ANY($1)",
+    "get_nearest_task": NEAREST_TASK_SQL,
+    "get_all_tasks": USER_TASKS_SQL,
+    "tasks_first_page": USER_TASKS_FIRST_PAGE_SQL,
+    "tasks_page_after": USER_TASKS_PAGE_AFTER_SQL,
+    "tasks_page_before": USER_TASKS_PAGE_BEFORE_SQL,
+    "update_task_time": UPDATE_TASK_TIME_SQL,
+    "mark_task_done": MARK_TASK_DONE_SQL,
+    "get_user_city": "SELECT city FROM users WHERE user_id = $1",
+    "set_user_city": """
+        INSERT INTO users (user_id, city)
+        VALUES ($1, $2)
+        ON CONFLICT (user_id)
+        DO UPDATE SET city = EXCLUDED.city
+        WHERE users.city IS DISTINCT FROM EXCLUDED.city
+    """,
+    "get_saved_cities": """
+        SELECT lower(city) AS city, count(*) AS users
+        FROM users
+        WHERE city IS NOT NULL
+        GROUP BY lower(city)
+        ORDER BY users DESC
+        LIMIT $1
+    """,
+}
+
+
+async def _run(method: str, name: str, *args):
+    """
+    Выполняет выражение из реестра STATEMENTS и учитывает его задержку.
+
+    Args:
+        method (str): Метод соединения: fetch, fetchrow или execute
+        name (str): Имя выражения в реестре
+        *args: Параметры запроса
+
+    Returns:
+        Any: Результат соответствующего метода asyncpg
+    """
+    async with acquire() as conn:
+        start = time.perf_counter()
+        result = await getattr(conn, method)(STATEMENTS[name], *args)
+        elapsed = time.perf_counter() - start
+
+    stats = _query_stats.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0})
+    stats["calls"] += 1
+    stats["total"] += elapsed
+    stats["max"] = max(stats["max"], elapsed)
+    return result
+
+
+async def add_task(
+    task_id: UUID, user_id: int, title: str, scheduled_time: datetime
+) -> Dict:
     """
     Добавляет новую задачу в базу данных.
 
     Args:
-        task_id (str): Уникальный идентификатор задачи
+        task_id (UUID): Уникальный идентификатор задачи
         user_id (int): Идентификатор пользователя, которому принадлежит задача
         title (str): Название задачи
         scheduled_time (datetime): Время запланированного выполнения задачи
+
+    Returns:
+        Dict: Словарь с данными созданной задачи
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO tasks (id, user_id, title, scheduled_time, status)
-            VALUES ($1, $2, $3, $4, 'pending')
-            """,
-            task_id,
-            user_id,
-            title,
-            scheduled_time,
-        )
+    row = await _run("fetchrow", "add_task", task_id, user_id, title, scheduled_time)
+    return dict(row)
 
 
-async def get_task_by_id(task_id: str) -> Optional[Dict]:
+async def get_task_by_id(task_id: UUID | str) -> Optional[Dict]:
     """
     Получает задачу по её уникальному идентификатору.
 
     Args:
-        task_id (str): Уникальный идентификатор задачи
+        task_id (UUID | str): Уникальный идентификатор задачи (uuid)
 
     Returns:
         Optional[Dict]: Словарь с данными задачи или None
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", task_id)
-        return dict(row) if row else None
+    row = await _run("fetchrow", "get_task_by_id", task_id)
+    return dict(row) if row else None
+
+
+async def get_user_task(task_id: UUID | str, user_id: int) -> Optional[Dict]:
+    """
+    Получает задачу по идентификатору, только если она принадлежит пользователю.
+
+    Args:
+        task_id (UUID | str): Уникальный идентификатор задачи (uuid)
+        user_id (int): Идентификатор пользователя
+
+    Returns:
+        Optional[Dict]: Словарь с данными задачи или None, если задача
+        не найдена или принадлежит другому пользователю
+    """
+    row = await _run("fetchrow", "get_user_task", task_id, user_id)
+    return dict(row) if row else None
+
+
+async def get_tasks_by_ids(task_ids: List[UUID | str]) -> List[Dict]:
+    """
+    Получает задачи по списку идентификаторов одним запросом.
+
+    Args:
+        task_ids (List[UUID | str]): Идентификаторы задач
+
+    Returns:
+        List[Dict]: Список словарей с данными найденных задач
+    """
+    rows = await _run("fetch", "get_tasks_by_ids", task_ids)
+    return [dict(r) for r in rows]
 
 
 async def get_nearest_task(user_id: int) -> Optional[Dict]:
@@ -132,18 +361,8 @@ async def get_nearest_task(user_id: int) -> Optional[Dict]:
     Returns:
         Optional[Dict]: Словарь с данными ближайшей задачи или None
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT * FROM tasks
-            WHERE user_id = $1 AND status = 'pending'
-            ORDER BY scheduled_time
-            LIMIT 1
-            """,
-            user_id,
-        )
-        return dict(row) if row else None
+    row = await _run("fetchrow", "get_nearest_task", user_id)
+    return dict(row) if row else None
 
 
 async def get_all_tasks(user_id: int) -> List[Dict]:
@@ -156,57 +375,73 @@ async def get_all_tasks(user_id: int) -> List[Dict]:
     Returns:
         List[Dict]: Список словарей с данными всех запланированных задач
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT * FROM tasks
-            WHERE user_id = $1 AND status = 'pending'
-            ORDER BY scheduled_time
-            """,
-            user_id,
-        )
-        return [dict(r) for r in rows]
+    rows = await _run("fetch", "get_all_tasks", user_id)
+    return [dict(r) for r in rows]
+
+
+async def get_tasks_page(
+    user_id: int,
+    limit: int,
+    cursor: Optional[Tuple[datetime, UUID | str]] = None,
+    backward: bool = False,
+) -> List[Dict]:
+    """
+    Получает страницу запланированных (pending) задач пользователя
+    в порядке (scheduled_time, id).
 
+    Args:
+        user_id (int): Идентификатор пользователя
+        limit (int): Максимальное количество задач
+        cursor (Optional[Tuple[datetime, UUID | str]]): Ключ (scheduled_time, id)
+            задачи, от которой отсчитывается страница; None — первая страница
+        backward (bool): Выбирать задачи перед cursor, а не после него
 
-async def update_task_time(task_id: str, new_time: datetime):
+    Returns:
+        List[Dict]: Задачи страницы в порядке возрастания (scheduled_time, id)
+    """
+    if cursor is None:
+        rows = await _run("fetch", "tasks_first_page", user_id, limit)
+    elif backward:
+        rows = await _run("fetch", "tasks_page_before", user_id, *cursor, limit)
+        rows = rows[::-1]
+    else:
+        rows = await _run("fetch", "tasks_page_after", user_id, *cursor, limit)
+    return [dict(r) for r in rows]
+
+
+async def update_task_time(
+    task_id: UUID | str, user_id: int, new_time: datetime
+) -> Optional[Dict]:
     """
-    Обновляет время выполнения задачи и устанавливает статус 'pending'.
+    Обновляет время выполнения задачи пользователя и устанавливает статус 'pending'.
 
     Args:
-        task_id (str): Уникальный идентификатор задачи
+        task_id (UUID | str): Уникальный идентификатор задачи (uuid)
+        user_id (int): Идентификатор пользователя-владельца
         new_time (datetime): Новое время выполнения задачи
+
+    Returns:
+        Optional[Dict]: Словарь с данными обновлённой задачи или None,
+        если задача не найдена или принадлежит другому пользователю
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            UPDATE tasks
-            SET scheduled_time = $1, status = 'pending'
-            WHERE id = $2
-            """,
-            new_time,
-            task_id,
-        )
+    row = await _run("fetchrow", "update_task_time", new_time, task_id, user_id)
+    return dict(row) if row else None
 
 
-async def mark_task_done(task_id: str):
+async def mark_task_done(task_id: UUID | str, user_id: int) -> Optional[Dict]:
     """
-    Помечает задачу как выполненную.
+    Помечает pending-задачу пользователя как выполненную.
 
     Args:
-        task_id (str): Уникальный идентификатор задачи
+        task_id (UUID | str): Уникальный идентификатор задачи (uuid)
+        user_id (int): Идентификатор пользователя-владельца
+
+    Returns:
+        Optional[Dict]: Словарь с данными выполненной задачи или None,
+        если задача не найдена, чужая или уже выполнена
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            UPDATE tasks
-            SET status = 'done'
-            WHERE id = $1
-            """,
-            task_id,
-        )
+    row = await _run("fetchrow", "mark_task_done", task_id, user_id)
+    return dict(row) if row else None
 
 
 # ---------------------------
@@ -224,10 +459,8 @@ async def get_user_city(user_id: int) -> Optional[str]:
     Returns:
         Optional[str]: Название города пользователя или None
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT city FROM users WHERE user_id = $1", user_id)
-        return row["city"] if row else None
+    row = await _run("fetchrow", "get_user_city", user_id)
+    return row["city"] if row else None
 
 
 async def set_user_city(user_id: int, city: str):
@@ -238,18 +471,21 @@ async def set_user_city(user_id: int, city: str):
         user_id (int): Уникальный идентификатор пользователя
         city (str): Название города
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO users (user_id, city)
-            VALUES ($1, $2)
-            ON CONFLICT (user_id)
-            DO UPDATE SET city = EXCLUDED.city
-            """,
-            user_id,
-            city,
-        )
+    await _run("execute", "set_user_city", user_id, city)
+
+
+async def get_saved_cities(limit: int) -> List[Dict]:
+    """
+    Возвращает сохранённые пользователями города по убыванию числа пользователей.
+
+    Args:
+        limit (int): Максимальное количество городов
+
+    Returns:
+        List[Dict]: Словари с ключами city (в нижнем регистре) и users
+    """
+    rows = await _run("fetch", "get_saved_cities", limit)
+    return [dict(r) for r in rows]
 
 
 # ---------------------------
@@ -257,34 +493,29 @@ async def set_user_city(user_id: int, city: str):
 # ---------------------------
 
 
-# ПОКА НЕ ИСПОЛЬЗУЕТСЯ
-async def get_future_tasks() -> List[Dict]:
-    """
-    Возвращает список всех будущих задач со статусом 'pending'.
-
-    Returns:
-        List[Dict]: Список словарей с информацией о будущих задачах
+async def iter_future_pending_tasks(
+    batch_size: int = 1000,
+) -> AsyncIterator[List[Dict]]:
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT *
-            FROM tasks
-            WHERE status = 'pending' AND scheduled_time > CURRENT_TIMESTAMP
-            """
-        )
-        return [dict(r) for r in rows]
+    Потоково возвращает будущие задачи со статусом 'pending' пачками.
 
+    Строки читаются серверным курсором (внутри транзакции), поэтому в памяти
+    одновременно находится не больше batch_size задач, а фильтрация
+    scheduled_time > now() выполняется на стороне БД.
 
-async def get_all_pending_tasks() -> List[Dict]:
-    """
-    Возвращает все задачи со статусом 'pending' для всех пользователей.
+    Args:
+        batch_size (int): Размер пачки (и размер prefetch курсора)
 
-    Returns:
-        List[Dict]: Список словарей с активными задачами
+    Yields:
+        List[Dict]: Пачка словарей с полями id, user_id, scheduled_time
     """
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM tasks WHERE status='pending'")
-        return [dict(r) for r in rows]
+    async with acquire() as conn:
+        async with conn.transaction():
+            batch = []
+            async for row in conn.cursor(FUTURE_PENDING_TASKS_SQL, prefetch=batch_size):
+                batch.append(dict(row))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
@@ -4,12 +4,14 @@ from telegram.ext import CallbackContext
 from keyboard import MAIN_MENU, task_actions, tasks_inline_menu
 from handlers.common.common import cancel_menu_kb
 from states import ADD_DATE, POSTPONE_DATE
-from utils.tasks_utils import format_task
+from utils.tasks_utils import format_task, decode_page_cursor
 from app.decorators import log_handler
 from app.logger import logger
+from constants.keyboard_constants import TASKS_NEXT_PREFIX, TASKS_PREV_PREFIX
+from bot.jobs import cancel_reminder
 from services.tasks_service import (
     get_task,
-    get_tasks,
+    get_tasks_page,
     get_nearest_user_task,
     complete_task,
 )
@@ -23,7 +25,7 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
     - Добавление новой задачи (add_task)
     - Перенос даты задачи (postpone)
     - Просмотр ближайшей задачи (nearest_task)
-    - Просмотр всех задач (all_tasks)
+    - Просмотр всех задач (all_tasks) и листание списка (tn:<курсор>, tp:<курсор>)
     - Просмотр конкретной задачи (task:<id>)
     - Отметка задачи как выполненной (done:<id>)
 
@@ -53,10 +55,10 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
 
     if data.startswith("postpone:"):
         task_id = data.split(":", 1)[1]
-        task = await get_task(task_id)
+        task = await get_task(task_id, user_id)
         logger.info("Пользователь %s пробует перенести задачу %s", user_id, task_id)
 
-        if not task or task["user_id"] != user_id:
+        if not task:
             await query.edit_message_text(
                 "❌ Эта задача не принадлежит вам", reply_markup=MAIN_MENU
             )
@@ -68,6 +70,8 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
             return None
 
         context.user_data["task_id"] = task_id
+        # Прежнее время нужно, чтобы снять старое напоминание при переносе
+        context.user_data["scheduled_time"] = task["scheduled_time"]
         await query.edit_message_text(
             "Введите новую дату и время ⏰\n\n"
             "Примеры:\n"
@@ -101,13 +105,21 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
             )
         return None
 
-    if data == "all_tasks":
-        tasks = await get_tasks(user_id)
+    if data == "all_tasks" or data.startswith((TASKS_NEXT_PREFIX, TASKS_PREV_PREFIX)):
+        cursor = None
+        if data != "all_tasks":
+            cursor = decode_page_cursor(data[len(TASKS_NEXT_PREFIX) :])
+        page = await get_tasks_page(
+            user_id, cursor, backward=data.startswith(TASKS_PREV_PREFIX)
+        )
+        tasks = page["tasks"]
         logger.info("Пользователь %s пробует получить список всех задач", user_id)
 
         if tasks:
             kb = InlineKeyboardMarkup(
-                tasks_inline_menu(tasks).inline_keyboard
+                tasks_inline_menu(
+                    tasks, page["has_prev"], page["has_next"]
+                ).inline_keyboard
                 + ((InlineKeyboardButton("↩️ В меню", callback_data="menu"),),)
             )
             await query.edit_message_text("Выберите задачу:", reply_markup=kb)
@@ -121,9 +133,9 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
 
     if data.startswith("task:"):
         task_id = data.split(":", 1)[1]
-        task = await get_task(task_id)
+        task = await get_task(task_id, user_id)
 
-        if not task or task["user_id"] != user_id:
+        if not task:
             await query.edit_message_text(
                 "❌ Эта задача не принадлежит вам", reply_markup=MAIN_MENU
             )
@@ -147,20 +159,23 @@ async def handle_tasks_callbacks(update: Update, context: CallbackContext, data:
             user_id,
             task_id,
         )
-        task = await get_task(task_id)
+        # Владелец и статус проверяются тем же UPDATE: повторное нажатие
+        # кнопки вернёт None и не отменит напоминание второй раз
+        task = await complete_task(task_id, user_id)
 
-        if not task or task["user_id"] != user_id:
+        if not task:
             await query.edit_message_text(
-                "❌ Эта задача не принадлежит вам", reply_markup=MAIN_MENU
+                "❌ Задача не найдена или уже выполнена", reply_markup=MAIN_MENU
             )
             logger.warning(
-                "Пользователь %s попытался отметить не свою задачу %s как выполненную",
+                "Пользователь %s попытался отметить чужую, отсутствующую "
+                "или уже выполненную задачу %s",
                 user_id,
                 task_id,
             )
             return None
 
-        await complete_task(task_id)
+        await cancel_reminder(task)
         await query.edit_message_text("✅ Задача выполнена", reply_markup=MAIN_MENU)
         logger.info(
             "Пользователь %s отметил задачу %s как выполненную", user_id, task_id
@@ -1,13 +1,46 @@
+from datetime import datetime, timedelta
+
 from telegram import Update
 from telegram.ext import CallbackContext
 
 from handlers.common.common import cancel_menu_kb
 from states import WEATHER_CITY
-from database import get_user_city
-from services.weather_service import get_weather_with_translation
+from services.users_service import get_city
+from services.weather_service import (
+    get_weather_with_translation,
+    get_forecast_with_translation,
+)
+from utils.weather_utils import format_day_forecast, format_hourly_forecast
 from keyboard import weather_actions_kb
 from app.decorators import log_handler
 from app.logger import logger
+from constants.time_constants import MOSCOW_TZ
+
+# Представления прогноза: callback -> (сдвиг в днях от текущей даты, подпись дня)
+FORECAST_VIEWS = {
+    "weather_today": (0, "сегодня"),
+    "weather_tomorrow": (1, "завтра"),
+    "weather_hourly": (0, None),
+}
+
+
+def find_forecast_day(days: list[dict], offset: int) -> dict | None:
+    """
+    Находит в прогнозе день по дате, а не по позиции в списке.
+
+    Прогноз берётся из кэша и может быть получен вчера, поэтому первый
+    день списка не обязательно сегодняшний.
+
+    Args:
+        days (list[dict]): Дни прогноза с полем date (YYYY-MM-DD).
+        offset (int): Сдвиг в днях от текущей даты по Москве.
+
+    Returns:
+        dict | None: День прогноза или None, если его нет.
+    """
+
+    target = (datetime.now(MOSCOW_TZ).date() + timedelta(days=offset)).isoformat()
+    return next((day for day in days if day["date"] == target), None)
 
 
 @log_handler
@@ -16,10 +49,13 @@ async def handle_weather_callbacks(update: Update, _: CallbackContext, data: str
     Обрабатывает callback-запросы, связанные с погодой.
 
     Если пользователь нажал кнопку "weather" или "weather_change":
-        - Получает город пользователя из БД.
+        - Получает город пользователя (из кэша профилей или БД).
         - Если город есть, показывает текущую погоду с переводом.
         - Если города нет или нажата "weather_change", просит ввести город.
 
+    Кнопки "weather_today", "weather_tomorrow" и "weather_hourly" показывают
+    прогноз на сегодня, на завтра и по часам для сохранённого города.
+
     Args:
         update (Update): Объект обновления от Telegram.
         _ (CallbackContext): Контекст выполнения хендлера (не используется).
@@ -34,7 +70,7 @@ async def handle_weather_callbacks(update: Update, _: CallbackContext, data: str
     logger.info("Пользователь %s запросил погоду", user_id)
 
     if data in ("weather", "weather_change"):
-        city = await get_user_city(user_id)
+        city = await get_city(user_id)
 
         if city and data == "weather":
             weather = await get_weather_with_translation(city)
@@ -60,4 +96,30 @@ async def handle_weather_callbacks(update: Update, _: CallbackContext, data: str
         await query.edit_message_text("Введите город:", reply_markup=cancel_menu_kb())
         return WEATHER_CITY
 
+    if data in FORECAST_VIEWS:
+        city = await get_city(user_id)
+        if not city:
+            await query.edit_message_text(
+                "Введите город:", reply_markup=cancel_menu_kb()
+            )
+            return WEATHER_CITY
+
+        offset, title = FORECAST_VIEWS[data]
+        forecast = await get_forecast_with_translation(city)
+
+        if "error" in forecast:
+            text = f"❌ {forecast['error']}"
+            logger.warning("Ошибка получения прогноза: %s", forecast["error"])
+        else:
+            day = find_forecast_day(forecast["days"], offset)
+            if day is None:
+                text = "❌ Прогноз пока недоступен, попробуйте позже"
+            elif title is None:
+                text = format_hourly_forecast(city, day)
+            else:
+                text = format_day_forecast(city, day, title)
+
+        await query.edit_message_text(text, reply_markup=weather_actions_kb())
+        return None
+
     return None
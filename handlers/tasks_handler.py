@@ -5,7 +5,7 @@ from telegram.ext import CallbackContext
 
 from keyboard import MAIN_MENU
 from states import ADD_DATE, ADD_TEXT, POSTPONE_DATE, END
-from bot.tasks import send_task_reminder_task
+from bot.jobs import schedule_reminder, reschedule_reminder
 from handlers.common.common import cancel_menu_kb
 from services.tasks_service import create_task, change_task_time
 from utils.tasks_utils import parse_and_validate_datetime
@@ -80,13 +80,8 @@ async def add_task_text(update: Update, context: CallbackContext):
 
     task = await create_task(user_id, title, scheduled_time)
 
-    delay = (task["scheduled_time"] - datetime.now(timezone.utc)).total_seconds()
-
     # Создаём Celery-задачу
-    logger.info("Создаём Celery-задачу для task_id=%s", task["id"])
-    send_task_reminder_task.apply_async(
-        args=[task["id"], user_id, str(task["scheduled_time"])], countdown=max(0, delay)
-    )
+    await schedule_reminder(task)
 
     await update.message.reply_text("✅ Задача добавлена", reply_markup=MAIN_MENU)
     context.user_data.clear()
@@ -98,7 +93,7 @@ async def postpone_date(update: Update, context: CallbackContext):
     """
     Обрабатывает изменение времени существующей задачи.
     Обновляет время задачи в базе данных.
-    Планирует новое напоминание через Celery.
+    Переносит напоминание на новое время (см. bot.jobs.reschedule_reminder).
 
     Args:
         update (Update): Объект Telegram Update.
@@ -120,13 +115,13 @@ async def postpone_date(update: Update, context: CallbackContext):
         return POSTPONE_DATE
 
     task_id = context.user_data["task_id"]
-    task = await change_task_time(task_id, dt_utc)
-    delay = (task["scheduled_time"] - datetime.now(timezone.utc)).total_seconds()
+    old_time = context.user_data.get("scheduled_time")
+    task = await change_task_time(task_id, update.effective_user.id, dt_utc)
+    if not task:
+        await update.message.reply_text("❌ Задача не найдена", reply_markup=MAIN_MENU)
+        return END
 
-    send_task_reminder_task.apply_async(
-        args=[task_id, task["user_id"], str(task["scheduled_time"])],
-        countdown=max(0, delay),
-    )
+    await reschedule_reminder(task, old_time)
 
     await update.message.reply_text("⏳ Время изменено", reply_markup=MAIN_MENU)
     return END
@@ -3,7 +3,7 @@ from telegram.ext import CallbackContext
 
 from keyboard import weather_actions_kb
 from services.weather_service import get_weather_with_translation
-from database import set_user_city
+from services.users_service import save_city
 from states import END
 from app.decorators import log_handler
 from app.logger import logger
@@ -15,7 +15,8 @@ async def weather_handler(update: Update, _: CallbackContext):
     Обрабатывает ввод города пользователем для получения прогноза погоды.
     Функция получает название города из сообщения пользователя,
     запрашивает прогноз через сервис погоды с переводом описания,
-    отправляет результат пользователю и сохраняет город в базе.
+    отправляет результат пользователю и сохраняет город в базе
+    (если он изменился).
     В случае ошибки (город не найден или сервис недоступен) выводит
     сообщение об ошибке.
 
@@ -40,8 +41,7 @@ async def weather_handler(update: Update, _: CallbackContext):
         logger.warning("Ошибка получения погоды: %s", data["error"])
         return END
 
-    logger.info("Запись города %s в базу данных для пользователя %s", city, user_id)
-    await set_user_city(user_id, city)
+    await save_city(user_id, city)
 
     desc = data["description"]
     temp = data["temp"]
@@ -1,6 +1,10 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from utils.tasks_utils import format_task_date
-from constants.keyboard_constants import MAX_TASK_LENGTH
+from utils.tasks_utils import format_task_date, encode_page_cursor
+from constants.keyboard_constants import (
+    MAX_TASK_LENGTH,
+    TASKS_NEXT_PREFIX,
+    TASKS_PREV_PREFIX,
+)
 
 MAIN_MENU = InlineKeyboardMarkup(  # Главное меню бота
     [
@@ -31,16 +35,20 @@ def task_actions(task_id: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(kb)
 
 
-def tasks_inline_menu(tasks: list) -> InlineKeyboardMarkup:
+def tasks_inline_menu(
+    tasks: list, has_prev: bool = False, has_next: bool = False
+) -> InlineKeyboardMarkup:
     """
-    Создает inline-клавиатуру со списком всех задач пользователя.
+    Создает inline-клавиатуру со страницей списка задач пользователя.
 
     Args:
         tasks (list): Список словарей с задачами, где каждая задача
                       содержит как минимум поля 'id', 'title', 'scheduled_time'
+        has_prev (bool): Добавить кнопку перехода к предыдущей странице
+        has_next (bool): Добавить кнопку перехода к следующей странице
 
     Returns:
-        InlineKeyboardMarkup: Inline клавиатура со списком всех задач
+        InlineKeyboardMarkup: Inline клавиатура со списком задач страницы
     """
     kb = []
     for t in tasks:
@@ -50,6 +58,22 @@ def tasks_inline_menu(tasks: list) -> InlineKeyboardMarkup:
             title = t["title"]
         text = f"{title}   ⏰ {format_task_date(t['scheduled_time'])}"
         kb.append([InlineKeyboardButton(text, callback_data=f"task:{t['id']}")])
+
+    # Курсор кнопки — ключ крайней задачи страницы
+    nav = []
+    if has_prev and tasks:
+        cursor = encode_page_cursor(tasks[0])
+        nav.append(
+            InlineKeyboardButton("◀️", callback_data=f"{TASKS_PREV_PREFIX}{cursor}")
+        )
+    if has_next and tasks:
+        cursor = encode_page_cursor(tasks[-1])
+        nav.append(
+            InlineKeyboardButton("▶️", callback_data=f"{TASKS_NEXT_PREFIX}{cursor}")
+        )
+    if nav:
+        kb.append(nav)
+
     return InlineKeyboardMarkup(kb)
 
 
@@ -62,6 +86,11 @@ def weather_actions_kb() -> InlineKeyboardMarkup:
     """
     return InlineKeyboardMarkup(
         [
+            [
+                InlineKeyboardButton("📅 Сегодня", callback_data="weather_today"),
+                InlineKeyboardButton("📆 Завтра", callback_data="weather_tomorrow"),
+                InlineKeyboardButton("🕒 По часам", callback_data="weather_hourly"),
+            ],
             [InlineKeyboardButton("🔄 Другой город", callback_data="weather_change")],
             [InlineKeyboardButton("↩️ В меню", callback_data="menu")],
         ]
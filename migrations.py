@@ -0,0 +1,345 @@
+"""
+Версионированные миграции схемы БД.
+
+Каждая миграция — это номер версии, описание и список шагов (SQL-строк
+или async-функций, принимающих соединение). Применённые версии хранятся
+в таблице schema_version.
+
+При старте бота и worker'ов выполняется apply_migrations():
+- если схема актуальна, выполняется единственный запрос (чтение версии)
+  и никакого DDL;
+- иначе берётся advisory lock, версия перечитывается (её могла поднять
+  другая реплика) и применяются только недостающие миграции.
+
+Миграции с transactional=False (например, CREATE INDEX CONCURRENTLY)
+выполняются вне транзакции, поэтому их шаги должны быть идемпотентными.
+Построение индексов и заполнение столбцов на большой таблице занимает
+долго, поэтому миграции выполняются на отдельном соединении без таймаутов
+запросов (см. database.init_db).
+"""
+
+import asyncpg
+from typing import Awaitable, Callable, NamedTuple
+
+from app.logger import logger
+
+# Идентификатор advisory lock миграций (произвольная константа проекта)
+MIGRATIONS_LOCK_ID = 7_324_501
+
+
+class Migration(NamedTuple):
+    """
+    Описание одной миграции схемы.
+    """
+
+    version: int
+    description: str
+    steps: list[str | Callable[[asyncpg.Connection], Awaitable[None]]]
+    transactional: bool = True
+
+
+async def drop_invalid_indexes(conn: asyncpg.Connection) -> None:
+    """
+    Удаляет невалидные индексы tasks, оставшиеся от прерванного
+    CREATE INDEX CONCURRENTLY.
+
+    Такой индекс существует в каталоге, но не используется планировщиком,
+    а CREATE INDEX ... IF NOT EXISTS его пропускает, поэтому перед
+    построением индексов остатки прерванной сборки удаляются.
+    """
+
+    names = await conn.fetch("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = 'tasks'::regclass AND NOT i.indisvalid
+    """)
+    for row in names:
+        logger.warning("Удаление невалидного индекса %s", row["relname"])
+        await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{row["relname"]}"')
+
+
+# Частичные индексы по pending-задачам: выполненные задачи в них не попадают,
+# поэтому индексы остаются маленькими, а выборки "ближайшая задача",
+# "все задачи пользователя" и "будущие задачи" идут по index scan.
+# CONCURRENTLY — чтобы создание индекса на большой таблице не блокировало запись.
+TASKS_INDEXES = [
+    drop_invalid_indexes,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_user_pending_time_idx
+    ON tasks (user_id, scheduled_time)
+    WHERE status = 'pending'
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_pending_time_idx
+    ON tasks (scheduled_time)
+    WHERE status = 'pending'
+    """,
+]
+
+# Индекс keyset-пагинации списка задач по (scheduled_time, id). Покрывает
+# и выборку ближайшей задачи, поэтому заменяет tasks_user_pending_time_idx.
+TASKS_PAGE_INDEX = [
+    drop_invalid_indexes,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_user_pending_page_idx
+    ON tasks (user_id, scheduled_time, id)
+    WHERE status = 'pending'
+    """,
+    "DROP INDEX CONCURRENTLY IF EXISTS tasks_user_pending_time_idx",
+]
+
+# Размер пачки при фоновом заполнении новых столбцов в онлайн-миграциях
+BACKFILL_BATCH_SIZE = 10_000
+
+
+async def _migrate_tasks_to_uuid(conn: asyncpg.Connection) -> None:
+    """
+    Онлайн-миграция tasks: id TEXT -> uuid, status TEXT -> enum task_status.
+
+    Таблица не блокируется на всё время перезаписи:
+    1. добавляются новые столбцы id_uuid/status_new, триггер заполняет их
+       для новых и изменённых строк;
+    2. существующие строки заполняются пачками по BACKFILL_BATCH_SIZE
+       (каждая пачка — отдельная короткая транзакция);
+    3. уникальный и частичные индексы по новым столбцам строятся CONCURRENTLY;
+    4. в одной короткой транзакции старые столбцы удаляются, а новые
+       переименовываются и становятся первичным ключом.
+
+    Повторный запуск после сбоя безопасен: все шаги идемпотентны,
+    а после переключения миграция ничего не делает.
+    """
+
+    id_type = await conn.fetchval("""
+        SELECT atttypid::regtype::text FROM pg_attribute
+        WHERE attrelid = 'tasks'::regclass AND attname = 'id' AND NOT attisdropped
+    """)
+    if id_type == "uuid":
+        return
+
+    await conn.execute("""
+        DO $$ BEGIN
+            CREATE TYPE task_status AS ENUM ('pending', 'done');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    await conn.execute("""
+        ALTER TABLE tasks
+            ADD COLUMN IF NOT EXISTS id_uuid uuid,
+            ADD COLUMN IF NOT EXISTS status_new task_status
+    """)
+    await conn.execute("""
+        CREATE OR REPLACE FUNCTION tasks_fill_new_columns() RETURNS trigger AS $$
+        BEGIN
+            NEW.id_uuid := NEW.id::uuid;
+            NEW.status_new := NEW.status::task_status;
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql
+    """)
+    await conn.execute("DROP TRIGGER IF EXISTS tasks_fill_new_columns ON tasks")
+    await conn.execute("""
+        CREATE TRIGGER tasks_fill_new_columns
+        BEFORE INSERT OR UPDATE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_fill_new_columns()
+    """)
+
+    # Пачки идут по первичному ключу (старый id): каждая читает следующий
+    # диапазон индекса после last_id, а не пересканирует таблицу
+    # в поисках ещё не заполненных строк.
+    last_id = ""
+    while True:
+        last_id = await conn.fetchval(
+            """
+            WITH batch AS (
+                SELECT id FROM tasks WHERE id > $1 ORDER BY id LIMIT $2
+            ), filled AS (
+                UPDATE tasks
+                SET id_uuid = tasks.id::uuid, status_new = tasks.status::task_status
+                FROM batch
+                WHERE tasks.id = batch.id
+                  AND (tasks.id_uuid IS NULL OR tasks.status_new IS NULL)
+            )
+            SELECT max(id) FROM batch
+            """,
+            last_id,
+            BACKFILL_BATCH_SIZE,
+        )
+        if last_id is None:
+            break
+
+    await drop_invalid_indexes(conn)
+    await conn.execute(
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS tasks_id_uuid_key "
+        "ON tasks (id_uuid)"
+    )
+    await conn.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_user_pending_time_idx_new
+        ON tasks (user_id, scheduled_time)
+        WHERE status_new = 'pending'
+    """)
+    await conn.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_pending_time_idx_new
+        ON tasks (scheduled_time)
+        WHERE status_new = 'pending'
+    """)
+
+    async with conn.transaction():
+        await conn.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+        await conn.execute("""
+            UPDATE tasks SET id_uuid = id::uuid, status_new = status::task_status
+            WHERE id_uuid IS NULL OR status_new IS NULL
+        """)
+        await conn.execute("DROP TRIGGER tasks_fill_new_columns ON tasks")
+        await conn.execute("DROP FUNCTION tasks_fill_new_columns()")
+        # Вместе со старыми столбцами удаляются первичный ключ и старые индексы
+        await conn.execute("ALTER TABLE tasks DROP COLUMN id, DROP COLUMN status")
+        await conn.execute("ALTER TABLE tasks RENAME COLUMN id_uuid TO id")
+        await conn.execute("ALTER TABLE tasks RENAME COLUMN status_new TO status")
+        await conn.execute("""
+            ALTER TABLE tasks
+                ALTER COLUMN id SET NOT NULL,
+                ALTER COLUMN status SET NOT NULL
+        """)
+        await conn.execute(
+            "ALTER TABLE tasks ADD CONSTRAINT tasks_pkey "
+            "PRIMARY KEY USING INDEX tasks_id_uuid_key"
+        )
+        await conn.execute(
+            "ALTER INDEX tasks_user_pending_time_idx_new "
+            "RENAME TO tasks_user_pending_time_idx"
+        )
+        await conn.execute(
+            "ALTER INDEX tasks_pending_time_idx_new RENAME TO tasks_pending_time_idx"
+        )
+
+
+MIGRATIONS = [
+    Migration(
+        1,
+        "Таблицы tasks и users",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                user_id BIGINT NOT NULL,
+                title TEXT NOT NULL,
+                scheduled_time TIMESTAMPTZ NOT NULL,
+                status TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id BIGINT PRIMARY KEY,
+                city TEXT
+            )
+            """,
+        ],
+    ),
+    Migration(
+        2,
+        "Частичные индексы по pending-задачам",
+        TASKS_INDEXES,
+        transactional=False,
+    ),
+    Migration(
+        3,
+        "Нативный uuid для tasks.id и enum task_status для tasks.status",
+        [_migrate_tasks_to_uuid],
+        transactional=False,
+    ),
+    Migration(
+        4,
+        "Индекс постраничного списка задач (user_id, scheduled_time, id)",
+        TASKS_PAGE_INDEX,
+        transactional=False,
+    ),
+]
+
+# Версия схемы, которую ожидает код
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def get_schema_version(conn: asyncpg.Connection) -> int:
+    """
+    Возвращает текущую версию схемы.
+
+    Args:
+        conn (asyncpg.Connection): Соединение с БД.
+
+    Returns:
+        int: Номер последней применённой миграции (0, если миграций не было).
+    """
+
+    try:
+        version = await conn.fetchval("SELECT max(version) FROM schema_version")
+    except asyncpg.UndefinedTableError:
+        return 0
+    return version or 0
+
+
+async def _apply_migration(conn: asyncpg.Connection, migration: Migration) -> None:
+    """
+    Выполняет шаги миграции и записывает её версию.
+    """
+
+    for step in migration.steps:
+        if isinstance(step, str):
+            await conn.execute(step)
+        else:
+            await step(conn)
+
+    await conn.execute(
+        "INSERT INTO schema_version (version, description) VALUES ($1, $2)",
+        migration.version,
+        migration.description,
+    )
+
+
+async def apply_migrations(conn: asyncpg.Connection) -> int:
+    """
+    Применяет недостающие миграции под advisory lock.
+
+    Args:
+        conn (asyncpg.Connection): Соединение с БД (вне транзакции).
+
+    Returns:
+        int: Количество применённых миграций.
+    """
+
+    current = await get_schema_version(conn)
+    if current >= LATEST_VERSION:
+        logger.debug("Схема БД актуальна (версия %s)", current)
+        return 0
+
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATIONS_LOCK_ID)
+    try:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        # Пока ждали lock, миграции могла применить другая реплика
+        current = await get_schema_version(conn)
+
+        applied = 0
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+
+            logger.info(
+                "Применение миграции %s: %s",
+                migration.version,
+                migration.description,
+            )
+            if migration.transactional:
+                async with conn.transaction():
+                    await _apply_migration(conn, migration)
+            else:
+                await _apply_migration(conn, migration)
+            applied += 1
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATIONS_LOCK_ID)
+
+    logger.info("Схема БД обновлена до версии %s", LATEST_VERSION)
+    return applied
@@ -0,0 +1,182 @@
+"""
+Сервис реестра напоминаний о задачах.
+
+Содержит Redis-реестр поставленных в очередь напоминаний: для каждой задачи
+хранится маркер "напоминание поставлено на scheduled_time X". Реестр позволяет
+не ставить повторно уже запланированные напоминания (например, при рестарте
+бота) и отбрасывать устаревшие копии в worker'е без запроса к БД.
+"""
+
+from datetime import datetime, timezone
+
+from app.redis_client import get_redis_client
+from constants.reminder_constants import REMINDER_MARKER_PREFIX, REMINDER_MARKER_GRACE
+
+# Lua-скрипт атомарной "заявки" на отправку напоминания:
+#   1  — маркер совпал, копия единственная актуальная (маркер помечается sent:)
+#   0  — маркер другой (время изменено) или напоминание уже отправлено
+#   -1 — маркера нет (напоминание поставлено до появления реестра)
+CLAIM_REMINDER_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -1
+end
+if current == ARGV[1] then
+    redis.call('SET', KEYS[1], 'sent:' .. ARGV[1], 'KEEPTTL')
+    return 1
+end
+return 0
+"""
+
+# Lua-скрипт отмены заявки, если отправка не удалась: маркер sent:<время>
+# возвращается к <время>, и следующая копия напоминания снова может его
+# отправить. Маркер другого времени не трогается.
+RELEASE_REMINDER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == 'sent:' .. ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'KEEPTTL')
+    return 1
+end
+return 0
+"""
+
+
+def _marker_key(task_id: str) -> str:
+    """
+    Возвращает ключ Redis с маркером напоминания задачи.
+
+    Args:
+        task_id (str): Уникальный идентификатор задачи.
+
+    Returns:
+        str: Ключ маркера.
+    """
+
+    return f"{REMINDER_MARKER_PREFIX}{task_id}"
+
+
+def _marker_ttl(scheduled_time: datetime, now: datetime) -> int:
+    """
+    Вычисляет время жизни маркера: до scheduled_time плюс запас.
+
+    Args:
+        scheduled_time (datetime): Время напоминания.
+        now (datetime): Текущее время (UTC).
+
+    Returns:
+        int: TTL маркера в секундах.
+    """
+
+    return max(0, int((scheduled_time - now).total_seconds())) + REMINDER_MARKER_GRACE
+
+
+async def filter_not_enqueued(tasks: list[dict]) -> list[dict]:
+    """
+    Отбирает задачи, напоминание для которых ещё не поставлено в очередь
+    на их текущее scheduled_time.
+
+    Маркеры всей пачки читаются одним запросом MGET.
+
+    Args:
+        tasks (list[dict]): Задачи с полями id и scheduled_time.
+
+    Returns:
+        list[dict]: Задачи, для которых напоминание нужно поставить.
+    """
+
+    redis_client = get_redis_client()
+    if not redis_client or not tasks:
+        return list(tasks)
+
+    markers = await redis_client.mget([_marker_key(t["id"]) for t in tasks])
+
+    return [
+        task
+        for task, marker in zip(tasks, markers)
+        if marker != str(task["scheduled_time"])
+    ]
+
+
+async def mark_enqueued(tasks: list[dict]) -> None:
+    """
+    Записывает маркеры "напоминание поставлено" для пачки задач
+    одним pipeline-запросом.
+
+    Args:
+        tasks (list[dict]): Задачи с полями id и scheduled_time.
+    """
+
+    redis_client = get_redis_client()
+    if not redis_client or not tasks:
+        return
+
+    now = datetime.now(timezone.utc)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for task in tasks:
+            pipe.set(
+                _marker_key(task["id"]),
+                str(task["scheduled_time"]),
+                ex=_marker_ttl(task["scheduled_time"], now),
+            )
+        await pipe.execute()
+
+
+async def claim_reminder(task_id: str, scheduled_time: str) -> int:
+    """
+    Атомарно проверяет, что копия напоминания актуальна, и помечает
+    напоминание отправленным (см. CLAIM_REMINDER_SCRIPT).
+
+    Args:
+        task_id (str): Уникальный идентификатор задачи.
+        scheduled_time (str): Время, на которое было поставлено напоминание.
+
+    Returns:
+        int: 1 — копия актуальна, 0 — копия устарела, -1 — маркера нет.
+    """
+
+    redis_client = get_redis_client()
+    if not redis_client:
+        return -1
+
+    return await redis_client.eval(
+        CLAIM_REMINDER_SCRIPT, 1, _marker_key(task_id), scheduled_time
+    )
+
+
+async def claim_reminders(reminders: list) -> list[int]:
+    """
+    Выполняет claim_reminder для пачки напоминаний одним pipeline-запросом.
+
+    Args:
+        reminders (list): Элементы [task_id, chat_id, scheduled_time].
+
+    Returns:
+        list[int]: Результаты заявок в том же порядке (см. claim_reminder).
+    """
+
+    redis_client = get_redis_client()
+    if not redis_client or not reminders:
+        return [-1] * len(reminders)
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for task_id, _, scheduled_time in reminders:
+            pipe.eval(CLAIM_REMINDER_SCRIPT, 1, _marker_key(task_id), scheduled_time)
+        return await pipe.execute()
+
+
+async def release_reminders(reminders: list) -> None:
+    """
+    Отменяет заявки на отправку напоминаний, которые не удалось отправить
+    (ошибка БД или Telegram), одним pipeline-запросом.
+
+    Args:
+        reminders (list): Элементы [task_id, chat_id, scheduled_time].
+    """
+
+    redis_client = get_redis_client()
+    if not redis_client or not reminders:
+        return
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for task_id, _, scheduled_time in reminders:
+            pipe.eval(RELEASE_REMINDER_SCRIPT, 1, _marker_key(task_id), scheduled_time)
+        await pipe.execute()
@@ -1,21 +1,160 @@
-from uuid import uuid4
+"""
+Сервис задач пользователя.
+
+Чтения для меню ("Ближайшая задача", "Все задачи") обслуживаются
+двухуровневым кэшем по пользователю: локальный LRU с коротким TTL
+и (если задан REDIS_URL) hash в Redis. Любая запись задач пользователя
+(create_task, change_task_time, complete_task) сразу удаляет его данные
+из обоих уровней, поэтому при навигации по меню Postgres видит только записи.
+"""
+
+import json
+from uuid import UUID, uuid4
 from datetime import datetime
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
 
 from database import (
     add_task,
     update_task_time,
-    get_task_by_id,
+    get_user_task,
     get_all_tasks,
+    get_tasks_page as db_get_tasks_page,
     get_nearest_task,
     mark_task_done,
 )
 from app.logger import logger
+from app.redis_client import get_redis_client
+from constants.keyboard_constants import TASKS_PAGE_SIZE
+from constants.cache_constants import (
+    TASKS_LOCAL_CACHE_SIZE,
+    TASKS_LOCAL_CACHE_TTL,
+    TASKS_CACHE_PREFIX,
+    TASKS_REDIS_CACHE_TTL,
+)
+from utils.cache_utils import TTLCache
+
+# Локальный уровень: user_id -> {представление: значение}
+_local_cache = TTLCache(TASKS_LOCAL_CACHE_SIZE, TASKS_LOCAL_CACHE_TTL)
+
+# Попадания и промахи по представлениям: запись пользователя в
+# _local_cache без нужного представления — промах, хотя TTLCache
+# считает её попаданием
+_stats = {"hits": 0, "misses": 0, "redis_hits": 0}
+
+
+def _task_hook(obj: dict) -> dict:
+    """
+    Восстанавливает типы полей задачи при чтении кэша из Redis.
+    """
+
+    if "id" in obj and "scheduled_time" in obj:
+        obj["id"] = UUID(obj["id"])
+        obj["scheduled_time"] = datetime.fromisoformat(obj["scheduled_time"])
+    return obj
+
+
+async def _cached(user_id: int, view: str, load: Callable[[], Awaitable]):
+    """
+    Возвращает представление списка задач пользователя из кэша,
+    при промахе загружает его из БД и сохраняет в оба уровня.
+
+    Args:
+        user_id (int): Идентификатор пользователя.
+        view (str): Имя представления (nearest, all, page:...).
+        load (Callable[[], Awaitable]): Загрузка значения из БД.
+
+    Returns:
+        Any: Значение представления.
+    """
+
+    views = _local_cache.get(user_id)
+    if views is None:
+        views = {}
+        _local_cache.set(user_id, views)
+    elif view in views:
+        _stats["hits"] += 1
+        logger.debug("Задачи пользователя %s (%s) получены из памяти", user_id, view)
+        return views[view]
+
+    _stats["misses"] += 1
+
+    redis_client = get_redis_client()
+    key = f"{TASKS_CACHE_PREFIX}{user_id}"
+    if redis_client:
+        try:
+            cached = await redis_client.hget(key, view)
+        except RedisError as e:
+            logger.warning("Кэш задач в Redis недоступен\n%s", e)
+            cached = None
+        if cached is not None:
+            _stats["redis_hits"] += 1
+            value = json.loads(cached, object_hook=_task_hook)
+            if _local_cache.peek(user_id) is views:
+                views[view] = value
+            return value
+
+    value = await load()
+
+    # Если во время загрузки задачи пользователя изменились, запись
+    # инвалидировала кэш (словарь views уже не в кэше) — не сохраняем
+    # устаревшее значение
+    if _local_cache.peek(user_id) is not views:
+        return value
+    views[view] = value
+
+    if redis_client:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, view, json.dumps(value, default=str))
+                pipe.expire(key, TASKS_REDIS_CACHE_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Кэш задач в Redis недоступен\n%s", e)
+
+    return value
+
+
+async def invalidate_user_tasks(user_id: int) -> None:
+    """
+    Удаляет закэшированные представления задач пользователя из обоих уровней.
+
+    Args:
+        user_id (int): Идентификатор пользователя.
+    """
+
+    _local_cache.delete(user_id)
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            await redis_client.delete(f"{TASKS_CACHE_PREFIX}{user_id}")
+        except RedisError as e:
+            logger.warning("Не удалось инвалидировать кэш задач в Redis\n%s", e)
+
+
+def get_tasks_cache_stats() -> dict:
+    """
+    Возвращает статистику кэша задач.
+
+    Returns:
+        dict: Размер и вытеснения локального уровня, попадания и промахи
+        по представлениям (hits, misses, hit_rate), попадания в Redis
+        после промаха в памяти (redis_hits).
+    """
+
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_local_cache.stats(),
+        **_stats,
+        "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+    }
 
 
 async def create_task(user_id: int, title: str, scheduled_time: datetime) -> dict:
     """
     Создаёт новую задачу пользователя и сохраняет её в базе данных.
-    Используется UUID, чтобы гарантировать уникальность.
+    Идентификатор — нативный UUID (столбец tasks.id имеет тип uuid).
 
     Args:
         user_id (int): Идентификатор пользователя, которому принадлежит задача.
@@ -23,55 +162,63 @@ async def create_task(user_id: int, title: str, scheduled_time: datetime) -> dic
         scheduled_time (datetime): Дата и время выполнения задачи.
 
     Returns:
-        dict: Объект задачи, полученный из базы данных после создания.
+        dict: Объект задачи, возвращённый базой данных при создании.
     """
 
-    task_id = str(uuid4())  # Генерируем уникальный идентификатор задачи
+    task_id = uuid4()  # Генерируем уникальный идентификатор задачи
     logger.debug("Запрос к БД для создания задачи пользователем %s", user_id)
-    await add_task(task_id, user_id, title, scheduled_time)
-    task = await get_task_by_id(task_id)
+    # INSERT ... RETURNING: задача возвращается тем же запросом
+    task = await add_task(task_id, user_id, title, scheduled_time)
+    await invalidate_user_tasks(user_id)
 
-    return task  # Возвращаем созданную задачу из БД для создания напоминания
+    return task
 
 
-async def change_task_time(task_id: str, new_time: datetime) -> dict:
+async def change_task_time(
+    task_id: str, user_id: int, new_time: datetime
+) -> dict | None:
     """
-    Обновляет дату и время выполнения существующей задачи.
+    Обновляет дату и время выполнения задачи пользователя.
 
-    Функция изменяет запланированное время задачи в базе данных,
-    а затем повторно извлекает задачу, чтобы вернуть её
-    актуальное состояние после изменения.
+    Функция изменяет запланированное время задачи в базе данных
+    и возвращает её актуальное состояние тем же запросом
+    (UPDATE ... RETURNING), без повторного чтения. Владелец
+    проверяется в том же запросе.
 
     Args:
         task_id (str): Уникальный идентификатор задачи.
+        user_id (int): Идентификатор пользователя-владельца.
         new_time (datetime): Новая дата и время выполнения задачи.
 
     Returns:
-        dict: Обновлённый объект задачи из базы данных.
+        dict | None: Обновлённый объект задачи из базы данных,
+        либо None, если задача не найдена или принадлежит другому пользователю.
     """
 
     logger.debug("Запрос к БД для переноса задачи %s", task_id)
-    await update_task_time(task_id, new_time)
-    task = await get_task_by_id(task_id)
+    task = await update_task_time(task_id, user_id, new_time)
+    if task:
+        await invalidate_user_tasks(user_id)
 
-    return task  # Возвращаем созданную задачу из БД для создания напоминания
+    return task
 
 
-async def get_task(task_id: str) -> dict | None:
+async def get_task(task_id: str, user_id: int) -> dict | None:
     """
-    Получает задачу по её идентификатору.
+    Получает задачу пользователя по её идентификатору.
 
     Args:
         task_id (str): Уникальный идентификатор задачи.
+        user_id (int): Идентификатор пользователя-владельца.
 
     Returns:
-        dict | None: Объект задачи, если она найдена,
-        либо None, если задача с таким идентификатором отсутствует.
+        dict | None: Объект задачи, если она найдена и принадлежит пользователю,
+        либо None в остальных случаях.
     """
 
     logger.debug("Запрос к БД для получения задачи %s", task_id)
 
-    return await get_task_by_id(task_id)
+    return await get_user_task(task_id, user_id)
 
 
 async def get_tasks(user_id: int) -> list[dict]:
@@ -85,9 +232,81 @@ async def get_tasks(user_id: int) -> list[dict]:
         list[dict]: Список объектов задач пользователя.
     """
 
-    logger.debug("Запрос к БД для получения всех задач пользователя %s", user_id)
+    logger.debug("Получение всех задач пользователя %s", user_id)
+
+    return await _cached(user_id, "all", lambda: get_all_tasks(user_id))
+
+
+async def get_tasks_page(
+    user_id: int,
+    cursor: tuple[datetime, UUID] | None = None,
+    backward: bool = False,
+    page_size: int = TASKS_PAGE_SIZE,
+) -> dict:
+    """
+    Получает страницу задач пользователя (keyset-пагинация по (scheduled_time, id)).
+
+    Запрашивается на одну задачу больше размера страницы, чтобы без
+    COUNT(*) узнать, есть ли задачи дальше в направлении листания.
 
-    return await get_all_tasks(user_id)
+    Args:
+        user_id (int): Идентификатор пользователя.
+        cursor (tuple[datetime, UUID] | None): Ключ задачи, от которой
+            листается список; None — первая страница.
+        backward (bool): Листать назад (задачи перед cursor).
+        page_size (int): Размер страницы.
+
+    Returns:
+        dict: Словарь с ключами tasks (list[dict]), has_prev (bool)
+        и has_next (bool).
+    """
+
+    if cursor is None:
+        view = f"page:{page_size}"
+    else:
+        direction = "prev" if backward else "next"
+        view = f"page:{page_size}:{direction}:{cursor[0].isoformat()}:{cursor[1]}"
+
+    return await _cached(
+        user_id,
+        view,
+        lambda: _load_tasks_page(user_id, cursor, backward, page_size),
+    )
+
+
+async def _load_tasks_page(
+    user_id: int,
+    cursor: tuple[datetime, UUID] | None,
+    backward: bool,
+    page_size: int,
+) -> dict:
+    """
+    Загружает страницу задач пользователя из БД (см. get_tasks_page).
+    """
+
+    logger.debug("Запрос к БД для получения страницы задач пользователя %s", user_id)
+    rows = await db_get_tasks_page(user_id, page_size + 1, cursor, backward)
+
+    if cursor is None:
+        return {
+            "tasks": rows[:page_size],
+            "has_prev": False,
+            "has_next": len(rows) > page_size,
+        }
+
+    if (backward and len(rows) <= page_size) or (not backward and not rows):
+        # Дошли до начала списка (или задачи после курсора уже выполнены) —
+        # показываем первую страницу
+        return await _load_tasks_page(user_id, None, False, page_size)
+
+    if backward:
+        return {"tasks": rows[-page_size:], "has_prev": True, "has_next": True}
+
+    return {
+        "tasks": rows[:page_size],
+        "has_prev": True,
+        "has_next": len(rows) > page_size,
+    }
 
 
 async def get_nearest_user_task(user_id: int) -> dict | None:
@@ -102,17 +321,30 @@ async def get_nearest_user_task(user_id: int) -> dict | None:
         либо None, если у пользователя нет задач.
     """
 
-    logger.debug("Запрос к БД для получения ближайшей задачи пользователя %s", user_id)
-    return await get_nearest_task(user_id)
+    logger.debug("Получение ближайшей задачи пользователя %s", user_id)
+
+    return await _cached(user_id, "nearest", lambda: get_nearest_task(user_id))
 
 
-async def complete_task(task_id: str) -> None:
+async def complete_task(task_id: str, user_id: int) -> dict | None:
     """
-    Помечает задачу как выполненную.
+    Помечает задачу пользователя как выполненную.
+
+    Проверка владельца и статуса выполняется тем же запросом UPDATE,
+    поэтому повторное нажатие кнопки не выполнит задачу дважды.
 
     Args:
         task_id (str): Уникальный идентификатор задачи.
+        user_id (int): Идентификатор пользователя-владельца.
+
+    Returns:
+        dict | None: Выполненная задача, либо None, если задача не найдена,
+        принадлежит другому пользователю или уже выполнена.
     """
 
     logger.debug('Запрос к БД для перевода задачи %s в состояние "done"', task_id)
-    await mark_task_done(task_id)
+    task = await mark_task_done(task_id, user_id)
+    if task:
+        await invalidate_user_tasks(user_id)
+
+    return task
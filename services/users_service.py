@@ -0,0 +1,80 @@
+"""
+Сервис профилей пользователей (сохранённый город для погоды).
+
+Город читается через локальный кэш с записью насквозь (write-through):
+повторные нажатия кнопки погоды не обращаются к Postgres, а сохранение
+того же города, что уже записан, не выполняет upsert.
+"""
+
+from database import get_user_city, set_user_city
+from app.logger import logger
+from constants.cache_constants import USERS_CACHE_SIZE, USERS_CACHE_TTL
+from utils.cache_utils import TTLCache
+
+_MISSING = object()
+
+# user_id -> город (None, если город не сохранён)
+_city_cache = TTLCache(USERS_CACHE_SIZE, USERS_CACHE_TTL)
+_write_stats = {"upserts": 0, "upserts_skipped": 0}
+
+
+async def get_city(user_id: int) -> str | None:
+    """
+    Возвращает сохранённый город пользователя.
+
+    Args:
+        user_id (int): Идентификатор пользователя.
+
+    Returns:
+        str | None: Город пользователя или None, если он не сохранён.
+    """
+
+    city = _city_cache.get(user_id, _MISSING)
+    if city is not _MISSING:
+        logger.debug("Город пользователя %s получен из кэша", user_id)
+        return city
+
+    logger.debug("Запрос к БД для получения города пользователя %s", user_id)
+    city = await get_user_city(user_id)
+    _city_cache.set(user_id, city)
+
+    return city
+
+
+async def save_city(user_id: int, city: str) -> bool:
+    """
+    Сохраняет город пользователя в БД и кэш.
+
+    Если в кэше уже записан тот же город, запрос к БД не выполняется.
+
+    Args:
+        user_id (int): Идентификатор пользователя.
+        city (str): Название города.
+
+    Returns:
+        bool: True, если город был записан в БД.
+    """
+
+    if _city_cache.peek(user_id, _MISSING) == city:
+        _write_stats["upserts_skipped"] += 1
+        logger.debug("Город пользователя %s не изменился, запись пропущена", user_id)
+        return False
+
+    logger.info("Запись города %s в базу данных для пользователя %s", city, user_id)
+    await set_user_city(user_id, city)
+    _city_cache.set(user_id, city)
+    _write_stats["upserts"] += 1
+
+    return True
+
+
+def get_users_cache_stats() -> dict:
+    """
+    Возвращает статистику кэша профилей.
+
+    Returns:
+        dict: Статистика кэша (попадания, промахи, доля попаданий и т.д.)
+        и счётчики выполненных и пропущенных upsert.
+    """
+
+    return {**_city_cache.stats(), **_write_stats}
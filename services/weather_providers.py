@@ -0,0 +1,587 @@
+"""
+Провайдеры погоды и выбор между ними.
+
+Каждый провайдер (WeatherProvider) получает погоду для города и приводит
+ответ к общему виду:
+
+    {"weather": [{"description": ...}], "main": {"temp": ...},
+     "forecast": [...], "area": название населённого пункта}
+
+или возвращает словарь с ключом error. Набор и порядок провайдеров задаётся
+переменной WEATHER_PROVIDERS (см. constants/provider_constants.py).
+
+fetch_weather() выбирает провайдеров по оценке здоровья (доля успешных
+ответов, ошибки подряд) и ограничивает хвост задержек:
+- если провайдер не ответил за p95 своих недавних задержек, тот же запрос
+  отправляется следующему провайдеру (hedged request) и берётся первый
+  успешный ответ;
+- если провайдер вернул ошибку, запрос сразу уходит следующему (failover).
+"""
+
+import abc
+import time
+import asyncio
+import aiohttp
+from collections import deque
+from urllib.parse import quote
+
+from app.logger import logger
+from app.http_client import get_http_session
+from utils.cache_utils import TTLCache
+from constants.weather_constants import WMO_WEATHER_CODES
+from constants.provider_constants import (
+    WEATHER_PROVIDERS,
+    WTTR_BASE_URL,
+    OPEN_METEO_GEOCODING_URL,
+    OPEN_METEO_FORECAST_URL,
+    WEATHER_STUB_URL,
+    WEATHER_PROVIDER_RETRIES,
+    WEATHER_HEDGE_DELAY,
+    WEATHER_HEDGE_MIN_DELAY,
+    WEATHER_HEDGE_MIN_SAMPLES,
+    WEATHER_PROVIDER_WINDOW,
+    WEATHER_PROVIDER_MAX_FAILURES,
+    WEATHER_PROVIDER_COOLDOWN,
+)
+
+_stats = {"hedged": 0, "failovers": 0}
+
+
+class ProviderHealth:
+    """
+    Скользящая оценка здоровья провайдера по последним запросам.
+    """
+
+    def __init__(self, window: int = WEATHER_PROVIDER_WINDOW):
+        """
+        Args:
+            window (int): Сколько последних запросов учитывать.
+        """
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.results: deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unavailable_until = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """
+        Учитывает завершённый или прерванный запрос.
+
+        Задержка учитывается и для неудачных запросов: иначе p95 считался бы
+        только по быстрым успешным ответам и хеджирование срабатывало бы
+        слишком рано для зависающего провайдера.
+
+        Args:
+            latency (float): Длительность запроса, секунд.
+            ok (bool): Получен ли успешный ответ.
+        """
+        self.requests += 1
+        self.results.append(ok)
+        self.latencies.append(latency)
+        if ok:
+            self.consecutive_failures = 0
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= WEATHER_PROVIDER_MAX_FAILURES:
+            self.unavailable_until = time.monotonic() + WEATHER_PROVIDER_COOLDOWN
+
+    def available(self) -> bool:
+        """
+        Проверяет, не выведен ли провайдер из очереди после ошибок подряд.
+        """
+        return time.monotonic() >= self.unavailable_until
+
+    def success_rate(self) -> float:
+        """
+        Возвращает долю успешных ответов (1.0, пока запросов не было).
+        """
+        return sum(self.results) / len(self.results) if self.results else 1.0
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Возвращает перцентиль p (0..100) задержек запросов.
+
+        Returns:
+            float | None: Задержка, секунд, или None, если замеров нет.
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def hedge_delay(self) -> float:
+        """
+        Возвращает, сколько ждать ответа, прежде чем дублировать запрос.
+        """
+        if len(self.latencies) < WEATHER_HEDGE_MIN_SAMPLES:
+            return WEATHER_HEDGE_DELAY
+        return max(WEATHER_HEDGE_MIN_DELAY, self.percentile(95))
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику провайдера.
+        """
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "success_rate": self.success_rate(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "available": self.available(),
+        }
+
+
+class WeatherProvider(abc.ABC):
+    """
+    Базовый провайдер погоды: HTTP-запросы с повторными попытками.
+    """
+
+    name = "base"
+
+    def __init__(
+        self, name: str | None = None, retries: int = WEATHER_PROVIDER_RETRIES
+    ):
+        """
+        Args:
+            name (str | None): Имя провайдера (по умолчанию — атрибут
+                класса name, например "wttr").
+            retries (int): Количество попыток одного HTTP-запроса.
+        """
+        self.name = name or self.name
+        self.retries = retries
+        self.health = ProviderHealth()
+
+    @abc.abstractmethod
+    async def fetch(self, city: str) -> dict:
+        """
+        Получает погоду для города.
+
+        Args:
+            city (str): Нормализованное название города.
+
+        Returns:
+            dict: Погода в общем виде или словарь с ключом error.
+        """
+
+    async def _get_json(self, url: str, params: dict | None = None):
+        """
+        Выполняет GET-запрос через общую HTTP-сессию с exponential backoff.
+
+        Returns:
+            tuple: (данные JSON, None) или (None, текст ошибки).
+        """
+        timeout = aiohttp.ClientTimeout(
+            total=60,
+            connect=20,
+            sock_connect=20,
+            sock_read=20,
+        )
+        delay = 0.25
+
+        # Общая сессия: соединения с провайдером переиспользуются
+        session = get_http_session()
+        for attempt in range(1, self.retries + 1):
+            logger.debug("Попытка %s соединения с %s", attempt, url)
+
+            try:
+                async with session.get(url, params=params, timeout=timeout) as resp:
+                    if resp.status != 200:  # type: ignore
+                        logger.warning(
+                            "Ошибка получения погоды с %s. Статус: %s",
+                            url,
+                            resp.status,
+                        )
+                        return None, f"Ошибка получения погоды ({resp.status})"
+
+                    return await resp.json(), None
+
+            except (TimeoutError, aiohttp.ClientError) as e:
+                logger.exception(
+                    "Ошибка подключения к %s (попытка %s/%s): \n%s",
+                    url,
+                    attempt,
+                    self.retries,
+                    e,
+                )
+
+            except Exception as e:
+                logger.exception("Неожиданная ошибка при запросе к %s\n%s", url, e)
+
+            if attempt == self.retries:
+                return None, "Не удалось подключиться"
+
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+class WttrProvider(WeatherProvider):
+    """
+    Провайдер wttr.in (format=j1, без API-ключа).
+
+    Тот же формат отдаёт локальная заглушка benchmarks/weather_stub_server.py,
+    поэтому провайдер stub — это WttrProvider с её адресом.
+    """
+
+    name = "wttr"
+
+    def __init__(
+        self, name: str | None = None, base_url: str = WTTR_BASE_URL, **kwargs
+    ):
+        """
+        Args:
+            name (str | None): Имя провайдера (по умолчанию "wttr").
+            base_url (str): Адрес сервиса в формате wttr.in.
+        """
+        super().__init__(name, **kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    async def fetch(self, city: str) -> dict:
+        url = f"{self.base_url}/{quote(city)}?format=j1"
+        data, error = await self._get_json(url)
+        if error:
+            return {"error": error}
+
+        try:
+            current = data["current_condition"][0]
+            description = current["weatherDesc"][0]["value"]
+            temp = float(current["temp_C"])
+
+            logger.debug("Обработка данных с %s прошла успешно", url)
+            result = {
+                "weather": [{"description": description}],
+                "main": {"temp": temp},
+                "forecast": _parse_wttr_forecast(data),
+            }
+            area = _wttr_nearest_area(data)
+            if area:
+                result["area"] = area
+            return result
+
+        except Exception as e:
+            logger.exception("Ошибка обработки ответа %s\n%s", self.name, e)
+            return {"error": "Ошибка обработки данных погоды"}
+
+
+def _parse_wttr_forecast(data: dict) -> list[dict]:
+    """
+    Извлекает прогноз по дням и по 3 часа из ответа wttr.in (format=j1).
+
+    Args:
+        data (dict): Ответ wttr.in.
+
+    Returns:
+        list[dict]: Дни с ключами date (ISO), min, max и hourly
+        (hour, temp, rain — вероятность дождя в %, description).
+        Пустой список, если прогноза в ответе нет или он повреждён.
+    """
+
+    try:
+        return [
+            {
+                "date": day["date"],
+                "min": float(day["mintempC"]),
+                "max": float(day["maxtempC"]),
+                "hourly": [
+                    {
+                        "hour": int(hour["time"]) // 100,
+                        "temp": float(hour["tempC"]),
+                        "rain": int(hour.get("chanceofrain", 0)),
+                        "description": hour["weatherDesc"][0]["value"],
+                    }
+                    for hour in day.get("hourly", [])
+                ],
+            }
+            for day in data.get("weather", [])
+        ]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        logger.warning("Не удалось разобрать прогноз wttr.in: %s", e)
+        return []
+
+
+def _wttr_nearest_area(data: dict) -> str | None:
+    """
+    Возвращает название населённого пункта (nearest_area) из ответа wttr.in.
+    """
+
+    try:
+        return data["nearest_area"][0]["areaName"][0]["value"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """
+    Провайдер Open-Meteo (без API-ключа).
+
+    Город переводится в координаты геокодером Open-Meteo (результат
+    кэшируется на сутки), затем запрашиваются текущая погода и прогноз.
+    """
+
+    name = "open-meteo"
+
+    def __init__(self, name: str | None = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self._places = TTLCache(1000, 24 * 3600)
+
+    async def _geocode(self, city: str) -> tuple[dict | None, str | None]:
+        """
+        Возвращает место (name, latitude, longitude) для города.
+        """
+        place = self._places.get(city.lower())
+        if place is not None:
+            return place, None
+
+        data, error = await self._get_json(
+            OPEN_METEO_GEOCODING_URL,
+            {"name": city, "count": 1, "language": "en", "format": "json"},
+        )
+        if error:
+            return None, error
+        if not data.get("results"):
+            return None, "Город не найден"
+
+        place = data["results"][0]
+        self._places.set(city.lower(), place)
+        return place, None
+
+    async def fetch(self, city: str) -> dict:
+        place, error = await self._geocode(city)
+        if error:
+            return {"error": error}
+
+        data, error = await self._get_json(
+            OPEN_METEO_FORECAST_URL,
+            {
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "current": "temperature_2m,weather_code",
+                "hourly": "temperature_2m,weather_code,precipitation_probability",
+                "daily": "temperature_2m_min,temperature_2m_max",
+                "forecast_days": 3,
+                "timezone": "auto",
+            },
+        )
+        if error:
+            return {"error": error}
+
+        try:
+            return _parse_open_meteo(data, place["name"])
+        except Exception as e:
+            logger.exception("Ошибка обработки ответа %s\n%s", self.name, e)
+            return {"error": "Ошибка обработки данных погоды"}
+
+
+def _parse_open_meteo(data: dict, area: str) -> dict:
+    """
+    Приводит ответ Open-Meteo к общему виду (прогноз — по 3 часа, как у wttr.in).
+
+    Args:
+        data (dict): Ответ /v1/forecast.
+        area (str): Название места из геокодера.
+
+    Returns:
+        dict: Погода в общем виде.
+    """
+
+    def describe(code: int) -> str:
+        return WMO_WEATHER_CODES.get(code, "Cloudy")
+
+    hourly = data["hourly"]
+    by_date: dict[str, list[dict]] = {}
+    for i, stamp in enumerate(hourly["time"]):
+        day, clock = stamp.split("T")
+        hour = int(clock[:2])
+        if hour % 3:
+            continue
+        by_date.setdefault(day, []).append(
+            {
+                "hour": hour,
+                "temp": float(hourly["temperature_2m"][i]),
+                "rain": int(hourly["precipitation_probability"][i] or 0),
+                "description": describe(hourly["weather_code"][i]),
+            }
+        )
+
+    daily = data["daily"]
+    forecast = [
+        {
+            "date": day,
+            "min": float(daily["temperature_2m_min"][i]),
+            "max": float(daily["temperature_2m_max"][i]),
+            "hourly": by_date.get(day, []),
+        }
+        for i, day in enumerate(daily["time"])
+    ]
+
+    current = data["current"]
+    return {
+        "weather": [{"description": describe(current["weather_code"])}],
+        "main": {"temp": float(current["temperature_2m"])},
+        "forecast": forecast,
+        "area": area,
+    }
+
+
+# Фабрики провайдеров по имени из WEATHER_PROVIDERS
+PROVIDER_FACTORIES = {
+    "wttr": WttrProvider,
+    "open-meteo": OpenMeteoProvider,
+    "stub": lambda: WttrProvider("stub", WEATHER_STUB_URL),
+}
+
+_providers: list[WeatherProvider] | None = None
+
+
+def get_providers() -> list[WeatherProvider]:
+    """
+    Возвращает настроенных провайдеров (создаются при первом обращении).
+
+    Returns:
+        list[WeatherProvider]: Провайдеры в порядке из WEATHER_PROVIDERS.
+    """
+
+    global _providers
+    if _providers is None:
+        unknown = [name for name in WEATHER_PROVIDERS if name not in PROVIDER_FACTORIES]
+        if unknown:
+            logger.warning("Неизвестные провайдеры погоды пропущены: %s", unknown)
+        _providers = [
+            PROVIDER_FACTORIES[name]()
+            for name in WEATHER_PROVIDERS
+            if name in PROVIDER_FACTORIES
+        ] or [WttrProvider()]
+    return _providers
+
+
+def rank_providers(providers: list[WeatherProvider]) -> list[WeatherProvider]:
+    """
+    Упорядочивает провайдеров по здоровью.
+
+    Впереди — доступные (без серии ошибок), затем по доле успешных ответов
+    (с шагом 10%, чтобы единичные ошибки не меняли порядок); при равенстве
+    сохраняется порядок настройки. Медленные ответы порядок не меняют —
+    их хвост срезает хеджирование.
+    """
+
+    def key(provider: WeatherProvider):
+        health = provider.health
+        return not health.available(), -round(health.success_rate(), 1)
+
+    return sorted(providers, key=key)
+
+
+def get_providers_stats() -> dict:
+    """
+    Возвращает статистику провайдеров и хеджирования.
+
+    Returns:
+        dict: Статистика по каждому провайдеру (providers), количество
+        продублированных (hedged) и переданных следующему провайдеру
+        после ошибки (failovers) запросов.
+    """
+
+    return {
+        "providers": {p.name: p.health.stats() for p in get_providers()},
+        **_stats,
+    }
+
+
+async def _timed_fetch(provider: WeatherProvider, city: str) -> dict:
+    """
+    Запрашивает погоду у провайдера и учитывает результат в его здоровье.
+
+    Запрос, отменённый после проигранной гонки хеджирования, считается
+    неудачным, если длился дольше порога хеджирования провайдера: иначе
+    зависающий провайдер не копил бы ошибок и оставался первым в очереди.
+    Отмена более быстрого запроса (дублирующий запрос проиграл основному)
+    не учитывается.
+    """
+
+    started = time.monotonic()
+    try:
+        result = await provider.fetch(city)
+    except asyncio.CancelledError:
+        elapsed = time.monotonic() - started
+        if elapsed >= provider.health.hedge_delay():
+            provider.health.record(elapsed, False)
+        raise
+    except Exception as e:
+        logger.exception("Ошибка провайдера погоды %s\n%s", provider.name, e)
+        result = {"error": "Ошибка получения погоды"}
+
+    provider.health.record(time.monotonic() - started, "error" not in result)
+    return result
+
+
+async def fetch_weather(city: str) -> dict:
+    """
+    Получает погоду у провайдеров с хеджированием и failover.
+
+    Args:
+        city (str): Нормализованное название города.
+
+    Returns:
+        dict: Первый успешный ответ или ошибка последнего провайдера.
+    """
+
+    queue = iter(rank_providers(get_providers()))
+    pending: dict[asyncio.Task, WeatherProvider] = {}
+    result = {"error": "Не удалось подключиться"}
+
+    def start_next() -> WeatherProvider | None:
+        provider = next(queue, None)
+        if provider is not None:
+            pending[asyncio.create_task(_timed_fetch(provider, city))] = provider
+        return provider
+
+    last = start_next()
+    has_next = True
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=last.health.hedge_delay() if has_next else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if not done:
+                # Провайдер медленнее обычного — дублируем запрос следующему
+                hedge = start_next()
+                has_next = hedge is not None
+                if has_next:
+                    last = hedge
+                    _stats["hedged"] += 1
+                    logger.debug("Хеджирование запроса погоды: %s", hedge.name)
+                continue
+
+            for task in done:
+                provider = pending.pop(task)
+                result = task.result()
+                if "error" not in result:
+                    return result
+                logger.warning(
+                    "Провайдер погоды %s вернул ошибку: %s",
+                    provider.name,
+                    result["error"],
+                )
+
+            if has_next:
+                failover = start_next()
+                has_next = failover is not None
+                if has_next:
+                    last = failover
+                    _stats["failovers"] += 1
+
+        return result
+
+    finally:
+        # Проигравшие запросы отменяются; ожидание их завершения нужно,
+        # чтобы отмена успела попасть в оценку здоровья провайдера
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
@@ -1,21 +1,372 @@
-import aiohttp
 import asyncio
 import json
-from app.redis_client import get_redis_client
-from urllib.parse import quote
+import time
+from collections import Counter
+from uuid import uuid4
+from app.redis_client import get_redis_client, get_binary_redis_client
 
-from utils.weather_utils import validate_city
+from utils.weather_utils import validate_city, normalize_city, city_key
 from app.logger import logger
 from utils.weather_utils import translate_weather
+from utils.cache_utils import TTLCache
+from utils.weather_codec import encode_entry, decode_entry
+from services.weather_providers import fetch_weather, get_providers_stats
+from constants.cache_constants import (
+    WEATHER_CACHE_PREFIX,
+    WEATHER_SOFT_TTL,
+    WEATHER_HARD_TTL,
+    WEATHER_LOCAL_CACHE_SIZE,
+    WEATHER_LOCK_PREFIX,
+    WEATHER_LOCK_TTL,
+    WEATHER_LOCK_POLL_INTERVAL,
+    WEATHER_ALIAS_PREFIX,
+    WEATHER_ALIAS_TTL,
+    WEATHER_ALIAS_CACHE_SIZE,
+)
+
+# Локальный (in-process) уровень кэша погоды перед Redis
+# Значения обоих уровней — записи {"data": погода, "fetched_at": unix time};
+# в Redis они хранятся в компактном бинарном формате (utils.weather_codec)
+_local_cache = TTLCache(WEATHER_LOCAL_CACHE_SIZE, WEATHER_HARD_TTL)
+
+# Локальная копия таблицы псевдонимов: ключ города -> канонический ключ.
+# Хранится не дольше soft TTL, чтобы видеть псевдонимы других реплик.
+_alias_cache = TTLCache(WEATHER_ALIAS_CACHE_SIZE, WEATHER_SOFT_TTL)
+_stats = {
+    "redis_hits": 0,
+    "redis_misses": 0,
+    "upstream_requests": 0,
+    "coalesced": 0,
+    "lock_waits": 0,
+    "stale_served": 0,
+    "refresh_errors": 0,
+    "aliases_learned": 0,
+}
+
+# Запросы погоды пользователями по городам с последнего pop_city_requests().
+# Считаются, только пока работает прогрев кэша (track_city_requests), иначе
+# счётчики некому забирать и они росли бы с каждым новым городом.
+_city_requests: Counter = Counter()
+_track_city_requests = False
+
+# Выполняющиеся загрузки погоды: ключ кэша -> задача (single-flight)
+_inflight: dict[str, asyncio.Future] = {}
+
+WEATHER_LOCK_TTL_MS = int(WEATHER_LOCK_TTL * 1000)
+
+# Снятие блокировки только её владельцем (compare-and-delete)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def get_weather_cache_stats() -> dict:
+    """
+    Возвращает статистику кэша погоды.
+
+    Returns:
+        dict: Статистика локального уровня (local), счётчики попаданий
+        и промахов Redis, запросов к провайдерам погоды, объединённых запросов
+        (coalesced), ожиданий блокировки другой реплики (lock_waits),
+        устаревших ответов (stale_served), ошибок фонового обновления
+        (refresh_errors), выученных псевдонимов городов (aliases_learned)
+        и статистика провайдеров (upstream).
+    """
+
+    return {
+        "local": _local_cache.stats(),
+        "aliases": _alias_cache.stats(),
+        "upstream": get_providers_stats(),
+        **_stats,
+    }
+
+
+async def _resolve_key(city: str, redis_client) -> str:
+    """
+    Возвращает ключ кэша погоды для города с учётом таблицы псевдонимов.
+
+    Название нормализуется и транслитерируется (city_key), затем ключ
+    заменяется каноническим, если провайдер погоды ранее сообщил для него другое
+    название населённого пункта (например, "moskva" -> "moscow").
+
+    Args:
+        city (str): Название города, введённое пользователем.
+        redis_client: Клиент Redis или None.
+
+    Returns:
+        str: Ключ кэша погоды.
+    """
+
+    key = city_key(city)
+    canonical = _alias_cache.get(key)
+    if canonical is None:
+        canonical = key
+        if redis_client:
+            canonical = await redis_client.get(f"{WEATHER_ALIAS_PREFIX}{key}") or key
+        _alias_cache.set(key, canonical)
+    return f"{WEATHER_CACHE_PREFIX}{canonical}"
+
+
+async def _learn_alias(cache_key: str, area: str, result: dict, redis_client) -> None:
+    """
+    Запоминает канонический ключ города по названию места из ответа провайдера.
+
+    Ответ сохраняется и под каноническим ключом, поэтому другие написания
+    того же города сразу попадают в кэш.
+
+    Args:
+        cache_key (str): Ключ кэша, под которым запрашивалась погода.
+        area (str): Название населённого пункта из ответа провайдера.
+        result (dict): Данные о погоде.
+        redis_client: Клиент Redis или None.
+    """
+
+    key = cache_key.removeprefix(WEATHER_CACHE_PREFIX)
+    canonical = city_key(area)
+    if canonical == key or not validate_city(area):
+        return
+
+    _alias_cache.set(key, canonical)
+    await _store_weather(f"{WEATHER_CACHE_PREFIX}{canonical}", result)
+    if redis_client:
+        await redis_client.setex(
+            f"{WEATHER_ALIAS_PREFIX}{key}", WEATHER_ALIAS_TTL, canonical
+        )
+    _stats["aliases_learned"] += 1
+    logger.debug("Псевдоним города: %s -> %s", key, canonical)
+
+
+def track_city_requests(enabled: bool) -> None:
+    """
+    Включает или выключает учёт запросов погоды по городам.
+
+    Args:
+        enabled (bool): True — учитывать запросы (прогрев кэша запущен).
+    """
+
+    global _track_city_requests
+    _track_city_requests = enabled
+    if not enabled:
+        _city_requests.clear()
+
+
+def _count_city_request(city: str) -> None:
+    """
+    Учитывает запрос погоды пользователем в рейтинге прогрева.
+    """
+
+    if _track_city_requests:
+        _city_requests[city_key(city)] += 1
+
+
+def pop_city_requests() -> Counter:
+    """
+    Возвращает и обнуляет счётчики запросов погоды по городам.
+
+    Returns:
+        Counter: Ключ города (city_key) -> количество запросов.
+    """
+
+    counts = _city_requests.copy()
+    _city_requests.clear()
+    return counts
+
+
+def _fresh_for(entry: dict) -> float:
+    """
+    Возвращает, сколько секунд запись кэша погоды ещё свежая (< 0 — устарела).
+    """
+
+    return WEATHER_SOFT_TTL - (time.time() - entry["fetched_at"])
+
+
+def _is_fresh(entry: dict) -> bool:
+    """
+    Проверяет, не истёк ли soft TTL записи кэша погоды.
+    """
+
+    return _fresh_for(entry) > 0
+
+
+async def _read_redis_cache(cache_key: str) -> dict | None:
+    """
+    Читает запись погоды из Redis и переносит её в локальный кэш.
+
+    Args:
+        cache_key (str): Ключ кэша города.
+
+    Returns:
+        dict | None: Запись {"data", "fetched_at"} или None при промахе.
+    """
+
+    # Оставшийся TTL — в том же round-trip, что и значение
+    async with get_binary_redis_client().pipeline(transaction=False) as pipe:
+        pipe.get(cache_key)
+        pipe.pttl(cache_key)
+        cached, ttl_ms = await pipe.execute()
+
+    if not cached:
+        return None
+
+    if cached[:1] == b"{":
+        # JSON-запись старого формата считаем устаревшей
+        legacy = json.loads(cached)
+        entry = {"data": legacy.get("data", legacy), "fetched_at": 0.0}
+    else:
+        entry = decode_entry(cached)
+        if entry is None:
+            logger.warning("Запись кэша погоды %s в неизвестном формате", cache_key)
+            return None
+
+    if ttl_ms > 0:
+        _local_cache.set(cache_key, entry, ttl=ttl_ms / 1000)
+    return entry
+
+
+async def _store_weather(cache_key: str, result: dict) -> None:
+    """
+    Сохраняет погоду в Redis (если доступен) и в локальный кэш.
+    """
+
+    entry = {"data": result, "fetched_at": time.time()}
+    binary_client = get_binary_redis_client()
+    if binary_client:
+        await binary_client.setex(cache_key, WEATHER_HARD_TTL, encode_entry(entry))
+    _local_cache.set(cache_key, entry, ttl=WEATHER_HARD_TTL)
+
+
+async def _fetch_weather(city: str) -> dict:
+    """
+    Запрашивает текущую погоду и прогноз у провайдеров погоды.
+
+    Args:
+        city (str): Название города.
+
+    Returns:
+        dict: Словарь с данными о погоде или словарь с описанием ошибки.
+    """
+
+    _stats["upstream_requests"] += 1
+    return await fetch_weather(city)
+
+
+async def _fetch_and_store(city: str, cache_key: str, redis_client) -> dict:
+    """
+    Запрашивает погоду у провайдеров, кэширует успешный ответ
+    и запоминает псевдоним города.
+    """
+
+    result = await _fetch_weather(normalize_city(city))
+    area = result.pop("area", None)
+    if "error" not in result:
+        await _store_weather(cache_key, result)
+        if area:
+            await _learn_alias(cache_key, area, result, redis_client)
+    return result
+
+
+async def _load_weather(city: str, cache_key: str, redis_client) -> dict:
+    """
+    Загружает погоду при промахе кэша, координируя реплики через Redis.
+
+    Запрос к провайдерам выполняет только владелец блокировки
+    WEATHER_LOCK_PREFIX + город (SET NX PX). Остальные реплики опрашивают
+    кэш, пока владелец не сохранит свежий ответ, и пробуют взять блокировку
+    сами, если она освободилась без результата (ошибка провайдеров).
+    Если ответа нет дольше WEATHER_LOCK_TTL, запрос выполняется без блокировки.
+
+    Args:
+        city (str): Название города.
+        cache_key (str): Ключ кэша города.
+        redis_client: Клиент Redis или None.
+
+    Returns:
+        dict: Данные о погоде или словарь с описанием ошибки.
+    """
+
+    if not redis_client:
+        return await _fetch_and_store(city, cache_key, redis_client)
+
+    lock_key = f"{WEATHER_LOCK_PREFIX}{cache_key.removeprefix(WEATHER_CACHE_PREFIX)}"
+    token = uuid4().hex
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + WEATHER_LOCK_TTL
+
+    while True:
+        if await redis_client.set(lock_key, token, nx=True, px=WEATHER_LOCK_TTL_MS):
+            try:
+                return await _fetch_and_store(city, cache_key, redis_client)
+            finally:
+                # Удаляем блокировку, только если она всё ещё наша
+                await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+        if loop.time() >= deadline:
+            logger.warning("Не дождались погоды для %s от другой реплики", city)
+            return await _fetch_and_store(city, cache_key, redis_client)
+
+        _stats["lock_waits"] += 1
+        await asyncio.sleep(WEATHER_LOCK_POLL_INTERVAL)
+
+        cached = await _read_redis_cache(cache_key)
+        if cached is not None and _is_fresh(cached):
+            logger.debug("Погода для %s получена от другой реплики", city)
+            return cached["data"]
+
+
+def _start_load(city: str, cache_key: str, redis_client) -> asyncio.Future:
+    """
+    Возвращает выполняющуюся загрузку погоды города или запускает новую.
+
+    Одновременные промахи внутри процесса ждут одну задачу (single-flight).
+    """
+
+    inflight = _inflight.get(cache_key)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_load_weather(city, cache_key, redis_client))
+        _inflight[cache_key] = inflight
+        inflight.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    else:
+        _stats["coalesced"] += 1
+        logger.debug("Ожидание уже выполняющегося запроса погоды для %s", city)
+    return inflight
+
+
+def _on_refresh_done(city: str, future: asyncio.Future) -> None:
+    """
+    Учитывает результат фонового обновления погоды (никто его не ждёт).
+    """
+
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is None and "error" not in future.result():
+        return
+
+    _stats["refresh_errors"] += 1
+    logger.warning(
+        "Фоновое обновление погоды для %s не удалось, отдаём устаревшие данные: %s",
+        city,
+        error or future.result()["error"],
+    )
 
 
 async def _get_weather(city: str) -> dict:
     """
-    Получает текущую погоду для указанного города через сервис wttr.in.
-    Функция выполняет HTTP-запрос к публичному сервису wttr.in,
-    который не требует API-ключа и подходит для использования
-    в облачных средах (например, Railway).
-    Также данные в течение 10 минут будут храниться в Redis
+    Получает текущую погоду для указанного города у провайдеров погоды
+    (по умолчанию wttr.in с резервным Open-Meteo; оба не требуют API-ключа
+    и подходят для использования в облачных средах, например Railway).
+    Данные хранятся в Redis и в памяти процесса по схеме
+    stale-while-revalidate: первые 10 минут ответ свежий, затем (до 6 часов)
+    устаревший ответ возвращается сразу, а обновление идёт в фоне — в том
+    числе пока провайдеры недоступны. Ждать ответа провайдера приходится,
+    только если записи в кэше нет.
+
+    Одновременные промахи по одному городу объединяются: внутри процесса
+    все запросы ждут одну задачу загрузки, между репликами — блокировку
+    в Redis, поэтому после истечения записи к провайдерам уходит один запрос.
 
     Args:
         city (str): Название города, для которого необходимо получить погоду.
@@ -24,87 +375,79 @@ async def _get_weather(city: str) -> dict:
         dict: Словарь с данными о погоде или словарь с описанием ошибки.
     """
 
-    cache_key = f"weather:{city.lower()}"
-    cache_ttl = 600
     redis_client = get_redis_client()
+    cache_key = await _resolve_key(city, redis_client)
+
+    entry = _local_cache.get(cache_key)  # Проверяем локальный cache
+    if entry is not None and _is_fresh(entry):
+        logger.debug("Погода для %s получена из локального cache", city)
+        return entry["data"]
 
     if redis_client:
-        cached = await redis_client.get(cache_key)  # Проверяем Redis cache
-        if cached:
-            logger.debug("Погода для %s получена из Redis cache", city)
-            return json.loads(cached)
-
-    url = f"https://wttr.in/{quote(city)}?format=j1"
-    timeout = aiohttp.ClientTimeout(
-        total=60,
-        connect=20,
-        sock_connect=20,
-        sock_read=20,
-    )
+        # Свежую запись могла сохранить другая реплика
+        cached = await _read_redis_cache(cache_key)
+        if cached is not None:
+            _stats["redis_hits"] += 1
+            entry = cached
+            if _is_fresh(entry):
+                logger.debug("Погода для %s получена из Redis cache", city)
+                return entry["data"]
+        else:
+            _stats["redis_misses"] += 1
 
-    headers = {"User-Agent": "Mozilla/5.0"}
+    if entry is not None:
+        # Soft TTL истёк: отвечаем сразу, обновляем в фоне
+        _stats["stale_served"] += 1
+        logger.debug("Погода для %s устарела, обновление в фоне", city)
+        if cache_key not in _inflight:
+            refresh = _start_load(city, cache_key, redis_client)
+            refresh.add_done_callback(lambda future: _on_refresh_done(city, future))
+        return entry["data"]
 
-    retries = 5
-    delay = 0.25
+    # shield: отмена одного ожидающего не отменяет загрузку для остальных
+    return await asyncio.shield(_start_load(city, cache_key, redis_client))
 
-    async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
-        for attempt in range(1, retries + 1):
-            logger.debug("Попытка %s соединения с %s", attempt, url)
 
-            try:
-                async with session.get(url) as resp:
-                    if resp.status != 200:  # type: ignore
-                        logger.warning(
-                            "Ошибка получения погоды с %s. Статус: %s",
-                            url,
-                            resp.status,
-                        )
-                        return {"error": f"Ошибка получения погоды ({resp.status})"}
-
-                    data = await resp.json()
-                    break
-
-            except (TimeoutError, aiohttp.ClientError) as e:
-                logger.exception(
-                    "Ошибка подключения к %s (попытка %s/%s): \n%s",
-                    url,
-                    attempt,
-                    retries,
-                    e,
-                )
-
-            except Exception as e:
-                logger.exception("Неожиданная ошибка при запросе к %s\n%s", url, e)
-
-            if attempt == retries:
-                return {"error": "Не удалось подключиться"}
-
-            await asyncio.sleep(delay)
-            delay *= 2
-
-    try:
-        current = data["current_condition"][0]
-        description = current["weatherDesc"][0]["value"]
-        temp = float(current["temp_C"])
-
-        logger.debug("Обработка данных с %s прошла успешно", url)
-        result = {
-            "weather": [{"description": description}],
-            "main": {"temp": temp},
-        }
+async def weather_needs_refresh(city: str, lead: float) -> bool:
+    """
+    Проверяет, нужно ли обновить погоду города заранее.
 
-        if redis_client:
-            await redis_client.setex(  # сохраняем в Redis
-                cache_key,
-                cache_ttl,
-                json.dumps(result),
-            )
+    Args:
+        city (str): Название города.
+        lead (float): За сколько секунд до истечения soft TTL обновлять запись.
+
+    Returns:
+        bool: True, если записи нет или она станет устаревшей менее чем
+        через lead секунд.
+    """
+
+    redis_client = get_redis_client()
+    cache_key = await _resolve_key(city, redis_client)
+    entry = _local_cache.peek(cache_key)
 
-        return result
+    if redis_client and (entry is None or _fresh_for(entry) <= lead):
+        # Запись могла обновить другая реплика
+        entry = await _read_redis_cache(cache_key) or entry
 
-    except Exception as e:
-        logger.exception("Ошибка обработки ответа wttr.in\n%s", e)
-        return {"error": "Ошибка обработки данных погоды"}
+    return entry is None or _fresh_for(entry) <= lead
+
+
+async def refresh_weather(city: str) -> bool:
+    """
+    Загружает погоду города у провайдеров и обновляет кэш (без учёта в рейтинге).
+
+    Args:
+        city (str): Название города.
+
+    Returns:
+        bool: True, если свежие данные получены.
+    """
+
+    redis_client = get_redis_client()
+    cache_key = await _resolve_key(city, redis_client)
+    load = _start_load(city, cache_key, redis_client)
+    result = await asyncio.shield(load)
+    return "error" not in result
 
 
 async def get_weather_with_translation(city: str) -> dict:
@@ -125,6 +468,7 @@ async def get_weather_with_translation(city: str) -> dict:
         logger.warning("Название города %s не валидировано", city)
         return {"error": "Некорректное название города"}
 
+    _count_city_request(city)
     data = await _get_weather(city)
     if "error" in data:
         return data
@@ -137,3 +481,44 @@ async def get_weather_with_translation(city: str) -> dict:
         "description": translate_weather(desc_en),
         "temp": data["main"]["temp"],
     }
+
+
+async def get_forecast_with_translation(city: str) -> dict:
+    """
+    Получает прогноз погоды для города с переводом описаний.
+
+    Прогноз берётся из той же записи кэша, что и текущая погода,
+    поэтому не требует отдельного запроса к провайдерам.
+
+    Args:
+        city (str): Название города.
+
+    Returns:
+        dict: Словарь с ключами city и days (дни прогноза с переведёнными
+        описаниями по 3 часа; пустой список, если прогноза пока нет)
+        либо словарь с ключом `error` в случае ошибки.
+    """
+
+    logger.info("Запуск получения прогноза погоды в городе %s", city)
+
+    if not validate_city(city):
+        logger.warning("Название города %s не валидировано", city)
+        return {"error": "Некорректное название города"}
+
+    _count_city_request(city)
+    data = await _get_weather(city)
+    if "error" in data:
+        return data
+
+    days = [
+        {
+            **day,
+            "hourly": [
+                {**hour, "description": translate_weather(hour["description"])}
+                for hour in day["hourly"]
+            ],
+        }
+        for day in data.get("forecast", [])
+    ]
+
+    return {"city": city, "days": days}
@@ -0,0 +1,52 @@
+import pytest
+from app import http_client
+
+
+@pytest.fixture(autouse=True)
+async def reset_session():
+    """
+    Закрывает общую HTTP-сессию после каждого теста.
+    """
+    yield
+    await http_client.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_pooled():
+    """
+    Проверяет, что все обращения получают одну сессию с настроенным пулом
+    соединений и DNS-кэшем.
+    """
+
+    await http_client.start_http_client()
+    session = http_client.get_http_session()
+
+    assert http_client.get_http_session() is session
+    connector = session.connector
+    assert connector.limit == http_client.HTTP_POOL_LIMIT
+    assert connector.limit_per_host == http_client.HTTP_POOL_LIMIT_PER_HOST
+    assert connector.use_dns_cache
+
+
+@pytest.mark.asyncio
+async def test_close_http_client_closes_session():
+    """
+    Проверяет, что после остановки сессия закрыта, а новое обращение
+    создаёт новую сессию.
+    """
+
+    session = http_client.get_http_session()
+    await http_client.close_http_client()
+
+    assert session.closed
+    assert http_client.get_http_session() is not session
+
+
+@pytest.mark.asyncio
+async def test_close_without_start_is_noop():
+    """
+    Проверяет, что остановка без запуска не падает.
+    """
+
+    await http_client.close_http_client()
+    assert http_client._session is None
@@ -0,0 +1,118 @@
+"""
+Тестовый модуль для восстановления напоминаний (bot.jobs).
+"""
+
+import sys
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+# Мокаем модуль database ДО импорта модуля (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import jobs  # noqa: E402
+
+
+def make_tasks(*ids):
+    """
+    Создаёт пачку будущих задач.
+    """
+    return [
+        {"id": task_id, "user_id": 1, "scheduled_time": "2026-10-18 12:00:00+00:00"}
+        for task_id in ids
+    ]
+
+
+@pytest.mark.asyncio
+async def test_restore_jobs_overlaps_fetch_and_publish():
+    """
+    Проверяет, что задачи читаются пачками по RESTORE_BATCH_SIZE, запись
+    пачки в Redis идёт параллельно с чтением следующей, а в лог попадает
+    пропускная способность.
+    """
+
+    batches = [make_tasks("t1", "t2"), make_tasks("t3")]
+    events = []
+
+    async def iter_tasks(batch_size):
+        events.append(("batch_size", batch_size))
+        for i, batch in enumerate(batches):
+            await asyncio.sleep(0)  # Чтение следующей пачки из БД
+            events.append(("fetched", i))
+            yield batch
+
+    async def schedule(batch):
+        events.append(("publish", batch[0]["id"]))
+        await asyncio.sleep(0)
+        return len(batch) - 1  # Одно напоминание пачки уже поставлено
+
+    with (
+        patch.object(jobs, "RESTORE_BATCH_SIZE", 2),
+        patch.object(jobs, "iter_future_pending_tasks", iter_tasks),
+        patch.object(jobs, "schedule_reminders", side_effect=schedule) as publish,
+        patch.object(jobs.time, "perf_counter", side_effect=[10.0, 12.0]),
+        patch.object(jobs, "logger") as logger,
+    ):
+        await jobs.restore_jobs(None)
+
+    assert events == [
+        ("batch_size", 2),
+        ("fetched", 0),
+        ("publish", "t1"),  # Первая пачка пишется, пока читается вторая
+        ("fetched", 1),
+        ("publish", "t3"),
+    ]
+    assert publish.await_count == 2
+    logger.info.assert_called_once_with(
+        "Проверено задач: %s, поставлено напоминаний: %s за %.2f с (%.0f задач/с)",
+        3,
+        1,
+        2.0,
+        1.5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_restore_jobs_without_tasks():
+    """
+    Проверяет восстановление при отсутствии будущих задач.
+    """
+
+    async def iter_tasks(batch_size):
+        return
+        yield
+
+    with (
+        patch.object(jobs, "iter_future_pending_tasks", iter_tasks),
+        patch.object(jobs, "schedule_reminders") as publish,
+    ):
+        await jobs.restore_jobs(None)
+
+    publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reschedule_leaves_single_zset_member():
+    """
+    Проверяет, что после переноса задачи в sorted set остаётся ровно
+    одно напоминание — на новое время.
+    """
+
+    zset = {}
+    redis_client = AsyncMock()
+    redis_client.zadd.side_effect = lambda key, mapping: zset.update(mapping)
+    redis_client.zrem.side_effect = lambda key, member: zset.pop(member, None)
+
+    task = make_tasks("t1")[0]
+    old_time = jobs.datetime.fromisoformat(task["scheduled_time"])
+    new_time = jobs.datetime.fromisoformat("2026-10-19 09:00:00+00:00")
+
+    with (
+        patch("bot.scheduler.get_redis_client", return_value=redis_client),
+        patch.object(jobs, "filter_not_enqueued", AsyncMock(side_effect=lambda t: t)),
+        patch.object(jobs, "mark_enqueued", AsyncMock()),
+    ):
+        await jobs.schedule_reminder({**task, "scheduled_time": old_time})
+        await jobs.reschedule_reminder({**task, "scheduled_time": new_time}, old_time)
+
+    assert list(zset.values()) == [new_time.timestamp()]
@@ -0,0 +1,173 @@
+"""
+Тестовый модуль для bot.rate_limiter.
+"""
+
+import pytest
+import weakref
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+from telegram.error import RetryAfter
+
+from bot.rate_limiter import (
+    TelegramRateLimiter,
+    ACQUIRE_SCRIPT,
+    get_rate_limiter_stats,
+)
+
+
+@pytest.mark.asyncio
+async def test_requests_without_chat_are_not_limited():
+    """
+    Проверяет, что запросы без chat_id (например, getUpdates) не ждут в очереди.
+    """
+
+    limiter = TelegramRateLimiter()
+    callback = AsyncMock(return_value=True)
+
+    with patch("bot.rate_limiter.get_redis_client") as mock_get_redis:
+        result = await limiter.process_request(
+            callback, (1,), {"x": 2}, "getUpdates", {}, None
+        )
+
+    assert result is True
+    callback.assert_awaited_once_with(1, x=2)
+    mock_get_redis.assert_not_called()
+    assert limiter.stats()["requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_buckets_wait_until_tokens_available():
+    """
+    Проверяет ожидание по ответу Lua-скрипта и ключи общих ведер.
+    """
+
+    limiter = TelegramRateLimiter()
+    callback = AsyncMock(return_value={"ok": True})
+    mock_redis = AsyncMock()
+    mock_redis.eval.side_effect = [250, 0]
+
+    with (
+        patch("bot.rate_limiter.get_redis_client", return_value=mock_redis),
+        patch("bot.rate_limiter.asyncio.sleep", new_callable=AsyncMock) as sleep,
+    ):
+        result = await limiter.process_request(
+            callback, (), {}, "sendMessage", {"chat_id": "42"}, None
+        )
+
+    assert result == {"ok": True}
+    sleep.assert_awaited_once_with(0.25)
+    args = mock_redis.eval.await_args[0]
+    assert args[:5] == (
+        ACQUIRE_SCRIPT,
+        3,
+        "telegram:rate:retry_after",
+        "telegram:rate:global",
+        "telegram:rate:chat:42",
+    )
+    assert limiter.stats()["requests"] == 1
+    assert limiter.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_and_retries():
+    """
+    Проверяет повтор запроса после RetryAfter и установку общей паузы.
+    """
+
+    limiter = TelegramRateLimiter()
+    callback = AsyncMock(side_effect=[RetryAfter(timedelta(seconds=2)), "sent"])
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = 0
+
+    with patch("bot.rate_limiter.get_redis_client", return_value=mock_redis):
+        result = await limiter.process_request(
+            callback, (), {}, "sendMessage", {"chat_id": 7}, None
+        )
+
+    assert result == "sent"
+    assert callback.await_count == 2
+    mock_redis.set.assert_awaited_once_with("telegram:rate:retry_after", 1, px=2100)
+    assert limiter.stats()["retry_after"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_raised_after_max_retries():
+    """
+    Проверяет, что после исчерпания повторов RetryAfter пробрасывается.
+    """
+
+    limiter = TelegramRateLimiter(max_retries=1)
+    callback = AsyncMock(side_effect=RetryAfter(timedelta(0)))
+
+    with (
+        patch("bot.rate_limiter.get_redis_client", return_value=None),
+        patch("bot.rate_limiter.asyncio.sleep", new_callable=AsyncMock),
+    ):
+        with pytest.raises(RetryAfter):
+            await limiter.process_request(
+                callback, (), {}, "sendMessage", {"chat_id": 7}, None
+            )
+
+    assert callback.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_rate_limit_args_disables_retries():
+    """
+    Проверяет, что rate_limit_args=0 отключает повторы, а не заменяется
+    значением по умолчанию.
+    """
+
+    limiter = TelegramRateLimiter(max_retries=3)
+    callback = AsyncMock(side_effect=RetryAfter(timedelta(0)))
+
+    with (
+        patch("bot.rate_limiter.get_redis_client", return_value=None),
+        patch("bot.rate_limiter.asyncio.sleep", new_callable=AsyncMock),
+    ):
+        with pytest.raises(RetryAfter):
+            await limiter.process_request(
+                callback, (), {}, "sendMessage", {"chat_id": 7}, 0
+            )
+
+    callback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_retry_after_accepts_seconds():
+    """
+    Проверяет паузу, если RetryAfter задан целым числом секунд.
+    """
+
+    limiter = TelegramRateLimiter()
+    callback = AsyncMock(side_effect=[RetryAfter(3), "sent"])
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = 0
+
+    with patch("bot.rate_limiter.get_redis_client", return_value=mock_redis):
+        await limiter.process_request(
+            callback, (), {}, "sendMessage", {"chat_id": 7}, None
+        )
+
+    mock_redis.set.assert_awaited_once_with("telegram:rate:retry_after", 1, px=3100)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_stats_are_exposed():
+    """
+    Проверяет, что метрики ограничителей процесса доступны во время работы.
+    """
+
+    with patch("bot.rate_limiter._limiters", weakref.WeakSet()):
+        limiter = TelegramRateLimiter()
+        callback = AsyncMock(return_value="sent")
+        with patch("bot.rate_limiter.get_redis_client", return_value=None):
+            await limiter.process_request(
+                callback, (), {}, "sendMessage", {"chat_id": 7}, None
+            )
+
+        stats = get_rate_limiter_stats()
+
+    assert stats["requests"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats == limiter.stats()
@@ -0,0 +1,97 @@
+"""
+Тестовый модуль для in-process движка напоминаний (bot.reminder_wheel).
+"""
+
+import sys
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Мокаем модуль database ДО импорта модуля (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import reminder_wheel  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_wheel():
+    """
+    Создаёт отдельное колесо таймеров для каждого теста.
+    """
+    with (
+        patch.object(reminder_wheel, "_wheel", None),
+        patch.object(reminder_wheel, "_driver_task", None),
+    ):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_due_reminder_is_delivered_and_stop_waits():
+    """
+    Проверяет, что созревшее напоминание отправляется через бота
+    приложения, а остановка дожидается незавершённой отправки.
+    """
+
+    app = MagicMock()
+    due = datetime.now(timezone.utc)
+    later = due + timedelta(hours=1)
+    delivered = asyncio.Event()
+
+    async def deliver(bot, task_id, chat_id, scheduled_time):
+        delivered.set()
+        await asyncio.sleep(0.05)
+
+    with patch.object(
+        reminder_wheel, "deliver_reminder", AsyncMock(side_effect=deliver)
+    ) as deliver_reminder:
+        reminder_wheel.add_reminders(
+            [
+                {"id": "t1", "user_id": 42, "scheduled_time": due},
+                {"id": "t2", "user_id": 43, "scheduled_time": later},
+            ]
+        )
+        reminder_wheel.start_wheel(app)
+        await asyncio.wait_for(delivered.wait(), timeout=1)
+        await reminder_wheel.stop_wheel()
+
+    deliver_reminder.assert_awaited_once_with(app.bot, "t1", 42, str(due))
+    assert not reminder_wheel._deliveries
+    assert len(reminder_wheel.get_wheel()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_driver():
+    """
+    Проверяет, что остановка отменяет фоновую задачу колеса,
+    а повторная остановка ничего не делает.
+    """
+
+    reminder_wheel.start_wheel(MagicMock())
+    driver = reminder_wheel._driver_task
+    await asyncio.sleep(0)
+
+    await reminder_wheel.stop_wheel()
+    await reminder_wheel.stop_wheel()
+
+    assert driver.cancelled()
+    assert reminder_wheel._driver_task is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reminder_is_not_delivered():
+    """
+    Проверяет, что отменённое напоминание не отправляется.
+    """
+
+    due = datetime.now(timezone.utc)
+    reminder_wheel.add_reminders([{"id": "t1", "user_id": 42, "scheduled_time": due}])
+
+    assert reminder_wheel.cancel_reminder("t1")
+
+    with patch.object(reminder_wheel, "deliver_reminder", AsyncMock()) as deliver:
+        reminder_wheel.start_wheel(MagicMock())
+        await asyncio.sleep(reminder_wheel.WHEEL_TICK * 2)
+        await reminder_wheel.stop_wheel()
+
+    deliver.assert_not_awaited()
@@ -0,0 +1,144 @@
+"""
+Тестовый модуль для bot.scheduler.
+"""
+
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Мокаем модуль database ДО импорта планировщика (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import scheduler  # noqa: E402
+
+MEMBER = scheduler._encode_reminder(
+    {"id": "t1", "user_id": 42, "scheduled_time": "2026-10-17 12:00:00+00:00"}
+)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_acks_after_publish(make_redis):
+    """
+    Проверяет, что опубликованные напоминания удаляются из обрабатываемых
+    только после публикации.
+    """
+
+    redis_client = make_redis(eval=[MEMBER], zrangebyscore=[])
+
+    with (
+        patch("bot.scheduler.get_redis_client", return_value=redis_client),
+        patch("bot.scheduler.publish_reminders", return_value=1) as publish,
+    ):
+        published = await scheduler.dispatch_due_reminders()
+
+    assert published == 1
+    assert publish.call_args.args[0] == [
+        {"id": "t1", "user_id": 42, "scheduled_time": "2026-10-17 12:00:00+00:00"}
+    ]
+    redis_client.zrem.assert_awaited_once_with("reminders:processing", MEMBER)
+    redis_client.pipeline.return_value.zadd.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_requeues_on_publish_error(make_redis):
+    """
+    Проверяет, что при ошибке публикации напоминания возвращаются
+    в очередь с исходным временем отправки.
+    """
+
+    redis_client = make_redis(eval=[MEMBER], zrangebyscore=[])
+
+    with (
+        patch("bot.scheduler.get_redis_client", return_value=redis_client),
+        patch("bot.scheduler.publish_reminders", side_effect=ConnectionError("broker")),
+        pytest.raises(ConnectionError),
+    ):
+        await scheduler.dispatch_due_reminders()
+
+    pipe = redis_client.pipeline.return_value
+    pipe.zadd.assert_called_once_with("reminders:due", {MEMBER: 1792238400.0})
+    pipe.zrem.assert_called_once_with("reminders:processing", MEMBER)
+    redis_client.zrem.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_processing_reminders_are_requeued(make_redis):
+    """
+    Проверяет возврат в очередь напоминаний, извлечённых упавшей репликой.
+    """
+
+    redis_client = make_redis(eval=[], zrangebyscore=[MEMBER])
+
+    with (
+        patch("bot.scheduler.get_redis_client", return_value=redis_client),
+        patch("bot.scheduler.publish_reminders") as publish,
+    ):
+        published = await scheduler.dispatch_due_reminders()
+
+    assert published == 0
+    publish.assert_not_called()
+    redis_client.pipeline.return_value.zadd.assert_called_once_with(
+        "reminders:due", {MEMBER: 1792238400.0}
+    )
+
+
+def make_tasks(count, scheduled_time="2026-10-17 12:00:00+00:00"):
+    """
+    Создаёт задачи с одинаковым временем напоминания.
+    """
+    return [
+        {"id": f"t{i}", "user_id": i, "scheduled_time": scheduled_time}
+        for i in range(count)
+    ]
+
+
+def test_coalesce_groups_by_due_second_and_splits():
+    """
+    Проверяет группировку напоминаний по секунде отправки и разбиение
+    группы на пачки не больше REMINDER_BATCH_MAX.
+    """
+
+    tasks = make_tasks(5) + make_tasks(1, "2026-10-17 12:00:00.500000+00:00")
+    tasks += make_tasks(1, "2026-10-17 12:00:01+00:00")
+
+    with patch.object(scheduler, "REMINDER_BATCH_MAX", 4):
+        groups = scheduler._coalesce_by_due_second(tasks)
+
+    assert [(due, len(items)) for due, items in groups] == [
+        (1792238400, 4),
+        (1792238400, 2),
+        (1792238401, 1),
+    ]
+    assert groups[0][1][0] == ["t0", 0, "2026-10-17 12:00:00+00:00"]
+
+
+def test_publish_reminders_batches_and_singles():
+    """
+    Проверяет, что пачка уходит пакетной задачей, а одиночное
+    напоминание — обычной, и всё публикуется через один producer.
+    """
+
+    tasks = make_tasks(3) + make_tasks(1, "2026-10-17 12:00:30+00:00")
+    now = scheduler.datetime.fromisoformat("2026-10-17 11:59:50+00:00")
+    producer = MagicMock()
+
+    with (
+        patch.object(scheduler, "celery_app") as celery_app,
+        patch.object(scheduler, "send_task_reminder_task") as single,
+        patch.object(scheduler, "send_task_reminders_batch_task") as batch,
+    ):
+        celery_app.producer_or_acquire.return_value.__enter__.return_value = producer
+        published = scheduler.publish_reminders(tasks, now)
+
+    assert published == 4
+    celery_app.producer_or_acquire.assert_called_once()
+    batch.apply_async.assert_called_once_with(
+        args=[[[f"t{i}", i, "2026-10-17 12:00:00+00:00"] for i in range(3)]],
+        countdown=10.0,
+        producer=producer,
+    )
+    single.apply_async.assert_called_once_with(
+        args=["t0", 0, "2026-10-17 12:00:30+00:00"],
+        countdown=40.0,
+        producer=producer,
+    )
@@ -0,0 +1,153 @@
+"""
+Тестовый модуль для пакетной отправки напоминаний (bot.tasks).
+"""
+
+import sys
+import pytest
+from unittest.mock import AsyncMock, patch
+
+# Мокаем модуль database ДО импорта задач (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import tasks  # noqa: E402
+
+TIME = "2026-10-17 12:00:00+00:00"
+
+
+def make_task(task_id, status="pending", scheduled_time=TIME):
+    """
+    Создаёт задачу в том виде, в каком её возвращает БД.
+    """
+    return {
+        "id": task_id,
+        "text": f"Задача {task_id}",
+        "status": status,
+        "scheduled_time": scheduled_time,
+    }
+
+
+def patch_batch(claims, tasks_db, send_side_effect=None):
+    """
+    Подменяет зависимости _send_task_reminders_batch.
+    """
+    return (
+        patch("bot.tasks.claim_reminders", AsyncMock(return_value=claims)),
+        patch("bot.tasks.get_tasks_by_ids", AsyncMock(return_value=tasks_db)),
+        patch("bot.tasks.get_bot", AsyncMock()),
+        patch(
+            "bot.tasks._send_reminder_message",
+            AsyncMock(side_effect=send_side_effect),
+        ),
+        patch("bot.tasks.release_reminders", AsyncMock()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_tasks_once_and_skips_stale():
+    """
+    Проверяет, что задачи пачки читаются одним запросом, а выполненные,
+    перенесённые и устаревшие по реестру напоминания не отправляются.
+    """
+
+    reminders = [
+        ["t1", 1, TIME],
+        ["t2", 2, TIME],
+        ["t3", 3, TIME],
+        ["t4", 4, TIME],
+    ]
+    tasks_db = [
+        make_task("t1"),
+        make_task("t2", status="done"),
+        make_task("t3", scheduled_time="2026-10-17 13:00:00+00:00"),
+    ]
+    claim, fetch, get_bot, send, release = patch_batch([1, 1, 1, 0], tasks_db)
+
+    with claim, fetch as get_tasks_by_ids, get_bot, send as send_message, release:
+        await tasks._send_task_reminders_batch(reminders)
+
+    get_tasks_by_ids.assert_awaited_once_with(["t1", "t2", "t3"])
+    send_message.assert_awaited_once()
+    assert send_message.await_args.args[1]["id"] == "t1"
+    assert send_message.await_args.args[2] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_releases_only_failed_claims():
+    """
+    Проверяет, что снимаются только заявки напоминаний, которые не удалось
+    отправить, а копии, заявленные раньше (claim == -1), не трогаются.
+    """
+
+    reminders = [["t1", 1, TIME], ["t2", 2, TIME], ["t3", 3, TIME]]
+    tasks_db = [make_task("t1"), make_task("t2"), make_task("t3")]
+
+    async def send(bot, task_db, chat_id):
+        if task_db["id"] != "t1":
+            raise RuntimeError("telegram")
+
+    claim, fetch, get_bot, send_patch, release = patch_batch([1, 1, -1], tasks_db, send)
+
+    with claim, fetch, get_bot, send_patch, release as release_reminders:
+        await tasks._send_task_reminders_batch(reminders)
+
+    release_reminders.assert_awaited_once_with([["t2", 2, TIME]])
+
+
+@pytest.mark.asyncio
+async def test_batch_releases_claims_when_db_fails():
+    """
+    Проверяет, что при ошибке чтения задач все заявки снимаются.
+    """
+
+    reminders = [["t1", 1, TIME], ["t2", 2, TIME]]
+    claim, fetch, get_bot, send, release = patch_batch([1, 1], [])
+
+    with (
+        claim,
+        fetch as get_tasks_by_ids,
+        get_bot,
+        send,
+        release as release_reminders,
+    ):
+        get_tasks_by_ids.side_effect = ConnectionError("db")
+        with pytest.raises(ConnectionError):
+            await tasks._send_task_reminders_batch(reminders)
+
+    release_reminders.assert_awaited_once_with(reminders)
+
+
+@pytest.mark.asyncio
+async def test_batch_skips_fully_stale_batch():
+    """
+    Проверяет, что пачка из одних устаревших копий не обращается к БД.
+    """
+
+    claim, fetch, get_bot, send, release = patch_batch([0, 0], [])
+
+    with claim, fetch as get_tasks_by_ids, get_bot, send, release:
+        await tasks._send_task_reminders_batch([["t1", 1, TIME], ["t2", 2, TIME]])
+
+    get_tasks_by_ids.assert_not_awaited()
+
+
+def test_batch_task_logs_errors():
+    """
+    Проверяет, что пакетная Celery-задача запускает отправку в loop
+    worker-процесса и не падает при ошибке.
+    """
+
+    reminders = [["t1", 1, TIME]]
+
+    def run_async(coro):
+        coro.close()
+        raise RuntimeError("boom")
+
+    with (
+        patch(
+            "bot.tasks._send_task_reminders_batch", return_value=AsyncMock()()
+        ) as send,
+        patch("bot.tasks.run_async", side_effect=run_async),
+    ):
+        tasks.send_task_reminders_batch_task.run(reminders)
+
+    send.assert_called_once_with(reminders)
@@ -0,0 +1,119 @@
+"""
+Тестовый модуль для bot.weather_prefetcher.
+"""
+
+import sys
+import pytest
+from collections import Counter
+from unittest.mock import AsyncMock, patch
+
+# Мокаем модуль database ДО импорта прогревателя (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import weather_prefetcher  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_ranking():
+    """
+    Сбрасывает рейтинг городов в памяти между тестами.
+    """
+    weather_prefetcher._ranked_cities = []
+    weather_prefetcher._ranked_at = None
+
+
+@pytest.mark.asyncio
+async def test_flush_city_requests_increments_popularity(make_redis):
+    """
+    Проверяет перенос счётчиков запросов процесса в общий рейтинг.
+    """
+
+    redis_client = make_redis(zmscore=[], set=True)
+
+    with patch(
+        "bot.weather_prefetcher.pop_city_requests",
+        return_value=Counter({"moscow": 3, "kazan": 1}),
+    ):
+        flushed = await weather_prefetcher.flush_city_requests(redis_client)
+
+    pipe = redis_client.pipeline.return_value
+    assert flushed == 2
+    pipe.zincrby.assert_any_call("weather:meta:popularity", 3, "moscow")
+    pipe.zincrby.assert_any_call("weather:meta:popularity", 1, "kazan")
+
+
+@pytest.mark.asyncio
+async def test_rank_cities_orders_by_requests_then_users(make_redis):
+    """
+    Проверяет, что разные написания города объединяются, а города
+    упорядочиваются по числу запросов, при равенстве — по числу
+    сохранивших их пользователей.
+    """
+
+    rows = [
+        {"city": "москва", "users": 30},
+        {"city": "kazan", "users": 10},
+        {"city": "omsk", "users": 40},
+        {"city": "moskva", "users": 25},
+    ]
+    redis_client = make_redis(zmscore=[None, 7.0, None], set=True)
+
+    with patch("bot.weather_prefetcher.get_saved_cities", AsyncMock(return_value=rows)):
+        ranked = await weather_prefetcher.rank_cities(redis_client)
+
+    assert ranked == ["kazan", "москва", "omsk"]
+    redis_client.zmscore.assert_awaited_once_with(
+        "weather:meta:popularity", ["moskva", "kazan", "omsk"]
+    )
+    redis_client.zunionstore.assert_awaited_once_with(
+        "weather:meta:popularity", {"weather:meta:popularity": 0.5}
+    )
+
+
+@pytest.mark.asyncio
+async def test_prefetch_refreshes_only_due_cities_within_budget(make_redis):
+    """
+    Проверяет, что обновляются только города с истекающими записями
+    и не больше WEATHER_PREFETCH_BUDGET за проход.
+    """
+
+    redis_client = make_redis(zmscore=[], set=True)
+    cities = ["moscow", "kazan", "omsk", "perm"]
+    fresh = {"kazan"}
+    refresh = AsyncMock(return_value=True)
+
+    with (
+        patch("bot.weather_prefetcher.get_redis_client", return_value=redis_client),
+        patch("bot.weather_prefetcher.pop_city_requests", return_value=Counter()),
+        patch("bot.weather_prefetcher.rank_cities", AsyncMock(return_value=cities)),
+        patch(
+            "bot.weather_prefetcher.weather_needs_refresh",
+            AsyncMock(side_effect=lambda city, _: city not in fresh),
+        ),
+        patch("bot.weather_prefetcher.refresh_weather", refresh),
+        patch("bot.weather_prefetcher.WEATHER_PREFETCH_BUDGET", 2),
+    ):
+        refreshed = await weather_prefetcher.prefetch_weather()
+
+    assert refreshed == 2
+    assert [call.args[0] for call in refresh.await_args_list] == ["moscow", "omsk"]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_skipped_when_other_replica_holds_pass(make_redis):
+    """
+    Проверяет, что без права на проход города не обновляются.
+    """
+
+    redis_client = make_redis(zmscore=[], set=False)
+    refresh = AsyncMock()
+
+    with (
+        patch("bot.weather_prefetcher.get_redis_client", return_value=redis_client),
+        patch("bot.weather_prefetcher.pop_city_requests", return_value=Counter()),
+        patch("bot.weather_prefetcher.refresh_weather", refresh),
+    ):
+        refreshed = await weather_prefetcher.prefetch_weather()
+
+    assert refreshed == 0
+    refresh.assert_not_awaited()
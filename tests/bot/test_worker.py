@@ -0,0 +1,104 @@
+"""
+Тестовый модуль для ресурсов Celery worker-процесса (bot.worker).
+"""
+
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Мокаем модуль database ДО импорта модуля (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from bot import worker  # noqa: E402
+
+
+@pytest.fixture
+def resources():
+    """
+    Подменяет бота и пул БД, сбрасывая ресурсы процесса между тестами.
+    """
+    bot = MagicMock()
+    bot.initialize = AsyncMock()
+    bot.shutdown = AsyncMock()
+
+    with (
+        patch.object(worker, "_loop", None),
+        patch.object(worker, "_bot", None),
+        patch.object(worker, "ExtBot", return_value=bot) as ext_bot,
+        patch.object(worker, "HTTPXRequest") as request,
+        patch.object(worker, "get_pool", AsyncMock()) as get_pool,
+        patch.object(worker, "close_db", AsyncMock()) as close_db,
+    ):
+        yield MagicMock(
+            bot=bot,
+            ext_bot=ext_bot,
+            request=request,
+            get_pool=get_pool,
+            close_db=close_db,
+        )
+        if worker._loop is not None:
+            worker._loop.close()
+
+
+def test_resources_are_created_once_per_process(resources):
+    """
+    Проверяет, что loop, бот и пул БД создаются один раз при старте
+    процесса и переиспользуются всеми задачами.
+    """
+
+    worker.on_worker_process_init()
+    loop = worker.get_loop()
+
+    bots = [worker.run_async(worker.get_bot()) for _ in range(3)]
+
+    assert worker.get_loop() is loop
+    assert bots == [resources.bot] * 3
+    resources.ext_bot.assert_called_once()
+    resources.request.assert_called_once_with(
+        connection_pool_size=worker.WORKER_HTTP_POOL_SIZE
+    )
+    resources.bot.initialize.assert_awaited_once()
+    resources.get_pool.assert_awaited_once()
+
+
+def test_bot_is_created_lazily_after_failed_init(resources):
+    """
+    Проверяет, что ошибка инициализации не роняет процесс,
+    а бот создаётся при первой задаче.
+    """
+
+    resources.get_pool.side_effect = ConnectionError("db")
+    resources.bot.initialize.side_effect = [ConnectionError("telegram"), None]
+
+    worker.on_worker_process_init()
+    bot = worker.run_async(worker.get_bot())
+
+    assert bot is resources.bot
+    assert resources.bot.initialize.await_count == 2
+
+
+def test_shutdown_closes_bot_and_pool(resources):
+    """
+    Проверяет, что при остановке процесса закрываются бот, пул БД и loop.
+    """
+
+    worker.on_worker_process_init()
+    loop = worker.get_loop()
+
+    worker.on_worker_process_shutdown()
+
+    resources.bot.shutdown.assert_awaited_once()
+    resources.close_db.assert_awaited_once()
+    assert loop.is_closed()
+    assert worker._loop is None
+    assert worker._bot is None
+
+
+def test_shutdown_without_resources_is_noop(resources):
+    """
+    Проверяет, что остановка процесса без созданного loop ничего не делает.
+    """
+
+    worker.on_worker_process_shutdown()
+
+    resources.close_db.assert_not_awaited()
@@ -1,8 +1,10 @@
+import os
 import sys
 import asyncio
 import pytest
 from pathlib import Path
 from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Определяем корень проекта
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -12,6 +14,14 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+# Celery-приложение (bot.celery_app) требует REDIS_URL при импорте.
+# Брокер в тестах не используется (публикация подменяется), а кэш Redis
+# остаётся выключенным: app.redis_client читает адрес до его подстановки.
+import app.redis_client  # noqa: E402,F401
+
+with patch.dict(os.environ, {"REDIS_URL": os.getenv("REDIS_URL") or "redis://test"}):
+    import bot.celery_app  # noqa: E402,F401
+
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -63,6 +73,31 @@ def fake_callback_query(fake_message):
     )
 
 
+@pytest.fixture
+def make_redis():
+    """
+    Фабрика мока asyncio-клиента Redis с pipeline.
+
+    make_redis(pipeline_result, **returns): execute() pipeline возвращает
+    pipeline_result, команды из returns — заданные значения, GET без
+    заданного значения — None (ключа нет).
+    """
+
+    def factory(pipeline_result=(), **returns):
+        redis_client = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=list(pipeline_result))
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        redis_client.pipeline = MagicMock(return_value=pipe)
+        redis_client.get.return_value = None
+        for command, value in returns.items():
+            getattr(redis_client, command).return_value = value
+        return redis_client
+
+    return factory
+
+
 @pytest.fixture
 def fake_update(user_id, chat_id, fake_message, fake_callback_query):
     """
@@ -0,0 +1,82 @@
+"""
+Тестовый модуль для handlers.callbacks.callbacks_weather.
+"""
+
+import sys
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Мокаем модуль database ДО импорта хендлера (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from constants.time_constants import MOSCOW_TZ  # noqa: E402
+from handlers.callbacks import callbacks_weather  # noqa: E402
+
+
+def make_day(offset):
+    """
+    Создаёт день прогноза со сдвигом offset от текущей даты по Москве.
+    """
+    date = datetime.now(MOSCOW_TZ).date() + timedelta(days=offset)
+    return {"date": date.isoformat(), "min": 1, "max": 8, "hourly": []}
+
+
+def test_find_forecast_day_matches_date():
+    """
+    Проверяет, что день выбирается по дате, а не по позиции в списке.
+    """
+
+    # Прогноз из кэша, полученный вчера: первый день — вчерашний
+    days = [make_day(-1), make_day(0), make_day(1)]
+
+    assert callbacks_weather.find_forecast_day(days, 0) is days[1]
+    assert callbacks_weather.find_forecast_day(days, 1) is days[2]
+    assert callbacks_weather.find_forecast_day(days, 2) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data, days, expected",
+    [
+        ("weather_tomorrow", [make_day(-1), make_day(0), make_day(1)], "day"),
+        ("weather_hourly", [make_day(-1), make_day(0)], "hourly"),
+        ("weather_tomorrow", [make_day(-1), make_day(0)], None),
+        ("weather_today", [], None),
+    ],
+)
+async def test_forecast_view_uses_current_date(data, days, expected):
+    """
+    Проверяет, что кнопки прогноза показывают день с нужной датой,
+    а при его отсутствии сообщают, что прогноз недоступен.
+    """
+
+    update = MagicMock()
+    update.callback_query.edit_message_text = AsyncMock()
+    forecast = {"city": "moscow", "days": days}
+
+    with (
+        patch.object(callbacks_weather, "get_city", AsyncMock(return_value="moscow")),
+        patch.object(
+            callbacks_weather,
+            "get_forecast_with_translation",
+            AsyncMock(return_value=forecast),
+        ),
+        patch.object(callbacks_weather, "format_day_forecast") as day_view,
+        patch.object(callbacks_weather, "format_hourly_forecast") as hourly_view,
+    ):
+        day_view.return_value = "day"
+        hourly_view.return_value = "hourly"
+        await callbacks_weather.handle_weather_callbacks(update, MagicMock(), data)
+
+    text = update.callback_query.edit_message_text.await_args.args[0]
+    if expected is None:
+        assert text == "❌ Прогноз пока недоступен, попробуйте позже"
+        day_view.assert_not_called()
+        hourly_view.assert_not_called()
+    elif expected == "day":
+        assert text == "day"
+        assert day_view.call_args.args[1] is days[-1]
+    else:
+        assert text == "hourly"
+        assert hourly_view.call_args.args[1] is days[1]
@@ -0,0 +1,184 @@
+"""
+Тестовый модуль для services.reminder_service.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import reminder_service
+from constants.reminder_constants import REMINDER_MARKER_GRACE
+
+
+def make_task(task_id: str, hours: int = 1) -> dict:
+    """
+    Создаёт словарь задачи с временем через указанное количество часов.
+    """
+    return {
+        "id": task_id,
+        "user_id": 1,
+        "scheduled_time": datetime(2030, 1, 1, tzinfo=timezone.utc)
+        + timedelta(hours=hours),
+    }
+
+
+@pytest.mark.asyncio
+async def test_filter_not_enqueued_skips_tasks_with_current_marker():
+    """
+    Проверяет, что задачи с маркером на текущее время отбрасываются,
+    а задачи без маркера или с маркером на другое время остаются.
+    """
+
+    tasks = [make_task("a"), make_task("b"), make_task("c")]
+    mock_redis = AsyncMock()
+    mock_redis.mget.return_value = [
+        str(tasks[0]["scheduled_time"]),  # уже поставлено
+        None,  # не ставилось
+        "2029-01-01 00:00:00+00:00",  # время изменено
+    ]
+
+    with patch("services.reminder_service.get_redis_client", return_value=mock_redis):
+        result = await reminder_service.filter_not_enqueued(tasks)
+
+    assert result == [tasks[1], tasks[2]]
+    mock_redis.mget.assert_awaited_once_with(
+        ["reminder:enqueued:a", "reminder:enqueued:b", "reminder:enqueued:c"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_filter_not_enqueued_without_redis():
+    """
+    Проверяет, что без Redis дедупликация отключена.
+    """
+
+    tasks = [make_task("a")]
+
+    with patch("services.reminder_service.get_redis_client", return_value=None):
+        result = await reminder_service.filter_not_enqueued(tasks)
+
+    assert result == tasks
+
+
+@pytest.mark.asyncio
+async def test_mark_enqueued_sets_markers_with_ttl(make_redis):
+    """
+    Проверяет запись маркеров пачкой через pipeline с TTL до времени задачи плюс запас.
+    """
+
+    task = make_task("a", hours=2)
+    now = task["scheduled_time"] - timedelta(hours=2)
+
+    mock_redis = make_redis()
+    pipe = mock_redis.pipeline.return_value
+
+    with (
+        patch("services.reminder_service.get_redis_client", return_value=mock_redis),
+        patch("services.reminder_service.datetime") as mock_datetime,
+    ):
+        mock_datetime.now.return_value = now
+        await reminder_service.mark_enqueued([task])
+
+    pipe.set.assert_called_once_with(
+        "reminder:enqueued:a",
+        str(task["scheduled_time"]),
+        ex=2 * 60 * 60 + REMINDER_MARKER_GRACE,
+    )
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_reminder():
+    """
+    Проверяет вызов Lua-скрипта заявки на отправку напоминания.
+    """
+
+    mock_redis = AsyncMock()
+    mock_redis.eval.return_value = 1
+
+    with patch("services.reminder_service.get_redis_client", return_value=mock_redis):
+        result = await reminder_service.claim_reminder("a", "2030-01-01 00:00:00+00:00")
+
+    assert result == 1
+    mock_redis.eval.assert_awaited_once_with(
+        reminder_service.CLAIM_REMINDER_SCRIPT,
+        1,
+        "reminder:enqueued:a",
+        "2030-01-01 00:00:00+00:00",
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_reminder_without_redis():
+    """
+    Проверяет, что без Redis заявка возвращает "маркера нет".
+    """
+
+    with patch("services.reminder_service.get_redis_client", return_value=None):
+        result = await reminder_service.claim_reminder("a", "x")
+
+    assert result == -1
+
+
+@pytest.mark.asyncio
+async def test_claim_reminders_uses_single_pipeline(make_redis):
+    """
+    Проверяет пакетную заявку на отправку напоминаний через pipeline.
+    """
+
+    mock_redis = make_redis([1, 0])
+    pipe = mock_redis.pipeline.return_value
+
+    reminders = [["a", 1, "t1"], ["b", 2, "t2"]]
+    with patch("services.reminder_service.get_redis_client", return_value=mock_redis):
+        result = await reminder_service.claim_reminders(reminders)
+
+    assert result == [1, 0]
+    assert pipe.eval.call_count == 2
+    pipe.eval.assert_any_call(
+        reminder_service.CLAIM_REMINDER_SCRIPT, 1, "reminder:enqueued:b", "t2"
+    )
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_reminders_without_redis():
+    """
+    Проверяет, что без Redis все заявки возвращают "маркера нет".
+    """
+
+    with patch("services.reminder_service.get_redis_client", return_value=None):
+        result = await reminder_service.claim_reminders([["a", 1, "t"]])
+
+    assert result == [-1]
+
+
+@pytest.mark.asyncio
+async def test_release_reminders_resets_sent_marker(make_redis):
+    """
+    Проверяет отмену заявок неотправленных напоминаний через pipeline.
+    """
+
+    mock_redis = make_redis([1])
+    pipe = mock_redis.pipeline.return_value
+
+    with patch("services.reminder_service.get_redis_client", return_value=mock_redis):
+        await reminder_service.release_reminders([["a", 1, "t1"]])
+
+    pipe.eval.assert_called_once_with(
+        reminder_service.RELEASE_REMINDER_SCRIPT, 1, "reminder:enqueued:a", "t1"
+    )
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_release_reminders_empty_is_noop():
+    """
+    Проверяет, что пустой список не обращается к Redis.
+    """
+
+    mock_redis = MagicMock()
+    with patch("services.reminder_service.get_redis_client", return_value=mock_redis):
+        await reminder_service.release_reminders([])
+
+    mock_redis.pipeline.assert_not_called()
@@ -2,8 +2,10 @@
 Тестовый модуль для services.tasks_service.
 """
 
+import json
 import pytest
-from datetime import datetime
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 import sys
 
@@ -15,16 +17,29 @@ import sys
 mock_database = AsyncMock()
 sys.modules["database"] = mock_database
 
+from services import tasks_service  # noqa: E402
 from services.tasks_service import (  # noqa: E402
     create_task,
     change_task_time,
     get_task,
     get_tasks,
+    get_tasks_page,
     get_nearest_user_task,
     complete_task,
 )
 
 
+@pytest.fixture(autouse=True)
+def no_tasks_cache():
+    """
+    Очищает локальный кэш задач и отключает его уровень в Redis.
+    """
+    tasks_service._local_cache.clear()
+    with patch("services.tasks_service.get_redis_client", return_value=None):
+        yield
+    tasks_service._local_cache.clear()
+
+
 @pytest.mark.asyncio
 async def test_create_task():
     """
@@ -43,10 +58,10 @@ async def test_create_task():
             "services.tasks_service.add_task", new_callable=AsyncMock
         ) as add_task_mock,
         patch(
-            "services.tasks_service.get_task_by_id", new_callable=AsyncMock
+            "services.tasks_service.get_user_task", new_callable=AsyncMock
         ) as get_task_mock,
     ):
-        get_task_mock.return_value = fake_task
+        add_task_mock.return_value = fake_task
 
         result = await create_task(
             user_id=1,
@@ -54,9 +69,12 @@ async def test_create_task():
             scheduled_time=fake_task["scheduled_time"],
         )
 
-        # Проверяем, что БД была вызвана
+        # Задача возвращается INSERT ... RETURNING, без повторного SELECT
         add_task_mock.assert_awaited_once()
-        get_task_mock.assert_awaited_once()
+        get_task_mock.assert_not_awaited()
+
+        # Идентификатор передаётся в БД нативным UUID
+        assert isinstance(add_task_mock.await_args.args[0], UUID)
 
         assert result == fake_task
 
@@ -78,16 +96,17 @@ async def test_change_task_time():
             "services.tasks_service.update_task_time", new_callable=AsyncMock
         ) as update_mock,
         patch(
-            "services.tasks_service.get_task_by_id", new_callable=AsyncMock
+            "services.tasks_service.get_user_task", new_callable=AsyncMock
         ) as get_task_mock,
     ):
-        get_task_mock.return_value = fake_task
+        update_mock.return_value = fake_task
 
-        result = await change_task_time("task-id", new_time)
+        result = await change_task_time("task-id", 1, new_time)
 
-        # Проверяем корректность вызовов
-        update_mock.assert_awaited_once_with("task-id", new_time)
-        get_task_mock.assert_awaited_once_with("task-id")
+        # Проверяем корректность вызовов: один запрос UPDATE ... RETURNING
+        # с проверкой владельца
+        update_mock.assert_awaited_once_with("task-id", 1, new_time)
+        get_task_mock.assert_not_awaited()
 
         assert result == fake_task
 
@@ -100,12 +119,12 @@ async def test_get_task():
 
     fake_task = {"id": "task-id"}
 
-    with patch("services.tasks_service.get_task_by_id", new_callable=AsyncMock) as mock:
+    with patch("services.tasks_service.get_user_task", new_callable=AsyncMock) as mock:
         mock.return_value = fake_task
 
-        result = await get_task("task-id")
+        result = await get_task("task-id", 1)
 
-        mock.assert_awaited_once_with("task-id")
+        mock.assert_awaited_once_with("task-id", 1)
         assert result == fake_task
 
 
@@ -154,7 +173,227 @@ async def test_complete_task():
     Проверяет завершение задачи.
     """
 
+    fake_task = {"id": "task-id", "user_id": 1}
+
+    with patch("services.tasks_service.mark_task_done", new_callable=AsyncMock) as mock:
+        mock.return_value = fake_task
+
+        result = await complete_task("task-id", 1)
+
+        mock.assert_awaited_once_with("task-id", 1)
+        assert result == fake_task
+
+
+@pytest.mark.asyncio
+async def test_complete_task_repeated_click():
+    """
+    Проверяет, что повторное выполнение (чужой или уже выполненной)
+    задачи возвращает None.
+    """
+
     with patch("services.tasks_service.mark_task_done", new_callable=AsyncMock) as mock:
-        await complete_task("task-id")
+        mock.return_value = None
+
+        assert await complete_task("task-id", 2) is None
+
+
+def make_rows(n: int) -> list[dict]:
+    """
+    Создаёт n задач с возрастающим временем выполнения.
+    """
+    return [
+        {"id": str(i), "scheduled_time": datetime(2026, 3, 1, 10, i)} for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_page_first_page():
+    """
+    Проверяет первую страницу: запрашивается на одну задачу больше,
+    лишняя задача означает наличие следующей страницы.
+    """
+
+    with patch(
+        "services.tasks_service.db_get_tasks_page", new_callable=AsyncMock
+    ) as mock:
+        mock.return_value = make_rows(4)
+
+        page = await get_tasks_page(42, page_size=3)
+
+        mock.assert_awaited_once_with(42, 4, None, False)
+        assert page == {"tasks": make_rows(3), "has_prev": False, "has_next": True}
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_page_next_page():
+    """
+    Проверяет страницу после курсора.
+    """
+
+    cursor = (datetime(2026, 3, 1, 10, 0), "0")
+
+    with patch(
+        "services.tasks_service.db_get_tasks_page", new_callable=AsyncMock
+    ) as mock:
+        mock.return_value = make_rows(2)
+
+        page = await get_tasks_page(42, cursor, page_size=3)
+
+        mock.assert_awaited_once_with(42, 4, cursor, False)
+        assert page == {"tasks": make_rows(2), "has_prev": True, "has_next": False}
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_page_backward_reaching_start_shows_first_page():
+    """
+    Проверяет, что при листании назад к началу списка
+    показывается полная первая страница.
+    """
+
+    cursor = (datetime(2026, 3, 1, 10, 5), "5")
+
+    with patch(
+        "services.tasks_service.db_get_tasks_page", new_callable=AsyncMock
+    ) as mock:
+        mock.side_effect = [make_rows(2), make_rows(4)]
+
+        page = await get_tasks_page(42, cursor, backward=True, page_size=3)
+
+        assert mock.await_args_list[1].args == (42, 4, None, False)
+        assert page == {"tasks": make_rows(3), "has_prev": False, "has_next": True}
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_page_backward():
+    """
+    Проверяет страницу перед курсором.
+    """
+
+    cursor = (datetime(2026, 3, 1, 10, 9), "9")
+
+    with patch(
+        "services.tasks_service.db_get_tasks_page", new_callable=AsyncMock
+    ) as mock:
+        mock.return_value = make_rows(4)
+
+        page = await get_tasks_page(42, cursor, backward=True, page_size=3)
+
+        mock.assert_awaited_once_with(42, 4, cursor, True)
+        assert page == {"tasks": make_rows(4)[1:], "has_prev": True, "has_next": True}
+
+
+@pytest.mark.asyncio
+async def test_nearest_task_is_cached_until_write():
+    """
+    Проверяет, что повторное получение ближайшей задачи обслуживается
+    из памяти, а запись задач пользователя инвалидирует кэш.
+    """
+
+    with (
+        patch(
+            "services.tasks_service.get_nearest_task", new_callable=AsyncMock
+        ) as nearest_mock,
+        patch("services.tasks_service.add_task", new_callable=AsyncMock),
+    ):
+        nearest_mock.return_value = {"id": "nearest"}
+
+        assert await get_nearest_user_task(7) == {"id": "nearest"}
+        assert await get_nearest_user_task(7) == {"id": "nearest"}
+        nearest_mock.assert_awaited_once()
+
+        await create_task(7, "Новая задача", datetime(2026, 3, 1, 10, 0))
+        await get_nearest_user_task(7)
+        assert nearest_mock.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_count_views():
+    """
+    Проверяет, что попадания и промахи считаются по представлениям:
+    запись пользователя без нужного представления — промах.
+    """
+
+    before = tasks_service.get_tasks_cache_stats()
+
+    with (
+        patch("services.tasks_service.get_nearest_task", new_callable=AsyncMock),
+        patch("services.tasks_service.get_all_tasks", new_callable=AsyncMock),
+    ):
+        await get_nearest_user_task(7)
+        await get_tasks(7)
+        await get_tasks(7)
+
+    stats = tasks_service.get_tasks_cache_stats()
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_invalidate_cache():
+    """
+    Проверяет, что неудачное выполнение чужой задачи не сбрасывает кэш.
+    """
+
+    with (
+        patch(
+            "services.tasks_service.get_all_tasks", new_callable=AsyncMock
+        ) as all_mock,
+        patch(
+            "services.tasks_service.mark_task_done", new_callable=AsyncMock
+        ) as done_mock,
+    ):
+        all_mock.return_value = [{"id": "1"}]
+        done_mock.return_value = None
+
+        await get_tasks(7)
+        await complete_task("task-id", 7)
+        await get_tasks(7)
+
+        all_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_write_during_load_is_not_overwritten():
+    """
+    Проверяет, что значение, загруженное до инвалидации, не сохраняется в кэш.
+    """
+
+    async def load_and_write(user_id):
+        await tasks_service.invalidate_user_tasks(user_id)
+        return {"id": "stale"}
+
+    with patch(
+        "services.tasks_service.get_nearest_task", side_effect=load_and_write
+    ) as nearest_mock:
+        await get_nearest_user_task(7)
+        await get_nearest_user_task(7)
+
+        assert nearest_mock.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_restores_task_types():
+    """
+    Проверяет чтение представления из Redis с восстановлением uuid и datetime.
+    """
+
+    task = {
+        "id": uuid4(),
+        "user_id": 7,
+        "title": "Задача",
+        "scheduled_time": datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc),
+        "status": "pending",
+    }
+    mock_redis = AsyncMock()
+    mock_redis.hget.return_value = json.dumps(task, default=str)
+
+    with (
+        patch("services.tasks_service.get_redis_client", return_value=mock_redis),
+        patch(
+            "services.tasks_service.get_nearest_task", new_callable=AsyncMock
+        ) as nearest_mock,
+    ):
+        assert await get_nearest_user_task(7) == task
 
-        mock.assert_awaited_once_with("task-id")
+        mock_redis.hget.assert_awaited_once_with("tasks:cache:7", "nearest")
+        nearest_mock.assert_not_awaited()
@@ -0,0 +1,71 @@
+"""
+Тестовый модуль для services.users_service.
+"""
+
+import sys
+import pytest
+from unittest.mock import AsyncMock, patch
+
+# Мокаем модуль database ДО импорта users_service (см. test_tasks_service)
+sys.modules.setdefault("database", AsyncMock())
+
+from services import users_service  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Очищает кэш профилей и счётчики между тестами.
+    """
+    users_service._city_cache = users_service.TTLCache(10, 60)
+    users_service._write_stats.update(upserts=0, upserts_skipped=0)
+    yield
+
+
+@pytest.mark.asyncio
+async def test_get_city_reads_db_once():
+    """
+    Проверяет, что повторное получение города (в том числе отсутствующего)
+    не обращается к БД.
+    """
+
+    with patch(
+        "services.users_service.get_user_city", new_callable=AsyncMock
+    ) as db_mock:
+        db_mock.side_effect = ["Москва", None]
+
+        assert await users_service.get_city(1) == "Москва"
+        assert await users_service.get_city(1) == "Москва"
+        assert await users_service.get_city(2) is None
+        assert await users_service.get_city(2) is None
+
+        assert db_mock.await_count == 2
+        stats = users_service.get_users_cache_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_save_city_is_write_through_and_skips_unchanged():
+    """
+    Проверяет запись города насквозь и пропуск upsert без изменений.
+    """
+
+    with (
+        patch(
+            "services.users_service.set_user_city", new_callable=AsyncMock
+        ) as set_mock,
+        patch(
+            "services.users_service.get_user_city", new_callable=AsyncMock
+        ) as get_mock,
+    ):
+        assert await users_service.save_city(1, "Казань") is True
+        assert await users_service.save_city(1, "Казань") is False
+        assert await users_service.get_city(1) == "Казань"
+        assert await users_service.save_city(1, "Самара") is True
+
+        assert set_mock.await_count == 2
+        get_mock.assert_not_awaited()
+        stats = users_service.get_users_cache_stats()
+        assert stats["upserts"] == 2
+        assert stats["upserts_skipped"] == 1
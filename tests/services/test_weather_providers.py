@@ -0,0 +1,307 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app import http_client
+from services import weather_providers
+from services.weather_providers import (
+    ProviderHealth,
+    WeatherProvider,
+    WttrProvider,
+    OpenMeteoProvider,
+    fetch_weather,
+    rank_providers,
+    _parse_open_meteo,
+)
+from benchmarks.weather_stub_server import create_stub_app, start_stub_server
+
+WEATHER = {"weather": [{"description": "Sunny"}], "main": {"temp": 5.0}}
+
+
+class FakeProvider(WeatherProvider):
+    """
+    Провайдер с заданной задержкой и результатом.
+    """
+
+    def __init__(self, name, result=WEATHER, delay=0.0):
+        super().__init__(name)
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    async def fetch(self, city):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.result
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    """
+    Сбрасывает счётчики хеджирования и failover между тестами.
+    """
+    weather_providers._stats.update(hedged=0, failovers=0)
+    yield
+
+
+def use_providers(*providers):
+    return patch.object(weather_providers, "_providers", list(providers))
+
+
+def test_provider_name_defaults_to_class_name_attribute():
+    """
+    Проверяет, что без явного имени провайдер берёт атрибут класса name.
+    """
+
+    assert WttrProvider().name == "wttr"
+    assert OpenMeteoProvider().name == "open-meteo"
+    assert WttrProvider("stub").name == "stub"
+
+
+def test_health_hedge_delay_uses_p95():
+    """
+    Проверяет, что до набора замеров используется задержка по умолчанию,
+    а затем — p95 успешных ответов.
+    """
+
+    health = ProviderHealth()
+    assert health.hedge_delay() == weather_providers.WEATHER_HEDGE_DELAY
+
+    for i in range(100):
+        health.record(0.2 if i < 95 else 5.0, True)
+
+    assert health.percentile(95) == 5.0
+    assert health.percentile(50) == 0.2
+    assert health.hedge_delay() == 5.0
+
+
+def test_health_marks_unavailable_after_failures():
+    """
+    Проверяет, что после серии ошибок подряд провайдер недоступен,
+    а рейтинг переносит его в конец очереди.
+    """
+
+    broken = FakeProvider("broken")
+    healthy = FakeProvider("healthy")
+    for _ in range(weather_providers.WEATHER_PROVIDER_MAX_FAILURES):
+        broken.health.record(0.1, False)
+
+    assert not broken.health.available()
+    assert broken.health.stats()["failures"] == 3
+    assert rank_providers([broken, healthy]) == [healthy, broken]
+
+
+def test_rank_keeps_configured_order_for_healthy():
+    """
+    Проверяет, что здоровые провайдеры остаются в порядке настройки.
+    """
+
+    first, second = FakeProvider("first"), FakeProvider("second")
+    first.health.record(3.0, True)
+    second.health.record(0.1, True)
+
+    assert rank_providers([first, second]) == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_fetch_weather_hedges_slow_provider():
+    """
+    Проверяет, что медленный провайдер дублируется следующим,
+    берётся первый ответ, а медленный запрос отменяется.
+    """
+
+    slow = FakeProvider("slow", {**WEATHER, "area": "slow"}, delay=5)
+    fast = FakeProvider("fast", {**WEATHER, "area": "fast"})
+
+    with (
+        use_providers(slow, fast),
+        patch.object(weather_providers, "WEATHER_HEDGE_DELAY", 0.01),
+    ):
+        result = await fetch_weather("Moscow")
+        await asyncio.sleep(0)
+
+    assert result["area"] == "fast"
+    assert slow.cancelled
+    assert weather_providers._stats["hedged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_weather_fails_over_on_error():
+    """
+    Проверяет, что при ошибке провайдера запрос сразу уходит следующему.
+    """
+
+    broken = FakeProvider("broken", {"error": "Не удалось подключиться"})
+    backup = FakeProvider("backup")
+
+    with use_providers(broken, backup):
+        result = await fetch_weather("Moscow")
+
+    assert result == WEATHER
+    assert backup.calls == 1
+    assert weather_providers._stats["failovers"] == 1
+    assert broken.health.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_weather_returns_last_error():
+    """
+    Проверяет, что при ошибке всех провайдеров возвращается ошибка.
+    """
+
+    first = FakeProvider("first", {"error": "Ошибка получения погоды (500)"})
+    second = FakeProvider("second", {"error": "Не удалось подключиться"})
+
+    with use_providers(first, second):
+        result = await fetch_weather("Moscow")
+
+    assert result == {"error": "Не удалось подключиться"}
+    assert first.calls == second.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_wttr_provider_with_stub_server():
+    """
+    Проверяет провайдер wttr.in на локальной заглушке.
+    """
+
+    runner, url = await start_stub_server(create_stub_app())
+    try:
+        result = await WttrProvider("stub", url).fetch("Moscow")
+    finally:
+        await http_client.close_http_client()
+        await runner.cleanup()
+
+    assert result["weather"] == [{"description": "Partly cloudy"}]
+    assert result["main"] == {"temp": 5.0}
+    assert result["area"] == "Moscow"
+    assert len(result["forecast"]) == 3
+    assert result["forecast"][0]["hourly"][4] == {
+        "hour": 12,
+        "temp": 5.0,
+        "rain": 20,
+        "description": "Light rain",
+    }
+
+
+@pytest.mark.asyncio
+async def test_wttr_provider_stub_error():
+    """
+    Проверяет, что ответ заглушки со статусом 503 возвращается как ошибка.
+    """
+
+    runner, url = await start_stub_server(create_stub_app(error_rate=1.0))
+    try:
+        result = await WttrProvider("stub", url).fetch("Moscow")
+    finally:
+        await http_client.close_http_client()
+        await runner.cleanup()
+
+    assert result == {"error": "Ошибка получения погоды (503)"}
+
+
+def test_parse_open_meteo():
+    """
+    Проверяет приведение ответа Open-Meteo к общему виду.
+    """
+
+    data = {
+        "current": {"temperature_2m": 3.4, "weather_code": 61},
+        "hourly": {
+            "time": ["2026-10-17T00:00", "2026-10-17T01:00", "2026-10-17T03:00"],
+            "temperature_2m": [1.0, 1.5, 2.0],
+            "weather_code": [0, 0, 3],
+            "precipitation_probability": [0, 5, None],
+        },
+        "daily": {
+            "time": ["2026-10-17"],
+            "temperature_2m_min": [0.5],
+            "temperature_2m_max": [6.0],
+        },
+    }
+
+    result = _parse_open_meteo(data, "Moscow")
+
+    assert result["weather"] == [{"description": "Light rain"}]
+    assert result["main"] == {"temp": 3.4}
+    assert result["area"] == "Moscow"
+    assert result["forecast"] == [
+        {
+            "date": "2026-10-17",
+            "min": 0.5,
+            "max": 6.0,
+            "hourly": [
+                {"hour": 0, "temp": 1.0, "rain": 0, "description": "Clear"},
+                {"hour": 3, "temp": 2.0, "rain": 0, "description": "Overcast"},
+            ],
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hanging_stub_is_demoted():
+    """
+    Проверяет, что зависающий провайдер, проигравший гонку хеджирования,
+    получает неудачный замер с фактической задержкой, уходит в конец
+    очереди и больше не задерживает запросы.
+    """
+
+    hanging_runner, hanging_url = await start_stub_server(create_stub_app(delay=1.0))
+    healthy_runner, healthy_url = await start_stub_server(create_stub_app())
+    hanging = WttrProvider("hanging", hanging_url)
+    healthy = WttrProvider("healthy", healthy_url)
+
+    try:
+        with (
+            use_providers(hanging, healthy),
+            patch.object(weather_providers, "WEATHER_HEDGE_DELAY", 0.05),
+        ):
+            first = await fetch_weather("Moscow")
+
+            stats = hanging.health.stats()
+            assert stats["failures"] == 1
+            assert stats["p95"] >= 0.05
+            assert rank_providers([hanging, healthy]) == [healthy, hanging]
+
+            second = await fetch_weather("Moscow")
+    finally:
+        await http_client.close_http_client()
+        await hanging_runner.cleanup()
+        await healthy_runner.cleanup()
+
+    assert "error" not in first and "error" not in second
+    assert weather_providers._stats["hedged"] == 1
+    assert hanging.health.stats()["requests"] == 1
+    assert healthy.health.stats()["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedge_is_not_counted():
+    """
+    Проверяет, что отмена быстрого дублирующего запроса, проигравшего
+    основному, не считается ошибкой провайдера.
+    """
+
+    primary = FakeProvider("primary", delay=0.05)
+    backup = FakeProvider("backup", delay=5)
+    # Обычная задержка резервного провайдера — 1 с, отмена наступит раньше
+    for _ in range(weather_providers.WEATHER_HEDGE_MIN_SAMPLES):
+        backup.health.record(1.0, True)
+
+    with (
+        use_providers(primary, backup),
+        patch.object(weather_providers, "WEATHER_HEDGE_DELAY", 0.01),
+    ):
+        await fetch_weather("Moscow")
+
+    assert backup.cancelled
+    assert (
+        backup.health.stats()["requests"] == weather_providers.WEATHER_HEDGE_MIN_SAMPLES
+    )
+    assert backup.health.stats()["failures"] == 0
+    assert primary.health.stats()["failures"] == 0
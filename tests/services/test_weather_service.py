@@ -1,7 +1,55 @@
+import time
+import asyncio
 import json
 import pytest
-from unittest.mock import patch, AsyncMock
-from services import weather_service
+from unittest.mock import patch, AsyncMock, MagicMock
+from services import weather_service, weather_providers
+from utils.weather_codec import encode_entry, decode_entry
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """
+    Очищает локальный уровень кэша погоды и псевдонимы между тестами.
+    """
+    weather_service._local_cache.clear()
+    weather_service._alias_cache.clear()
+    yield
+    weather_service._local_cache.clear()
+    weather_service._alias_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def single_provider():
+    """
+    Оставляет один провайдер wttr.in, чтобы ошибки не уходили в failover.
+    """
+    with patch.object(
+        weather_providers, "_providers", [weather_providers.WttrProvider()]
+    ):
+        yield
+
+
+def make_entry(data, age=0.0):
+    """
+    Создаёт закодированную запись кэша погоды возраста age секунд.
+    """
+    return encode_entry({"data": data, "fetched_at": time.time() - age})
+
+
+def use_redis(mock_redis):
+    """
+    Подменяет текстовый и бинарный клиенты Redis сервиса погоды одним моком.
+    """
+    return patch.multiple(
+        "services.weather_service",
+        get_redis_client=MagicMock(return_value=mock_redis),
+        get_binary_redis_client=MagicMock(return_value=mock_redis),
+    )
+
+
+# Ответ pipeline кэша (GET, PTTL), когда ключа нет
+CACHE_MISS = [None, -2]
 
 
 # Моки для aiohttp ClientSession и Response
@@ -58,7 +106,7 @@ class MockAiohttpSession:
         """
         self._response = response  # Сохраняем объект ответа
 
-    def get(self, _):
+    def get(self, _, **kwargs):
         """
         Имитирует метод session.get(url).
 
@@ -103,14 +151,18 @@ async def test_get_weather_success():
     # Создаем мок-сессию aiohttp.ClientSession, которая возвращает mock_response
     mock_session = MockAiohttpSession(response=mock_response)
 
-    # Патчим ClientSession, чтобы функция _get_weather использовала наш мок
+    # Патчим общую HTTP-сессию, чтобы функция _get_weather использовала наш мок
     with patch(
-        "services.weather_service.aiohttp.ClientSession", return_value=mock_session
+        "services.weather_providers.get_http_session", return_value=mock_session
     ):
         result = await weather_service._get_weather("Moscow")
 
     # Проверяем, что результат преобразован правильно
-    assert result == {"weather": [{"description": "Sunny"}], "main": {"temp": 25.0}}
+    assert result == {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 25.0},
+        "forecast": [],
+    }
 
 
 @pytest.mark.asyncio
@@ -125,9 +177,9 @@ async def test_get_weather_http_error():
     # Создаем мок-сессию, возвращающую mock_response
     mock_session = MockAiohttpSession(response=mock_response)
 
-    # Патчим ClientSession на мок
+    # Патчим общую HTTP-сессию на мок
     with patch(
-        "services.weather_service.aiohttp.ClientSession", return_value=mock_session
+        "services.weather_providers.get_http_session", return_value=mock_session
     ):
         result = await weather_service._get_weather("Moscow")
 
@@ -143,14 +195,14 @@ async def test_get_weather_timeout_error():
     """
 
     class TimeoutSession(MockAiohttpSession):
-        def get(self, _):
+        def get(self, _, **kwargs):
             raise TimeoutError("Connection timeout")
 
     mock_response = MockAiohttpResponse(status=408, json_data={})
     mock_session = TimeoutSession(response=mock_response)
 
     with patch(
-        "services.weather_service.aiohttp.ClientSession",
+        "services.weather_providers.get_http_session",
         return_value=mock_session,
     ):
         result = await weather_service._get_weather("Moscow")
@@ -172,9 +224,9 @@ async def test_get_weather_json_error():
     mock_response = BadResponse(status=200)
     mock_session = MockAiohttpSession(response=mock_response)
 
-    # Патчим ClientSession
+    # Патчим общую HTTP-сессию
     with patch(
-        "services.weather_service.aiohttp.ClientSession", return_value=mock_session
+        "services.weather_providers.get_http_session", return_value=mock_session
     ):
         result = await weather_service._get_weather("Moscow")
 
@@ -193,7 +245,11 @@ async def test_get_weather_with_translation_success():
     """
     Проверка успешного получения погоды с переводом описания на русский.
     """
-    fake_data = {"weather": [{"description": "Cloudy"}], "main": {"temp": 10.0}}
+    fake_data = {
+        "weather": [{"description": "Cloudy"}],
+        "main": {"temp": 10.0},
+        "forecast": [],
+    }
 
     # Патчим функции validate_city, _get_weather и translate_weather
     with (
@@ -258,9 +314,9 @@ async def test_get_weather_data_processing_error():
     mock_resp = MockAiohttpResponse(status=200, json_data=fake_data)
     mock_session = MockAiohttpSession(response=mock_resp)
 
-    # Патчим ClientSession на мок
+    # Патчим общую HTTP-сессию на мок
     with patch(
-        "services.weather_service.aiohttp.ClientSession", return_value=mock_session
+        "services.weather_providers.get_http_session", return_value=mock_session
     ):
         result = await weather_service._get_weather("Moscow")
 
@@ -270,7 +326,7 @@ async def test_get_weather_data_processing_error():
 
 
 @pytest.mark.asyncio
-async def test_get_weather_from_redis_cache():
+async def test_get_weather_from_redis_cache(make_redis):
     """
     Проверяет получение данных из Redis cache (без HTTP-запроса).
     """
@@ -278,14 +334,14 @@ async def test_get_weather_from_redis_cache():
     cached_result = {
         "weather": [{"description": "Sunny"}],
         "main": {"temp": 15.0},
+        "forecast": [],
     }
 
-    mock_redis = AsyncMock()
-    mock_redis.get.return_value = json.dumps(cached_result)
+    mock_redis = make_redis([make_entry(cached_result), 300_000])
 
     with (
-        patch("services.weather_service.get_redis_client", return_value=mock_redis),
-        patch("services.weather_service.aiohttp.ClientSession") as mock_session,
+        use_redis(mock_redis),
+        patch("services.weather_providers.get_http_session") as mock_session,
     ):
         result = await weather_service._get_weather("Moscow")
 
@@ -300,7 +356,7 @@ async def test_get_weather_from_redis_cache():
 
 
 @pytest.mark.asyncio
-async def test_get_weather_saves_to_redis_when_cache_miss():
+async def test_get_weather_saves_to_redis_when_cache_miss(make_redis):
     """
     Проверяет сохранение данных в Redis при отсутствии cache.
     """
@@ -312,18 +368,19 @@ async def test_get_weather_saves_to_redis_when_cache_miss():
     mock_response = MockAiohttpResponse(status=200, json_data=fake_data)
     mock_session = MockAiohttpSession(response=mock_response)
 
-    mock_redis = AsyncMock()
-    mock_redis.get.return_value = None
+    mock_redis = make_redis(CACHE_MISS)
 
     with (
-        patch("services.weather_service.get_redis_client", return_value=mock_redis),
-        patch(
-            "services.weather_service.aiohttp.ClientSession", return_value=mock_session
-        ),
+        use_redis(mock_redis),
+        patch("services.weather_providers.get_http_session", return_value=mock_session),
     ):
         result = await weather_service._get_weather("Moscow")
 
-    expected = {"weather": [{"description": "Sunny"}], "main": {"temp": 20.0}}
+    expected = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 20.0},
+        "forecast": [],
+    }
 
     assert result == expected
 
@@ -333,5 +390,469 @@ async def test_get_weather_saves_to_redis_when_cache_miss():
     args = mock_redis.setex.await_args[0]
 
     assert args[0] == "weather:moscow"  # cache_key
-    assert args[1] == 600  # TTL
-    assert json.loads(args[2]) == expected
+    assert args[1] == weather_service.WEATHER_HARD_TTL  # TTL
+    entry = decode_entry(args[2])
+    assert entry["data"] == expected
+    assert time.time() - entry["fetched_at"] < 5
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_fills_local_cache_with_remaining_ttl(make_redis):
+    """
+    Проверяет, что запись из Redis попадает в локальный кэш с оставшимся
+    TTL Redis, и повторный запрос обслуживается без обращения к Redis.
+    """
+
+    cached_result = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+    mock_redis = make_redis([make_entry(cached_result), 120_000])
+
+    with use_redis(mock_redis):
+        first = await weather_service._get_weather("Moscow")
+        second = await weather_service._get_weather("moscow")
+
+    assert first == second == cached_result
+    mock_redis.pipeline.assert_called_once()
+    assert 119 < weather_service._local_cache.ttl_left("weather:moscow") <= 120
+    assert weather_service.get_weather_cache_stats()["local"]["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_upstream_result_is_cached_locally_without_redis():
+    """
+    Проверяет, что без Redis ответ wttr.in кэшируется в памяти процесса.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}]
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch(
+            "services.weather_providers.get_http_session", return_value=mock_session
+        ) as session_cls,
+    ):
+        await weather_service._get_weather("Kazan")
+        await weather_service._get_weather("Kazan")
+
+    session_cls.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_request():
+    """
+    Проверяет, что одновременные промахи по одному городу выполняют
+    один запрос к wttr.in, а остальные получают тот же результат.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}]
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch(
+            "services.weather_providers.get_http_session", return_value=mock_session
+        ) as session_cls,
+    ):
+        results = await asyncio.gather(
+            *(weather_service._get_weather("Omsk") for _ in range(5))
+        )
+
+    expected = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 20.0},
+        "forecast": [],
+    }
+    assert results == [expected] * 5
+    session_cls.assert_called_once()
+    assert weather_service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_lock_owner_fetches_and_releases_lock(make_redis):
+    """
+    Проверяет, что реплика, взявшая блокировку, запрашивает wttr.in
+    и снимает блокировку своим токеном.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}]
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+    mock_redis = make_redis(CACHE_MISS)
+    mock_redis.set.return_value = True
+
+    with (
+        use_redis(mock_redis),
+        patch("services.weather_providers.get_http_session", return_value=mock_session),
+    ):
+        await weather_service._get_weather("Moscow")
+
+    lock_args = mock_redis.set.await_args
+    assert lock_args.args[0] == "weather:lock:moscow"
+    assert lock_args.kwargs["nx"] is True
+
+    release_args = mock_redis.eval.await_args.args
+    assert release_args[2:] == ("weather:lock:moscow", lock_args.args[1])
+
+
+@pytest.mark.asyncio
+async def test_waits_for_other_replica_instead_of_fetching(make_redis):
+    """
+    Проверяет, что при занятой блокировке реплика дожидается ответа
+    другой реплики в Redis и не обращается к wttr.in.
+    """
+
+    cached_result = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+    mock_redis = make_redis(CACHE_MISS)
+    mock_redis.pipeline.return_value.execute.side_effect = [
+        [None, -2],  # промах при первом чтении
+        [None, -2],  # другая реплика ещё загружает
+        [make_entry(cached_result), 600_000],
+    ]
+    mock_redis.set.return_value = False
+
+    with (
+        use_redis(mock_redis),
+        patch("services.weather_service.WEATHER_LOCK_POLL_INTERVAL", 0),
+        patch("services.weather_providers.get_http_session") as session_cls,
+    ):
+        result = await weather_service._get_weather("Moscow")
+
+    assert result == cached_result
+    session_cls.assert_not_called()
+    mock_redis.eval.assert_not_called()
+    assert mock_redis.set.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_immediately_and_refreshed_in_background(make_redis):
+    """
+    Проверяет, что после soft TTL устаревшая запись возвращается сразу,
+    а свежие данные загружаются в фоне и попадают в кэш.
+    """
+
+    stale = {
+        "weather": [{"description": "Cloudy"}],
+        "main": {"temp": 5.0},
+        "forecast": [],
+    }
+    fresh_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}]
+    }
+    mock_redis = make_redis([make_entry(stale, age=700), 3_600_000])
+    mock_redis.set.return_value = True
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fresh_data))
+
+    with (
+        use_redis(mock_redis),
+        patch("services.weather_providers.get_http_session", return_value=mock_session),
+    ):
+        result = await weather_service._get_weather("Moscow")
+        assert result == stale
+        await weather_service._inflight["weather:moscow"]
+
+    entry = weather_service._local_cache.get("weather:moscow")
+    assert entry["data"] == {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 20.0},
+        "forecast": [],
+    }
+    mock_redis.setex.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_kept_when_upstream_is_down():
+    """
+    Проверяет, что при недоступности wttr.in пользователь получает
+    устаревшие данные, а не ошибку, и запись в кэше не затирается.
+    """
+
+    stale = {
+        "weather": [{"description": "Cloudy"}],
+        "main": {"temp": 5.0},
+        "forecast": [],
+    }
+    weather_service._local_cache.set(
+        "weather:kazan", {"data": stale, "fetched_at": time.time() - 700}
+    )
+    errors_before = weather_service.get_weather_cache_stats()["refresh_errors"]
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch(
+            "services.weather_service._fetch_weather",
+            AsyncMock(return_value={"error": "Не удалось подключиться"}),
+        ),
+    ):
+        result = await weather_service._get_weather("Kazan")
+        await asyncio.gather(*weather_service._inflight.values())
+        again = await weather_service._get_weather("Kazan")
+
+    assert result == again == stale
+    stats = weather_service.get_weather_cache_stats()
+    assert stats["refresh_errors"] >= errors_before + 1
+    assert weather_service._local_cache.get("weather:kazan")["data"] == stale
+
+
+@pytest.mark.asyncio
+async def test_legacy_redis_value_is_treated_as_stale(make_redis):
+    """
+    Проверяет, что JSON-значение старого формата отдаётся
+    как устаревшее и запускает обновление.
+    """
+
+    legacy = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+    fresh = {
+        "weather": [{"description": "Cloudy"}],
+        "main": {"temp": 10.0},
+        "forecast": [],
+    }
+    mock_redis = make_redis([json.dumps(legacy).encode(), 300_000])
+    fetch = AsyncMock(return_value=fresh)
+
+    with (
+        use_redis(mock_redis),
+        patch("services.weather_service._fetch_weather", fetch),
+    ):
+        result = await weather_service._get_weather("Moscow")
+        await asyncio.gather(*weather_service._inflight.values())
+
+    assert result == legacy
+    fetch.assert_awaited_once_with("Moscow")
+    assert weather_service._local_cache.get("weather:moscow")["data"] == fresh
+
+
+@pytest.mark.asyncio
+async def test_weather_needs_refresh_uses_soft_ttl_lead():
+    """
+    Проверяет, что обновление нужно для отсутствующих записей и записей,
+    которым осталось быть свежими меньше lead секунд.
+    """
+
+    weather = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+    weather_service._local_cache.set(
+        "weather:omsk", {"data": weather, "fetched_at": time.time() - 550}
+    )
+    weather_service._local_cache.set(
+        "weather:perm", {"data": weather, "fetched_at": time.time() - 100}
+    )
+
+    with patch("services.weather_service.get_redis_client", return_value=None):
+        assert await weather_service.weather_needs_refresh("Omsk", 120)
+        assert not await weather_service.weather_needs_refresh("Perm", 120)
+        assert await weather_service.weather_needs_refresh("Tver", 120)
+
+
+@pytest.mark.asyncio
+async def test_user_requests_are_counted_for_prefetch_ranking():
+    """
+    Проверяет, что запросы погоды пользователями учитываются в рейтинге
+    городов, а pop_city_requests обнуляет счётчики.
+    """
+
+    weather_service.pop_city_requests()
+    weather = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+
+    weather_service.track_city_requests(True)
+    try:
+        with patch(
+            "services.weather_service._get_weather", AsyncMock(return_value=weather)
+        ):
+            await weather_service.get_weather_with_translation("Moscow")
+            await weather_service.get_weather_with_translation("moscow")
+
+        assert weather_service.pop_city_requests() == {"moscow": 2}
+        assert weather_service.pop_city_requests() == {}
+    finally:
+        weather_service.track_city_requests(False)
+
+
+@pytest.mark.asyncio
+async def test_requests_not_counted_without_prefetcher():
+    """
+    Проверяет, что без прогрева кэша запросы не накапливаются в счётчиках.
+    """
+
+    weather = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 15.0},
+        "forecast": [],
+    }
+
+    with patch(
+        "services.weather_service._get_weather", AsyncMock(return_value=weather)
+    ):
+        await weather_service.get_weather_with_translation("Moscow")
+
+    assert weather_service.pop_city_requests() == {}
+
+
+@pytest.mark.asyncio
+async def test_nearest_area_alias_shares_cache_between_spellings():
+    """
+    Проверяет, что по nearest_area ответа wttr.in запоминается псевдоним,
+    и другие написания города обслуживаются из кэша без запроса к wttr.in.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}],
+        "nearest_area": [{"areaName": [{"value": "Moscow"}]}],
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+    expected = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 20.0},
+        "forecast": [],
+    }
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch(
+            "services.weather_providers.get_http_session", return_value=mock_session
+        ) as get_session,
+    ):
+        first = await weather_service._get_weather("Москва ")
+        results = [
+            await weather_service._get_weather(city)
+            for city in ("москва", "Moskva", "Moscow")
+        ]
+
+    assert first == expected
+    assert results == [expected] * 3
+    get_session.assert_called_once()
+    assert weather_service._alias_cache.get("moskva") == "moscow"
+
+
+@pytest.mark.asyncio
+async def test_alias_is_read_from_redis_and_stored_on_learning(make_redis):
+    """
+    Проверяет, что псевдоним, выученный другой репликой, берётся из Redis,
+    а новый псевдоним записывается в Redis.
+    """
+
+    mock_redis = make_redis(CACHE_MISS)
+    mock_redis.get.return_value = "moscow"
+
+    result = {
+        "weather": [{"description": "Sunny"}],
+        "main": {"temp": 20.0},
+        "forecast": [],
+    }
+
+    with use_redis(mock_redis):
+        key = await weather_service._resolve_key("Москва", mock_redis)
+        await weather_service._learn_alias(
+            "weather:piter", "Saint Petersburg", result, mock_redis
+        )
+
+    assert key == "weather:moscow"
+    mock_redis.get.assert_awaited_once_with("weather:alias:moskva")
+
+    mock_redis.setex.assert_any_await(
+        "weather:alias:piter", weather_service.WEATHER_ALIAS_TTL, "saint petersburg"
+    )
+    stored_keys = [call.args[0] for call in mock_redis.setex.await_args_list]
+    assert "weather:saint petersburg" in stored_keys
+
+
+@pytest.mark.asyncio
+async def test_forecast_is_parsed_and_cached_with_current_weather():
+    """
+    Проверяет, что прогноз из ответа wttr.in разбирается и кэшируется
+    вместе с текущей погодой, а представления прогноза не делают
+    повторного запроса к wttr.in.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}],
+        "weather": [
+            {
+                "date": "2026-10-17",
+                "mintempC": "12",
+                "maxtempC": "21",
+                "hourly": [
+                    {
+                        "time": "900",
+                        "tempC": "15",
+                        "chanceofrain": "10",
+                        "weatherDesc": [{"value": "Sunny"}],
+                    },
+                    {
+                        "time": "1200",
+                        "tempC": "21",
+                        "chanceofrain": "0",
+                        "weatherDesc": [{"value": "Clear"}],
+                    },
+                ],
+            }
+        ],
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch(
+            "services.weather_providers.get_http_session", return_value=mock_session
+        ) as get_session,
+    ):
+        weather = await weather_service.get_weather_with_translation("Sochi")
+        forecast = await weather_service.get_forecast_with_translation("Sochi")
+
+    get_session.assert_called_once()
+    assert weather["temp"] == 20.0
+    assert forecast["city"] == "Sochi"
+    day = forecast["days"][0]
+    assert (day["date"], day["min"], day["max"]) == ("2026-10-17", 12.0, 21.0)
+    assert day["hourly"][0] == {
+        "hour": 9,
+        "temp": 15.0,
+        "rain": 10,
+        "description": "Солнечно",
+    }
+    assert day["hourly"][1]["hour"] == 12
+
+
+@pytest.mark.asyncio
+async def test_broken_forecast_does_not_break_current_weather():
+    """
+    Проверяет, что повреждённый прогноз не мешает отдать текущую погоду.
+    """
+
+    fake_data = {
+        "current_condition": [{"weatherDesc": [{"value": "Sunny"}], "temp_C": "20"}],
+        "weather": [{"date": "2026-10-17"}],
+    }
+    mock_session = MockAiohttpSession(MockAiohttpResponse(200, fake_data))
+
+    with (
+        patch("services.weather_service.get_redis_client", return_value=None),
+        patch("services.weather_providers.get_http_session", return_value=mock_session),
+    ):
+        result = await weather_service._get_weather("Sochi")
+
+    assert result["main"]["temp"] == 20.0
+    assert result["forecast"] == []
@@ -0,0 +1,146 @@
+"""
+Тестовый модуль для database.
+"""
+
+import os
+import sys
+import importlib.util
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+DATABASE_PATH = Path(__file__).resolve().parents[1] / "database.py"
+
+
+@pytest.fixture
+def db():
+    """
+    Загружает настоящий модуль database под отдельным именем:
+    в sys.modules["database"] другие тесты кладут мок.
+    """
+    spec = importlib.util.spec_from_file_location("database_under_test", DATABASE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(os.environ, {"DATABASE_URL": "postgresql://u:p@localhost/db"}):
+        spec.loader.exec_module(module)
+    yield module
+    sys.modules.pop("database_under_test", None)
+
+
+def make_pool(conn):
+    """
+    Создаёт мок пула asyncpg, выдающего соединение conn.
+    """
+    acquired = MagicMock()
+    acquired.__aenter__ = AsyncMock(return_value=conn)
+    acquired.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.acquire.return_value = acquired
+    pool.get_size.return_value = 2
+    pool.get_idle_size.return_value = 1
+    return pool
+
+
+def make_conn(rows=()):
+    """
+    Создаёт мок соединения с транзакцией и серверным курсором по rows.
+    """
+
+    async def cursor(sql, prefetch):
+        for row in rows:
+            yield row
+
+    conn = MagicMock()
+    transaction = MagicMock()
+    transaction.__aenter__ = AsyncMock()
+    transaction.__aexit__ = AsyncMock(return_value=False)
+    conn.transaction.return_value = transaction
+    conn.cursor = MagicMock(side_effect=cursor)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_iter_future_pending_tasks_streams_batches(db):
+    """
+    Проверяет, что будущие задачи читаются курсором внутри транзакции
+    и отдаются пачками по batch_size.
+    """
+
+    rows = [{"id": f"t{i}", "user_id": 1, "scheduled_time": None} for i in range(5)]
+    conn = make_conn(rows)
+    db._pool = make_pool(conn)
+
+    batches = [batch async for batch in db.iter_future_pending_tasks(2)]
+
+    assert [[task["id"] for task in batch] for batch in batches] == [
+        ["t0", "t1"],
+        ["t2", "t3"],
+        ["t4"],
+    ]
+    conn.transaction.assert_called_once()
+    conn.transaction.return_value.__aenter__.assert_awaited_once()
+    conn.cursor.assert_called_once_with(db.FUTURE_PENDING_TASKS_SQL, prefetch=2)
+
+
+@pytest.mark.asyncio
+async def test_run_records_statement_and_pool_stats(db):
+    """
+    Проверяет, что выражения реестра выполняются по имени, а задержки
+    запросов и ожидание соединения попадают в get_db_stats().
+    """
+
+    conn = make_conn()
+    conn.fetchrow = AsyncMock(return_value={"id": "t1"})
+    conn.fetch = AsyncMock(return_value=[])
+    db._pool = make_pool(conn)
+
+    with patch.object(db.time, "perf_counter", side_effect=[0, 0, 0, 1, 5, 5, 5, 8]):
+        assert await db._run("fetchrow", "get_task_by_id", "t1") == {"id": "t1"}
+        assert await db._run("fetchrow", "get_task_by_id", "t2") == {"id": "t1"}
+
+    await db._run("fetch", "get_all_tasks", 1)
+
+    conn.fetchrow.assert_awaited_with(db.STATEMENTS["get_task_by_id"], "t2")
+    stats = db.get_db_stats()
+    assert stats["queries"]["get_task_by_id"] == {"calls": 2, "avg": 2.0, "max": 3}
+    assert stats["queries"]["get_all_tasks"]["calls"] == 1
+    assert stats["pool"]["acquires"] == 3
+    assert stats["pool"]["size"] == 2
+    assert stats["pool"]["idle"] == 1
+    assert stats["pool"]["max_size"] == db.DB_POOL_MAX_SIZE
+
+
+@pytest.mark.asyncio
+async def test_acquire_records_wait(db):
+    """
+    Проверяет учёт времени ожидания соединения из пула.
+    """
+
+    db._pool = make_pool(make_conn())
+
+    with patch.object(db.time, "perf_counter", side_effect=[0.0, 0.5, 1.0, 1.1]):
+        for _ in range(2):
+            async with db.acquire():
+                pass
+
+    pool = db.get_db_stats()["pool"]
+    assert pool["acquires"] == 2
+    assert pool["avg_wait"] == pytest.approx(0.3)
+    assert pool["max_wait"] == 0.5
+
+
+def test_db_stats_empty_without_pool(db):
+    """
+    Проверяет статистику до создания пула.
+    """
+
+    assert db.get_db_stats() == {
+        "pool": {
+            "size": 0,
+            "idle": 0,
+            "max_size": db.DB_POOL_MAX_SIZE,
+            "acquires": 0,
+            "avg_wait": 0.0,
+            "max_wait": 0.0,
+        },
+        "queries": {},
+    }
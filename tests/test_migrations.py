@@ -0,0 +1,167 @@
+"""
+Тестовый модуль для migrations.
+"""
+
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call
+
+import migrations
+
+
+def make_conn(versions):
+    """
+    Создаёт mock соединения asyncpg, который последовательно
+    возвращает versions на запросы версии схемы.
+    """
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(side_effect=versions)
+    conn.execute = AsyncMock()
+    conn.fetch = AsyncMock(return_value=[])
+    transaction = MagicMock()
+    transaction.__aenter__ = AsyncMock()
+    transaction.__aexit__ = AsyncMock(return_value=False)
+    conn.transaction.return_value = transaction
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_current_schema_does_single_read():
+    """
+    Проверяет, что при актуальной схеме выполняется только чтение версии.
+    """
+
+    conn = make_conn([migrations.LATEST_VERSION])
+
+    applied = await migrations.apply_migrations(conn)
+
+    assert applied == 0
+    conn.fetchval.assert_awaited_once()
+    conn.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_applies_all_migrations_under_lock():
+    """
+    Проверяет применение всех миграций на пустой БД под advisory lock.
+    """
+
+    # Третий запрос — тип tasks.id в миграции 3 (ещё TEXT),
+    # четвёртый — пустая пачка заполнения новых столбцов
+    conn = make_conn([asyncpg.UndefinedTableError("no table"), None, "text", None])
+
+    applied = await migrations.apply_migrations(conn)
+
+    assert applied == len(migrations.MIGRATIONS)
+    executed = conn.execute.await_args_list
+    assert executed[0] == call(
+        "SELECT pg_advisory_lock($1)", migrations.MIGRATIONS_LOCK_ID
+    )
+    assert executed[-1] == call(
+        "SELECT pg_advisory_unlock($1)", migrations.MIGRATIONS_LOCK_ID
+    )
+    recorded = [
+        c.args[1]
+        for c in executed
+        if c.args[0].startswith("INSERT INTO schema_version")
+    ]
+    assert recorded == [m.version for m in migrations.MIGRATIONS]
+
+
+@pytest.mark.asyncio
+async def test_migrations_applied_by_other_replica_are_skipped():
+    """
+    Проверяет, что версия перечитывается под lock и уже применённые
+    другой репликой миграции пропускаются.
+    """
+
+    conn = make_conn([0, migrations.LATEST_VERSION])
+
+    applied = await migrations.apply_migrations(conn)
+
+    assert applied == 0
+    assert not any(
+        c.args[0].startswith("INSERT INTO schema_version")
+        for c in conn.execute.await_args_list
+    )
+
+
+@pytest.mark.asyncio
+async def test_callable_steps_and_unlock_on_error(monkeypatch):
+    """
+    Проверяет вызов шагов-функций и снятие lock при ошибке миграции.
+    """
+
+    failing_step = AsyncMock(side_effect=RuntimeError("boom"))
+    conn = make_conn([0, 0])
+
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS", [migrations.Migration(1, "test", [failing_step])]
+    )
+
+    with pytest.raises(RuntimeError):
+        await migrations.apply_migrations(conn)
+
+    failing_step.assert_awaited_once_with(conn)
+    assert conn.execute.await_args_list[-1] == call(
+        "SELECT pg_advisory_unlock($1)", migrations.MIGRATIONS_LOCK_ID
+    )
+
+
+@pytest.mark.asyncio
+async def test_uuid_migration_skipped_when_already_converted():
+    """
+    Проверяет, что миграция tasks на uuid ничего не делает,
+    если tasks.id уже имеет тип uuid.
+    """
+
+    conn = make_conn(["uuid"])
+
+    await migrations._migrate_tasks_to_uuid(conn)
+
+    conn.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_uuid_migration_backfills_in_batches_then_swaps():
+    """
+    Проверяет заполнение новых столбцов пачками по возрастанию старого id
+    (keyset) до пустой пачки и переключение столбцов в отдельной транзакции.
+    """
+
+    conn = make_conn(["text", "id-0999", "id-1999", None])
+
+    await migrations._migrate_tasks_to_uuid(conn)
+
+    statements = [c.args[0] for c in conn.execute.await_args_list]
+    backfills = conn.fetchval.await_args_list[1:]
+    assert [c.args[1:] for c in backfills] == [
+        ("", migrations.BACKFILL_BATCH_SIZE),
+        ("id-0999", migrations.BACKFILL_BATCH_SIZE),
+        ("id-1999", migrations.BACKFILL_BATCH_SIZE),
+    ]
+    assert all("WHERE id > $1 ORDER BY id LIMIT $2" in c.args[0] for c in backfills)
+    assert not any("ctid" in sql for sql in statements)
+    assert any("CONCURRENTLY" in sql and "id_uuid" in sql for sql in statements)
+    assert "LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE" in statements
+    assert any("PRIMARY KEY USING INDEX" in sql for sql in statements)
+    conn.transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_invalid_indexes_dropped_before_build():
+    """
+    Проверяет, что невалидные индексы от прерванной сборки CONCURRENTLY
+    удаляются перед построением индексов.
+    """
+
+    conn = make_conn([])
+    conn.fetch.return_value = [{"relname": "tasks_pending_time_idx"}]
+
+    await migrations.drop_invalid_indexes(conn)
+
+    conn.execute.assert_awaited_once_with(
+        'DROP INDEX CONCURRENTLY IF EXISTS "tasks_pending_time_idx"'
+    )
+    assert migrations.TASKS_INDEXES[0] is migrations.drop_invalid_indexes
+    assert migrations.TASKS_PAGE_INDEX[0] is migrations.drop_invalid_indexes
@@ -0,0 +1,87 @@
+"""
+Тестовый модуль для utils.cache_utils.
+"""
+
+from utils.cache_utils import TTLCache
+
+
+class FakeClock:
+    """
+    Управляемые часы для проверки истечения записей.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set_and_stats():
+    """
+    Проверяет попадания, промахи и долю попаданий.
+    """
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_entries_expire_after_ttl():
+    """
+    Проверяет, что запись перестаёт возвращаться после истечения TTL,
+    а индивидуальный ttl переопределяет значение по умолчанию.
+    """
+
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    clock.now = 10
+    assert cache.get("b") is None
+    assert cache.ttl_left("a") == 50
+
+    clock.now = 60
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    """
+    Проверяет, что при переполнении вытесняется давно не использованная запись.
+    """
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" становится давно не использованной
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_peek_does_not_touch_stats_and_delete():
+    """
+    Проверяет peek без учёта в статистике и удаление записи.
+    """
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.peek("a") == 1
+    assert cache.stats()["hits"] == 0
+
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
+    assert cache.peek("a") is None
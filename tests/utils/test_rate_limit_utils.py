@@ -0,0 +1,80 @@
+"""
+Тестовый модуль для utils.rate_limit_utils.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from utils.rate_limit_utils import AsyncTokenBucket
+
+
+class FakeClock:
+    """
+    Управляемые часы: asyncio.sleep продвигает время вместо ожидания.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """
+    Подменяет time.monotonic и asyncio.sleep в модуле rate_limit_utils.
+    """
+    fake = FakeClock()
+    with (
+        patch("utils.rate_limit_utils.time.monotonic", fake.monotonic),
+        patch("utils.rate_limit_utils.asyncio.sleep", fake.sleep),
+    ):
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_up_to_capacity(clock):
+    """
+    Проверяет, что до ёмкости ведра токены выдаются без ожидания.
+    """
+
+    bucket = AsyncTokenBucket(rate=10, capacity=3)
+
+    waits = [await bucket.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_bucket_throttles_after_capacity(clock):
+    """
+    Проверяет, что после исчерпания ведра ожидание равно 1 / rate.
+    """
+
+    bucket = AsyncTokenBucket(rate=10, capacity=1)
+
+    await bucket.acquire()
+    waited = await bucket.acquire()
+
+    assert waited == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_bucket_serves_concurrent_waiters(clock):
+    """
+    Проверяет, что конкурентные ожидающие получают токены по очереди.
+    """
+
+    bucket = AsyncTokenBucket(rate=2, capacity=1)
+
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+    assert clock.now == pytest.approx(2.0)
@@ -1,4 +1,5 @@
 import pytest
+from uuid import uuid4
 from datetime import datetime, timezone, timedelta
 from freezegun import freeze_time
 from utils.tasks_utils import (
@@ -6,6 +7,8 @@ from utils.tasks_utils import (
     format_task_date,
     format_task,
     parse_and_validate_datetime,
+    encode_page_cursor,
+    decode_page_cursor,
 )
 from constants.time_constants import MOSCOW_TZ, RU_DAYS, RU_MONTHS
 
@@ -160,3 +163,30 @@ def test_parse_and_validate_datetime(text, expected):
 
     dt_utc = parse_and_validate_datetime(text)
     assert dt_utc == expected
+
+
+def test_page_cursor_roundtrip_keeps_microseconds():
+    """
+    Проверяет, что курсор страницы точно восстанавливает
+    (scheduled_time, id), включая микросекунды, и укладывается
+    в лимит callback_data вместе с префиксом.
+    """
+
+    task = {
+        "id": uuid4(),
+        "scheduled_time": datetime(2026, 2, 10, 15, 30, 1, 123456, tzinfo=timezone.utc),
+    }
+
+    cursor = encode_page_cursor(task)
+
+    assert decode_page_cursor(cursor) == (task["scheduled_time"], task["id"])
+    assert len(f"tn:{cursor}".encode()) <= 64
+
+
+@pytest.mark.parametrize("cursor", ["abc:123", "123:not-a-uuid", ""])
+def test_decode_page_cursor_invalid(cursor):
+    """
+    Проверяет, что некорректный курсор возвращает None.
+    """
+
+    assert decode_page_cursor(cursor) is None
@@ -0,0 +1,69 @@
+"""
+Тестовый модуль для utils.timing_wheel.
+"""
+
+import random
+import pytest
+
+from utils.timing_wheel import HierarchicalTimingWheel
+
+
+def test_wheel_fires_entries_in_time():
+    """
+    Проверяет, что записи на разных уровнях срабатывают ровно в свой тик.
+    """
+
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=8, levels=3)
+    rng = random.Random(42)
+    due = {f"k{i}": rng.randint(1, 8**3 * 2) for i in range(500)}
+
+    for key, due_time in due.items():
+        wheel.insert(key, due_time, payload=due_time)
+
+    fired_at = {}
+    for now in range(0, 8**3 * 2 + 1):
+        for key, payload in wheel.advance(now):
+            fired_at[key] = now
+            assert payload == due[key]
+
+    assert fired_at == due
+    assert len(wheel) == 0
+
+
+def test_wheel_cancel_and_replace():
+    """
+    Проверяет отмену записи и замену записи с тем же ключом.
+    """
+
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=8, levels=2)
+    wheel.insert("a", 5)
+    wheel.insert("b", 70)
+    wheel.insert("b", 10)  # перенос задачи
+
+    assert wheel.cancel("a") is True
+    assert wheel.cancel("a") is False
+    assert "a" not in wheel
+
+    assert wheel.advance(9) == []
+    assert wheel.advance(10) == [("b", None)]
+    assert wheel.advance(100) == []
+
+
+def test_wheel_overdue_entry_fires_on_next_advance():
+    """
+    Проверяет, что запись со временем в прошлом срабатывает сразу.
+    """
+
+    wheel = HierarchicalTimingWheel(tick=0.5, start_time=100.0)
+    wheel.insert("late", 50.0, payload="x")
+
+    assert wheel.advance(100.0) == [("late", "x")]
+
+
+def test_wheel_rejects_non_power_of_two_size():
+    """
+    Проверяет валидацию размера уровня колеса.
+    """
+
+    with pytest.raises(ValueError):
+        HierarchicalTimingWheel(tick=1.0, wheel_size=10)
@@ -0,0 +1,139 @@
+import json
+import time
+import struct
+from utils.weather_codec import encode_entry, decode_entry, WEATHER_CODEC_VERSION
+
+FORECAST = [
+    {
+        "date": "2026-10-17",
+        "min": -3.0,
+        "max": 5.5,
+        "hourly": [
+            {"hour": 0, "temp": -3.0, "rain": 0, "description": "Clear"},
+            {"hour": 12, "temp": 5.5, "rain": 40, "description": "Light rain"},
+            {"hour": 21, "temp": 1.0, "rain": 0, "description": "Clear"},
+        ],
+    },
+    {
+        "date": "2026-10-18",
+        "min": 0.0,
+        "max": 7.0,
+        "hourly": [{"hour": 12, "temp": 7.0, "rain": 90, "description": "Снег"}],
+    },
+]
+
+
+def make_entry(description="Ясно", temp=-3.5, forecast=None):
+    """
+    Создаёт запись кэша погоды.
+    """
+    return {
+        "data": {
+            "weather": [{"description": description}],
+            "main": {"temp": temp},
+            "forecast": forecast or [],
+        },
+        "fetched_at": time.time(),
+    }
+
+
+def test_roundtrip():
+    """
+    Проверка, что запись восстанавливается без потерь.
+    """
+
+    entry = make_entry("Light rain shower", 12.0)
+    assert decode_entry(encode_entry(entry)) == entry
+
+
+def test_roundtrip_with_forecast():
+    """
+    Проверка, что прогноз по дням и интервалам восстанавливается без потерь.
+    """
+
+    entry = make_entry("Sunny", 4.0, FORECAST)
+    assert decode_entry(encode_entry(entry)) == entry
+
+
+def test_roundtrip_unicode_and_negative_temp():
+    """
+    Проверка UTF-8 описания и отрицательной дробной температуры.
+    """
+
+    entry = make_entry("Снег", -12.3)
+    decoded = decode_entry(encode_entry(entry))
+
+    assert decoded["data"]["weather"][0]["description"] == "Снег"
+    assert decoded["data"]["main"]["temp"] == -12.3
+
+
+def test_encoded_entry_smaller_than_json():
+    """
+    Проверка, что бинарная запись меньше JSON.
+    """
+
+    entry = make_entry("Partly cloudy", 20.0, FORECAST)
+    assert len(encode_entry(entry)) < len(json.dumps(entry)) / 2
+
+
+def test_version_1_entry_is_decoded_as_stale():
+    """
+    Проверка, что запись версии 1 (без прогноза) читается как устаревшая.
+    """
+
+    description = "Sunny".encode()
+    raw = struct.pack(">BdhH", 1, time.time(), 150, len(description)) + description
+
+    entry = decode_entry(raw)
+
+    assert entry["fetched_at"] == 0.0
+    assert entry["data"]["main"]["temp"] == 15.0
+    assert entry["data"]["forecast"] == []
+
+
+def test_unknown_version_is_rejected():
+    """
+    Проверка, что запись другой версии схемы не декодируется.
+    """
+
+    raw = bytearray(encode_entry(make_entry()))
+    raw[0] = WEATHER_CODEC_VERSION + 1
+
+    assert decode_entry(bytes(raw)) is None
+
+
+def test_truncated_entry_is_rejected():
+    """
+    Проверка, что обрезанная запись не декодируется.
+    """
+
+    raw = encode_entry(make_entry(forecast=FORECAST))
+
+    assert decode_entry(raw[:-1]) is None
+    assert decode_entry(raw[:5]) is None
+    assert decode_entry(raw + b"\x00") is None
+
+
+def test_long_cyrillic_description_truncated_at_char_boundary():
+    """
+    Проверка, что длинное кириллическое описание интервала обрезается
+    до 255 байт по границе символа и запись остаётся читаемой.
+    """
+
+    description = "Сильный снег с дождём и порывистым ветром. " * 10
+    forecast = [
+        {
+            "date": "2026-10-17",
+            "min": -1.0,
+            "max": 2.0,
+            "hourly": [
+                {"hour": 12, "temp": 0.5, "rain": 80, "description": description}
+            ],
+        }
+    ]
+
+    decoded = decode_entry(encode_entry(make_entry("Снег", -1.0, forecast)))
+    truncated = decoded["data"]["forecast"][0]["hourly"][0]["description"]
+
+    assert description.startswith(truncated)
+    assert 253 <= len(truncated.encode()) <= 255
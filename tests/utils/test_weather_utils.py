@@ -1,5 +1,22 @@
 import pytest
-from utils.weather_utils import validate_city, translate_weather
+from utils.weather_utils import (
+    validate_city,
+    translate_weather,
+    normalize_city,
+    city_key,
+    format_day_forecast,
+    format_hourly_forecast,
+)
+
+DAY = {
+    "date": "2026-10-18",
+    "min": -2.4,
+    "max": 6.6,
+    "hourly": [
+        {"hour": 9, "temp": 1.0, "rain": 0, "description": "ясно"},
+        {"hour": 12, "temp": 6.0, "rain": 40, "description": "небольшой дождь"},
+    ],
+}
 
 
 @pytest.mark.parametrize(
@@ -71,3 +88,62 @@ def test_translate_weather_capitalization():
 
     assert translate_weather("light rain") == "Небольшой дождь"
     assert translate_weather("LIGHT RAIN") == "Небольшой дождь"
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("  Москва ", "Москва"),
+        ("Нижний   Новгород", "Нижний Новгород"),
+        ("Санкт - Петербург", "Санкт-Петербург"),
+        ("Орёл", "Орел"),
+        ("ЁЛКИ", "ЕЛКИ"),
+    ],
+)
+def test_normalize_city(raw, expected):
+    """
+    Проверка нормализации названия города (пробелы, дефисы, ё/е).
+    """
+
+    assert normalize_city(raw) == expected
+
+
+def test_city_key_merges_spellings():
+    """
+    Проверка, что разные написания города дают один ключ кэша.
+    """
+
+    assert {city_key(c) for c in ["Москва", "москва ", "МОСКВА", "Moskva"]} == {
+        "moskva"
+    }
+    assert city_key("Санкт-Петербург") == "sankt-peterburg"
+    assert city_key("Щёлково") == "shchelkovo"
+
+
+def test_format_day_forecast():
+    """
+    Проверка текста прогноза на день.
+    """
+
+    text = format_day_forecast("москва", DAY, "завтра")
+
+    assert text == (
+        "📅 Москва — завтра, 18.10\n"
+        "Небольшой дождь\n"
+        "🌡 от -2 до 7°C\n"
+        "☔ Вероятность дождя до 40%"
+    )
+
+
+def test_format_hourly_forecast():
+    """
+    Проверка текста прогноза по часам.
+    """
+
+    text = format_hourly_forecast("москва", DAY)
+
+    assert text.splitlines() == [
+        "🕒 Москва — по часам, 18.10",
+        "09:00  1°C  ясно",
+        "12:00  6°C  небольшой дождь  ☔ 40%",
+    ]
@@ -0,0 +1,148 @@
+"""
+In-process кэш с ограничением размера (LRU) и временем жизни записей (TTL).
+
+Используется как локальный (первый) уровень кэша перед Redis и БД:
+обращение к нему не требует сетевого запроса, а объём памяти ограничен
+maxsize записями — при переполнении вытесняется давно не использованная.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU-кэш с временем жизни записей.
+
+    Просроченные записи удаляются лениво — при обращении к ним
+    или при вытеснении. Кэш не потокобезопасен и рассчитан на
+    использование из одного event loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            maxsize (int): Максимальное количество записей.
+            ttl (float): Время жизни записи по умолчанию, секунд.
+            clock (Callable[[], float]): Источник времени (для тестов).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (время истечения, значение); порядок — от давно использованных
+        self._data: OrderedDict = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу и отмечает запись как использованную.
+
+        Args:
+            key (Hashable): Ключ записи.
+            default (Any): Значение при промахе.
+
+        Returns:
+            Any: Закэшированное значение или default.
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._data[key]
+            self._stats["misses"] += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение без учёта в статистике и без обновления LRU-порядка.
+
+        Args:
+            key (Hashable): Ключ записи.
+            default (Any): Значение, если записи нет или она просрочена.
+
+        Returns:
+            Any: Закэшированное значение или default.
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение, при переполнении вытесняя давно не использованные.
+
+        Args:
+            key (Hashable): Ключ записи.
+            value (Any): Значение.
+            ttl (float | None): Время жизни записи (по умолчанию self.ttl).
+        """
+        self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def ttl_left(self, key: Hashable) -> float:
+        """
+        Возвращает оставшееся время жизни записи.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            float: Секунды до истечения (0, если записи нет).
+        """
+        entry = self._data.get(key)
+        return max(0.0, entry[0] - self._clock()) if entry else 0.0
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Удаляет запись.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            bool: True, если запись была в кэше.
+        """
+        return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """
+        Очищает кэш (статистика сохраняется).
+        """
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict: Размер, попадания, промахи, вытеснения и доля попаданий.
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,57 @@
+"""
+Утилиты ограничения частоты запросов.
+"""
+
+import time
+import asyncio
+
+
+class AsyncTokenBucket:
+    """
+    Асинхронный token bucket для ограничения частоты операций.
+
+    Ведро вмещает capacity токенов и пополняется со скоростью rate
+    токенов в секунду. Ожидающие корутины обслуживаются по очереди.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Args:
+            rate (float): Скорость пополнения, токенов в секунду.
+            capacity (float | None): Ёмкость ведра (по умолчанию равна rate).
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """
+        Пополняет ведро токенами, накопившимися с прошлого обращения.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Ждёт, пока в ведре появится нужное количество токенов, и забирает их.
+
+        Args:
+            tokens (float): Количество токенов.
+
+        Returns:
+            float: Время ожидания в секундах.
+        """
+        started = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+        return time.monotonic() - started
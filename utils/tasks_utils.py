@@ -1,3 +1,4 @@
+from uuid import UUID
 from datetime import datetime, timedelta, timezone
 from constants.time_constants import MOSCOW_TZ, RU_DAYS, RU_MONTHS
 from app.logger import logger
@@ -138,3 +139,44 @@ def parse_and_validate_datetime(text: str) -> datetime | None:
 
     logger.debug("Парсинг и валидация даты завершились успешно")
     return dt_utc
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_page_cursor(task: dict) -> str:
+    """
+    Кодирует ключ задачи (scheduled_time, id) в курсор для callback_data.
+
+    Время кодируется целым числом микросекунд от эпохи — без потери
+    точности timestamptz, чтобы keyset-сравнение было точным.
+
+    Args:
+        task (dict): Задача с полями 'scheduled_time' (aware datetime) и 'id'.
+
+    Returns:
+        str: Курсор вида "<микросекунды>:<uuid>".
+    """
+
+    micros = (task["scheduled_time"] - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}:{task['id']}"
+
+
+def decode_page_cursor(cursor: str) -> tuple[datetime, UUID] | None:
+    """
+    Декодирует курсор, полученный из encode_page_cursor().
+
+    Args:
+        cursor (str): Курсор вида "<микросекунды>:<uuid>".
+
+    Returns:
+        tuple[datetime, UUID] | None: Пара (scheduled_time, id) или None,
+        если курсор некорректен.
+    """
+
+    micros, _, task_id = cursor.partition(":")
+    try:
+        return _EPOCH + timedelta(microseconds=int(micros)), UUID(task_id)
+    except ValueError:
+        logger.warning("Некорректный курсор списка задач %s", cursor)
+        return None
@@ -0,0 +1,164 @@
+"""
+Иерархическое колесо таймеров (hierarchical timing wheel).
+
+Структура данных для хранения большого количества отложенных событий
+с O(1) вставкой и отменой. Время разбито на тики длиной tick секунд.
+Уровень 0 содержит wheel_size слотов по одному тику, каждый следующий
+уровень — слоты в wheel_size раз крупнее. При переходе через границу
+слота верхнего уровня его записи "осыпаются" на нижние уровни.
+"""
+
+import math
+from typing import Any, Hashable
+
+
+class HierarchicalTimingWheel:
+    """
+    Иерархическое колесо таймеров.
+
+    Записи идентифицируются ключом (например, id задачи): повторная
+    вставка с тем же ключом заменяет запись, отмена удаляет её за O(1).
+    Колесо не знает о реальном времени — его продвигает вызывающий код
+    методом advance().
+    """
+
+    def __init__(
+        self,
+        tick: float,
+        wheel_size: int = 64,
+        levels: int = 6,
+        start_time: float = 0.0,
+    ):
+        """
+        Args:
+            tick (float): Длительность тика в секундах (разрешение колеса).
+            wheel_size (int): Количество слотов на уровне (степень двойки).
+            levels (int): Количество уровней.
+            start_time (float): Unix-время, с которого колесо начинает отсчёт.
+        """
+        if wheel_size & (wheel_size - 1):
+            raise ValueError("wheel_size должен быть степенью двойки")
+
+        self.tick = tick
+        self.levels = levels
+        self._bits = wheel_size.bit_length() - 1
+        self._mask = wheel_size - 1
+        self._current_tick = math.floor(start_time / tick)
+        # _slots[level][slot] -> {key: (due_tick, payload)}
+        self._slots = [[{} for _ in range(wheel_size)] for _ in range(levels)]
+        # Записи дальше горизонта колеса и уже созревшие записи
+        self._overflow: dict = {}
+        self._ready: dict = {}
+        # key -> контейнер (dict), в котором лежит запись
+        self._index: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def _place(self, key: Hashable, due_tick: int, payload: Any) -> None:
+        """
+        Кладёт запись в слот, соответствующий её тику срабатывания.
+        """
+        delta = due_tick - self._current_tick
+
+        if delta <= 0:
+            bucket = self._ready
+        else:
+            bucket = self._overflow
+            for level in range(self.levels):
+                if delta < 1 << (self._bits * (level + 1)):
+                    slot = (due_tick >> (self._bits * level)) & self._mask
+                    bucket = self._slots[level][slot]
+                    break
+
+        bucket[key] = (due_tick, payload)
+        self._index[key] = bucket
+
+    def insert(self, key: Hashable, due_time: float, payload: Any = None) -> None:
+        """
+        Добавляет (или заменяет) запись с временем срабатывания due_time.
+
+        Args:
+            key (Hashable): Уникальный ключ записи.
+            due_time (float): Unix-время срабатывания.
+            payload (Any): Данные, возвращаемые при срабатывании.
+        """
+        self.cancel(key)
+        self._place(key, math.ceil(due_time / self.tick), payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Удаляет запись по ключу.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            bool: True, если запись была в колесе.
+        """
+        bucket = self._index.pop(key, None)
+        if bucket is None:
+            return False
+
+        del bucket[key]
+        return True
+
+    def _cascade(self, bucket: dict) -> None:
+        """
+        Перераспределяет записи слота верхнего уровня по нижним уровням.
+        """
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, (due_tick, payload) in entries:
+            self._place(key, due_tick, payload)
+
+    def advance(self, now: float) -> list:
+        """
+        Продвигает колесо до момента now и возвращает сработавшие записи.
+
+        Args:
+            now (float): Текущее unix-время.
+
+        Returns:
+            list[tuple[Hashable, Any]]: Пары (ключ, payload) сработавших записей.
+        """
+        target_tick = math.floor(now / self.tick)
+        fired = []
+
+        while True:
+            if self._ready:
+                fired.extend(
+                    (key, payload) for key, (_, payload) in self._ready.items()
+                )
+                for key in self._ready:
+                    del self._index[key]
+                self._ready.clear()
+
+            if self._current_tick >= target_tick:
+                break
+
+            self._current_tick += 1
+            tick = self._current_tick
+
+            # Переход через границу горизонта — перепроверяем дальние записи
+            if self._overflow and tick % (1 << (self._bits * self.levels)) == 0:
+                self._cascade(self._overflow)
+
+            # Осыпаем слоты верхних уровней, начиная с самого крупного
+            for level in range(self.levels - 1, 0, -1):
+                if tick & ((1 << (self._bits * level)) - 1) == 0:
+                    slot = (tick >> (self._bits * level)) & self._mask
+                    self._cascade(self._slots[level][slot])
+
+            bucket = self._slots[0][tick & self._mask]
+            if bucket:
+                for key, (due_tick, payload) in list(bucket.items()):
+                    if due_tick <= tick:
+                        fired.append((key, payload))
+                        del bucket[key]
+                        del self._index[key]
+
+        return fired
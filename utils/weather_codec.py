@@ -0,0 +1,201 @@
+"""
+Компактный бинарный формат записей кэша погоды в Redis.
+
+Запись кэша — {"data": погода, "fetched_at": unix time} — хранится не
+JSON-строкой, а структурой фиксированного вида:
+
+    версия схемы   B   1 байт
+    fetched_at     d   8 байт
+    температура    h   2 байта (десятые доли градуса)
+    длина описания H   2 байта
+    описание           UTF-8
+
+Начиная с версии 2 за текущей погодой следует прогноз:
+
+    таблица строк  B   количество, затем строки (B длина + UTF-8)
+    дней           B
+    день           I   дата (date.toordinal), h h  min/max (десятые доли),
+                   B   количество интервалов
+    интервал       B   час, h температура, B вероятность дождя (%),
+                   B   номер описания в таблице строк
+
+Описания интервалов сильно повторяются, поэтому хранятся один раз
+в таблице строк. Первый байт — версия схемы: при изменении формата
+версия повышается, а записи неизвестной версии считаются отсутствующими
+(промах кэша). Записи версии 1 (без прогноза) читаются как устаревшие,
+чтобы они обновились в фоне.
+"""
+
+import struct
+from datetime import date
+
+# Текущая версия схемы записи
+WEATHER_CODEC_VERSION = 2
+
+_HEADER = struct.Struct(">BdhH")
+_COUNT = struct.Struct(">B")
+_DAY = struct.Struct(">IhhB")
+_HOUR = struct.Struct(">BhBB")
+
+
+def _tenths(value: float) -> int:
+    """
+    Переводит температуру в десятые доли градуса.
+    """
+
+    return round(value * 10)
+
+
+def _truncate(text: str, limit: int = 255) -> bytes:
+    """
+    Кодирует строку в UTF-8 не длиннее limit байт, обрезая по границе символа.
+    """
+
+    return text.encode()[:limit].decode("utf-8", "ignore").encode()
+
+
+def _encode_forecast(forecast: list[dict]) -> bytes:
+    """
+    Кодирует прогноз по дням (таблица строк + дни + интервалы).
+    """
+
+    strings: dict[str, int] = {}
+    days = []
+    for day in forecast:
+        hours = [
+            _HOUR.pack(
+                hour["hour"],
+                _tenths(hour["temp"]),
+                hour["rain"],
+                strings.setdefault(hour["description"], len(strings)),
+            )
+            for hour in day["hourly"]
+        ]
+        days.append(
+            _DAY.pack(
+                date.fromisoformat(day["date"]).toordinal(),
+                _tenths(day["min"]),
+                _tenths(day["max"]),
+                len(hours),
+            )
+            + b"".join(hours)
+        )
+
+    table = b"".join(
+        _COUNT.pack(len(raw)) + raw for raw in (_truncate(text) for text in strings)
+    )
+    return _COUNT.pack(len(strings)) + table + _COUNT.pack(len(days)) + b"".join(days)
+
+
+def _decode_forecast(raw: bytes, offset: int) -> list[dict]:
+    """
+    Декодирует прогноз, начиная с позиции offset.
+
+    Raises:
+        struct.error, IndexError, UnicodeDecodeError: Если данные повреждены.
+    """
+
+    (count,) = _COUNT.unpack_from(raw, offset)
+    offset += _COUNT.size
+    strings = []
+    for _ in range(count):
+        (length,) = _COUNT.unpack_from(raw, offset)
+        offset += _COUNT.size
+        strings.append(raw[offset : offset + length].decode())
+        offset += length
+
+    (days_count,) = _COUNT.unpack_from(raw, offset)
+    offset += _COUNT.size
+    forecast = []
+    for _ in range(days_count):
+        ordinal, low, high, hours_count = _DAY.unpack_from(raw, offset)
+        offset += _DAY.size
+        hourly = []
+        for _ in range(hours_count):
+            hour, temp, rain, index = _HOUR.unpack_from(raw, offset)
+            offset += _HOUR.size
+            hourly.append(
+                {
+                    "hour": hour,
+                    "temp": temp / 10,
+                    "rain": rain,
+                    "description": strings[index],
+                }
+            )
+        forecast.append(
+            {
+                "date": date.fromordinal(ordinal).isoformat(),
+                "min": low / 10,
+                "max": high / 10,
+                "hourly": hourly,
+            }
+        )
+
+    if offset != len(raw):
+        raise IndexError("Лишние байты в записи кэша погоды")
+    return forecast
+
+
+def encode_entry(entry: dict) -> bytes:
+    """
+    Кодирует запись кэша погоды в байты.
+
+    Args:
+        entry (dict): Запись {"data": погода, "fetched_at": unix time}.
+
+    Returns:
+        bytes: Закодированная запись.
+    """
+
+    data = entry["data"]
+    description = data["weather"][0]["description"].encode()
+    return (
+        _HEADER.pack(
+            WEATHER_CODEC_VERSION,
+            entry["fetched_at"],
+            _tenths(data["main"]["temp"]),
+            len(description),
+        )
+        + description
+        + _encode_forecast(data.get("forecast", []))
+    )
+
+
+def decode_entry(raw: bytes) -> dict | None:
+    """
+    Декодирует запись кэша погоды.
+
+    Args:
+        raw (bytes): Закодированная запись.
+
+    Returns:
+        dict | None: Запись {"data", "fetched_at"} или None, если версия
+        схемы неизвестна или данные повреждены.
+    """
+
+    if len(raw) < _HEADER.size or raw[0] not in (1, WEATHER_CODEC_VERSION):
+        return None
+
+    version, fetched_at, temp, length = _HEADER.unpack_from(raw)
+    end = _HEADER.size + length
+
+    try:
+        text = raw[_HEADER.size : end].decode()
+        if version == 1:
+            if len(raw) != end:
+                return None
+            # Записи без прогноза обновляются в фоне
+            fetched_at, forecast = 0.0, []
+        else:
+            forecast = _decode_forecast(raw, end)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        return None
+
+    return {
+        "data": {
+            "weather": [{"description": text}],
+            "main": {"temp": temp / 10},
+            "forecast": forecast,
+        },
+        "fetched_at": fetched_at,
+    }
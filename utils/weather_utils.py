@@ -1,7 +1,11 @@
 import re
-from constants.weather_constants import WEATHER_TRANSLATIONS
+from datetime import date
+from constants.weather_constants import WEATHER_TRANSLATIONS, CYRILLIC_TO_LATIN
 
 CITY_RE = re.compile(r"^[A-Za-zА-Яа-яЁё \-]{2,50}$")
+SPACES_RE = re.compile(r"\s+")
+HYPHEN_RE = re.compile(r"\s*-\s*")
+_TRANSLIT = str.maketrans(CYRILLIC_TO_LATIN)
 
 
 def validate_city(city: str) -> bool:
@@ -12,6 +16,41 @@ def validate_city(city: str) -> bool:
     return bool(CITY_RE.match(city))
 
 
+def normalize_city(city: str) -> str:
+    """
+    Приводит написание города к единому виду для запроса к сервису погоды.
+
+    Обрезает пробелы по краям, схлопывает повторяющиеся пробелы,
+    убирает пробелы вокруг дефиса и заменяет "ё" на "е". Регистр сохраняется.
+
+    Args:
+        city (str): Название города, введённое пользователем.
+
+    Returns:
+        str: Нормализованное название города.
+    """
+
+    city = HYPHEN_RE.sub("-", SPACES_RE.sub(" ", city.strip()))
+    return city.replace("ё", "е").replace("Ё", "Е")
+
+
+def city_key(city: str) -> str:
+    """
+    Возвращает ключ города для кэша погоды.
+
+    Нормализованное название переводится в нижний регистр и латиницу,
+    поэтому "Москва", "москва " и "Moskva" дают один ключ "moskva".
+
+    Args:
+        city (str): Название города.
+
+    Returns:
+        str: Ключ города.
+    """
+
+    return normalize_city(city).lower().translate(_TRANSLIT)
+
+
 def translate_weather(desc: str) -> str:
     """
     Переводит английское описание погоды на русский язык, если перевод доступен.
@@ -27,3 +66,52 @@ def translate_weather(desc: str) -> str:
     desc = desc.capitalize()
 
     return WEATHER_TRANSLATIONS.get(desc, desc)
+
+
+def format_day_forecast(city: str, day: dict, title: str) -> str:
+    """
+    Формирует текст прогноза на день.
+
+    Args:
+        city (str): Название города.
+        day (dict): День прогноза (date, min, max, hourly).
+        title (str): Подпись дня ("сегодня", "завтра").
+
+    Returns:
+        str: Текст сообщения.
+    """
+
+    lines = [f"📅 {city.title()} — {title}, {date.fromisoformat(day['date']):%d.%m}"]
+    if day["hourly"]:
+        # Описание дня — по интервалу, ближайшему к полудню
+        midday = min(day["hourly"], key=lambda hour: abs(hour["hour"] - 12))
+        lines.append(midday["description"].capitalize())
+    lines.append(f"🌡 от {round(day['min'])} до {round(day['max'])}°C")
+
+    rain = max((hour["rain"] for hour in day["hourly"]), default=0)
+    if rain:
+        lines.append(f"☔ Вероятность дождя до {rain}%")
+
+    return "\n".join(lines)
+
+
+def format_hourly_forecast(city: str, day: dict) -> str:
+    """
+    Формирует текст прогноза по часам (интервалы по 3 часа).
+
+    Args:
+        city (str): Название города.
+        day (dict): День прогноза (date, hourly).
+
+    Returns:
+        str: Текст сообщения.
+    """
+
+    lines = [f"🕒 {city.title()} — по часам, {date.fromisoformat(day['date']):%d.%m}"]
+    for hour in day["hourly"]:
+        line = f"{hour['hour']:02d}:00  {round(hour['temp'])}°C  {hour['description']}"
+        if hour["rain"]:
+            line += f"  ☔ {hour['rain']}%"
+        lines.append(line)
+
+    return "\n".join(lines)